@@ -0,0 +1,127 @@
+# This module 'aggregates.py' is a part of 'Inventory Management System' Projects
+# This module keeps inventory totals up to date on every change, so reading them does not scan the catalog
+
+# Every float is a whole multiple of 2**-1074, so values are kept as integers scaled by 2**SCALE_BITS.
+# Adding and subtracting them is exact and totals never drift however many changes are applied.
+SCALE_BITS = 1100
+SCALE = 1 << SCALE_BITS
+
+
+def to_fixed(value):
+    numerator, denominator = float(value).as_integer_ratio()
+    # denominator is a power of two, so dividing by it is a shift
+    return numerator << (SCALE_BITS - denominator.bit_length() + 1)
+
+
+def from_fixed(value: int):
+    # int / int is correctly rounded to nearest float
+    return value / SCALE
+
+
+class InventoryAggregates:
+    ''' This class keeps total value, units and product counts, overall and per category.
+    It is updated with the difference of each changed product, like the other indexes of the catalog.
+    '''
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total_value = 0
+        self.total_units = 0
+        self.product_count = 0
+        self.value_by_category = {}
+        self.units_by_category = {}
+        self.count_by_category = {}
+
+    def build(self, product_data: dict):
+        self.reset()
+        for product_id, product in product_data.items():
+            self.add(product_id, product)
+
+    def add(self, product_id: str, product: dict):
+        self.apply(product, 1)
+
+    def remove(self, product_id: str, product: dict):
+        self.apply(product, -1)
+
+    def apply(self, product: dict, sign: int):
+        value = sign * to_fixed(product["price"] * product["quantity"])
+        units = sign * to_fixed(product["quantity"])
+        category = product["category"]
+        self.total_value += value
+        self.total_units += units
+        self.product_count += sign
+        count = self.count_by_category.get(category, 0) + sign
+        if count:
+            self.value_by_category[category] = self.value_by_category.get(category, 0) + value
+            self.units_by_category[category] = self.units_by_category.get(category, 0) + units
+            self.count_by_category[category] = count
+        else:
+            del self.value_by_category[category], self.units_by_category[category], self.count_by_category[category]
+
+    def merge(self, other):
+        '''Adds aggregates of other products (fixed-point sums add exactly)'''
+
+        self.total_value += other.total_value
+        self.total_units += other.total_units
+        self.product_count += other.product_count
+        for category, count in other.count_by_category.items():
+            self.value_by_category[category] = self.value_by_category.get(category, 0) + other.value_by_category[category]
+            self.units_by_category[category] = self.units_by_category.get(category, 0) + other.units_by_category[category]
+            self.count_by_category[category] = self.count_by_category.get(category, 0) + count
+
+    def summary(self):
+        '''Returns current aggregates as plain numbers'''
+
+        return {
+            "total_value": from_fixed(self.total_value),
+            "total_units": from_fixed(self.total_units),
+            "product_count": self.product_count,
+            "value_by_category": {category: from_fixed(value) for category, value in self.value_by_category.items()},
+            "units_by_category": {category: from_fixed(units) for category, units in self.units_by_category.items()},
+            "count_by_category": dict(self.count_by_category)
+        }
+
+    def verify(self, product_data: dict):
+        '''Recomputes aggregates from scratch, returns {name: (maintained, recomputed)} for every difference'''
+
+        expected = InventoryAggregates()
+        expected.build(product_data)
+        maintained, recomputed = self.summary(), expected.summary()
+        return {name: (maintained[name], recomputed[name]) for name in maintained if maintained[name] != recomputed[name]}
+
+
+def aggregate(products):
+    '''One pass over (product_id, product) pairs, returns (InventoryAggregates, min_price, max_price).
+    Partial results of several passes (ex. one per shard) are put together with combine()'''
+
+    aggregates = InventoryAggregates()
+    min_price = max_price = None
+    for product_id, product in products:
+        aggregates.add(product_id, product)
+        if min_price is None or product["price"] < min_price:
+            min_price = product["price"]
+        if max_price is None or product["price"] > max_price:
+            max_price = product["price"]
+    return aggregates, min_price, max_price
+
+
+def combine(parts):
+    '''Returns summary (with min_price and max_price) of partial results of aggregate(), exact like one pass'''
+
+    total = InventoryAggregates()
+    prices = []
+    for aggregates, min_price, max_price in parts:
+        total.merge(aggregates)
+        prices += [price for price in (min_price, max_price) if price is not None]
+    summary = total.summary()
+    summary["min_price"], summary["max_price"] = (min(prices), max(prices)) if prices else (None, None)
+    return summary
+
+
+def summarize(products):
+    '''Returns summary of (product_id, product) pairs computed in one pass, with min_price and max_price.
+    Used for products streamed from storage, gives the same numbers as a maintained InventoryAggregates'''
+
+    return combine([aggregate(products)])
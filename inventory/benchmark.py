@@ -0,0 +1,225 @@
+# This module 'benchmark.py' is a part of 'Inventory Management System' Projects
+# This module times InventoryManager and Product operations on generated catalogs of growing size,
+# saves results as a JSON baseline and compares later runs against it
+#   python -m inventory.benchmark --sizes 1000,10000,100000,1000000 --output benchmark_baseline.json
+#   python -m inventory.benchmark --sizes 1000,10000 --compare benchmark_baseline.json --tolerance 0.25
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from inventory.inventory_manager import (InventoryManager, CATEGORY_OPTIONS, PRODUCT_ID_PATTERN,
+                                         WIDE_PRODUCT_ID_PATTERN)
+from inventory.product import Product
+
+DEFAULT_SIZES = (1000, 10_000, 100_000, 1_000_000)
+NARROW_ID_LIMIT = 20_000  # "A123" style IDs allow 26,000 products, bigger catalogs use wide IDs
+CATEGORIES = list(CATEGORY_OPTIONS.values())
+
+
+def product_id_for(number: int, wide: bool):
+    '''number-th product ID, valid for PRODUCT_ID_PATTERN ("A123") or WIDE_PRODUCT_ID_PATTERN ("A0001234")'''
+
+    if wide:
+        return f"{chr(ord('A') + number % 26)}{number:07d}"
+    return f"{chr(ord('A') + number // 1000)}{number % 1000:03d}"
+
+
+def generate_product(number: int, rng: random.Random):
+    # Names are unique and quantities and prices are never zero, so every product passes validate_fields
+    return {
+        "product_name": f"item_{number}",
+        "quantity": float(rng.randint(1, 200)),
+        "price": round(rng.uniform(0.5, 2000.0), 2),
+        "category": CATEGORIES[number % len(CATEGORIES)]
+    }
+
+
+def generate_catalog(count: int, seed=0, wide=None):
+    '''Returns {product_id: product} with count valid products, same catalog for the same seed'''
+
+    wide = count > NARROW_ID_LIMIT if wide is None else wide
+    rng = random.Random(seed)
+    return {product_id_for(number, wide): generate_product(number, rng) for number in range(count)}
+
+
+def measure(operation, min_seconds=0.2, max_operations=1000):
+    '''Calls operation(i) until min_seconds passed or max_operations were done.
+    Then calls it once more under tracemalloc for peak memory (kept apart, tracemalloc slows everything)'''
+
+    operations = 0
+    started = time.perf_counter()
+    while True:
+        operation(operations)
+        operations += 1
+        seconds = time.perf_counter() - started
+        if seconds >= min_seconds or operations >= max_operations:
+            break
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        operation(operations)
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return {
+        "operations": operations,
+        "seconds": round(seconds, 6),
+        "ops_per_second": round(operations / seconds, 3) if seconds else None,
+        "peak_memory_bytes": peak
+    }
+
+
+def benchmark_size(count: int, directory: Path, min_seconds=0.2, max_operations=1000, seed=0):
+    '''Times every operation on a generated catalog of count products, returns {operation: result}'''
+
+    wide = count > NARROW_ID_LIMIT
+    pattern = WIDE_PRODUCT_ID_PATTERN if wide else PRODUCT_ID_PATTERN
+    catalog = generate_catalog(count, seed, wide)
+    database = directory / f"catalog_{count}.json"
+    with open(database, "w") as file:
+        json.dump(catalog, file, indent=4)
+    manager = InventoryManager(database, product_id_pattern=pattern)
+    streaming = InventoryManager(database, product_id_pattern=pattern, streaming=True)
+    product_ids = list(catalog)
+    rng = random.Random(seed)
+    picks = [rng.choice(product_ids) for _ in range(max_operations + 1)]
+    spare_ids = [product_id_for(number, wide) for number in range(count, count + max_operations + 1)]
+    del catalog
+
+    def load(i):
+        manager.invalidate()
+        manager.read_product_data()
+
+    def update(i):
+        product = manager.read_product_data()[picks[i]]
+        manager.update_product(picks[i], Product(product["product_name"], product["quantity"] + 1.0,
+                                                 product["price"], product["category"]))
+
+    added = []
+
+    def add(i):
+        manager.add_product(spare_ids[i], Product(f"newitem_{i}", 1.0, 9.99, CATEGORIES[i % len(CATEGORIES)]))
+        added.append(spare_ids[i])
+
+    def remove(i):
+        if added:
+            manager.remove_product(added.pop())
+
+    product = Product("item_0", 10.0, 100.0, CATEGORIES[0])
+    operations = [
+        ("load", load),
+        ("lookup_by_id", lambda i: manager.read_product_data()[picks[i]]),
+        ("search_by_name", lambda i: manager.search_product_by_name(f"item_{i % count}")),
+        ("search_by_prefix", lambda i: manager.search_by_prefix(f"item_{i % count}"[:7])),
+        ("fuzzy_search", lambda i: manager.fuzzy_search(f"itme_{i % count}")),
+        ("filter_by_price", lambda i: manager.find_by_price_range(max_price=100.0)),
+        ("filter_by_category", lambda i: manager.products_in_category(CATEGORIES[i % len(CATEGORIES)])),
+        ("filter_low_quantity", lambda i: manager.low_stock_products()),
+        ("query", lambda i: manager.query().where(category=CATEGORIES[0]).quantity_below(50).order_by("price").limit(20).all()),
+        ("total_value", lambda i: manager.get_total_inventory_value()),
+        ("total_value_streamed", lambda i: streaming.get_total_inventory_value()),
+        ("search_by_name_streamed", lambda i: streaming.search_product_by_name(f"item_{i % count}")),
+        ("add_product", add),
+        ("remove_product", remove),
+        ("update_product", update),
+        ("update_quantity", lambda i: manager.increment_quantity(picks[i], 1.0)),
+        ("update_price", lambda i: manager.update_price(picks[i], 10.0 + i % 100)),
+        ("apply_discount", lambda i: manager.apply_discount(picks[i], 1.0)),
+        ("bulk_discount_category", lambda i: manager.bulk_discount(1.0, category=CATEGORIES[i % len(CATEGORIES)])),
+        ("product_update_quantity", lambda i: product.update_quantity(1.0)),
+        ("product_apply_discount", lambda i: product.apply_discount(0.0)),
+        ("product_to_dict", lambda i: product.to_dict())
+    ]
+    results = {}
+    # Manager methods print their messages, which would be timed and flood the output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, operation in operations:
+            results[name] = measure(operation, min_seconds, max_operations)
+    # Both managers share one cache, releasing it frees this catalog before the next size is generated
+    manager.close()
+    streaming.invalidate()
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, min_seconds=0.2, max_operations=1000, seed=0, progress=None):
+    '''Returns {"environment": ..., "results": {size: {operation: result}}}'''
+
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "settings": {"min_seconds": min_seconds, "max_operations": max_operations, "seed": seed},
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            if progress is not None:
+                progress(f"Benchmarking {size} products")
+            report["results"][str(size)] = benchmark_size(size, Path(directory), min_seconds, max_operations, seed)
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance=0.2):
+    '''Returns list of regressions: operations whose throughput dropped, or peak memory grew,
+    by more than tolerance (0.2 = 20%) against the baseline'''
+
+    regressions = []
+    for size, operations in report["results"].items():
+        for name, result in operations.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            if before["ops_per_second"] and result["ops_per_second"] is not None and \
+                    result["ops_per_second"] < before["ops_per_second"] * (1 - tolerance):
+                regressions.append({"size": int(size), "operation": name, "metric": "ops_per_second",
+                                    "baseline": before["ops_per_second"], "current": result["ops_per_second"]})
+            if result["peak_memory_bytes"] > before["peak_memory_bytes"] * (1 + tolerance):
+                regressions.append({"size": int(size), "operation": name, "metric": "peak_memory_bytes",
+                                    "baseline": before["peak_memory_bytes"], "current": result["peak_memory_bytes"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark inventory operations on generated catalogs")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated catalog sizes")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="how long each operation is repeated")
+    parser.add_argument("--max-operations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file (a baseline)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare results with a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = run_benchmarks(sizes, args.min_seconds, args.max_operations, args.seed,
+                            progress=lambda message: print(message, file=sys.stderr))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['operation']} at {regression['size']} products: {regression['metric']} "
+                  f"{regression['baseline']} -> {regression['current']}")
+        if regressions:
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
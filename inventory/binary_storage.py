@@ -0,0 +1,333 @@
+# This module 'binary_storage.py' is a part of 'Inventory Management System' Projects
+# This module stores products as fixed-width binary records in a memory-mapped file ("product_catalog.bin"),
+# so a changed quantity or price is written in place as 8 bytes, nothing else is serialized
+
+import math
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from inventory.storage import StorageBackend, check_conditions, file_mode, matches_conditions
+from inventory.locking import CatalogLock
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, without it totals are summed record by record
+    np = None
+
+# File layout: header, table of category names, then records in catalog order.
+# Header: magic, version (every write), layout (writes which add, remove or move records), record count,
+# category count. Records: price, quantity, category code, product ID, product name (UTF-8, zero padded).
+MAGIC = b"INVCAT01"
+HEADER = struct.Struct("<8sQQQQ")
+VERSION_OFFSET, LAYOUT_OFFSET, COUNT_OFFSET, CATEGORY_COUNT_OFFSET = 8, 16, 24, 32
+HEADER_SIZE = 64
+CATEGORY_SIZE = 32
+MAX_CATEGORIES = 64
+DATA_OFFSET = HEADER_SIZE + CATEGORY_SIZE * MAX_CATEGORIES
+ID_SIZE = 16
+NAME_SIZE = 64
+RECORD = struct.Struct("<ddH16s64s6x")  # padded to a multiple of 8, so price and quantity stay aligned
+PRICE_OFFSET, QUANTITY_OFFSET, ID_OFFSET = 0, 8, 18
+FLOAT = struct.Struct("<d")
+COUNTER = struct.Struct("<Q")
+INITIAL_CAPACITY = 1024
+RECORD_DTYPE = None if np is None else np.dtype({
+    "names": ["price", "quantity", "category", "product_id", "product_name"],
+    "formats": ["<f8", "<f8", "<u2", f"S{ID_SIZE}", f"S{NAME_SIZE}"],
+    "offsets": [PRICE_OFFSET, QUANTITY_OFFSET, 16, ID_OFFSET, ID_OFFSET + ID_SIZE],
+    "itemsize": RECORD.size
+})
+
+
+def encode_text(value: str, size: int, what: str):
+    encoded = value.encode("utf-8")
+    if len(encoded) > size or b"\0" in encoded:
+        raise ValueError(f"{what} '{value}' does not fit into {size} bytes of the binary catalog")
+    return encoded
+
+
+def decode_text(value: bytes):
+    return value.rstrip(b"\0").decode("utf-8")
+
+
+def record_offset(position: int):
+    return DATA_OFFSET + position * RECORD.size
+
+
+def category_offset(code: int):
+    return HEADER_SIZE + code * CATEGORY_SIZE
+
+
+class BinaryCatalogBackend(StorageBackend):
+    ''' Products stored as fixed-width records in a memory-mapped file, with an index product_id -> record.
+    Changes of quantity and price only are written in place (8 bytes each), other changes rewrite one record,
+    removing a product moves the records behind it. Conversion to and from JSON is lossless for
+    product IDs up to 16 and names up to 64 bytes (UTF-8), numbers are stored as 64-bit floats.
+    '''
+
+    def __init__(self, file_path="product_catalog.bin"):
+        self.path = Path(file_path)
+        self.lock = CatalogLock(self.path)
+        self.file = None
+        self.map = None
+        self.identity = None  # (inode, size) of the mapped file
+        self.layout = None  # layout the index was built for
+        self.index = {}  # product_id -> record position
+        self.product_ids = []
+        self.categories = []
+
+    def exists(self):
+        return self.path.exists()
+
+    def open(self):
+        '''Maps the file, again when it was replaced or grown by another writer.
+        The ID index is built again only when records were added, removed or moved,
+        categories are read again when another writer added one'''
+
+        file_stat = os.stat(self.path)
+        if (file_stat.st_ino, file_stat.st_size) != self.identity:
+            self.close()
+            self.file = open(self.path, "r+b")
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.identity = (file_stat.st_ino, file_stat.st_size)
+            if self.map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"'{self.path}' is not a binary product catalog")
+        if self.header(LAYOUT_OFFSET) != self.layout:
+            self.load_index()
+        elif self.header(CATEGORY_COUNT_OFFSET) != len(self.categories):
+            self.load_categories()
+
+    def header(self, offset: int):
+        return COUNTER.unpack_from(self.map, offset)[0]
+
+    def set_header(self, offset: int, value: int):
+        COUNTER.pack_into(self.map, offset, value)
+
+    def load_index(self):
+        count = self.header(COUNT_OFFSET)
+        self.product_ids = [decode_text(self.map[record_offset(position) + ID_OFFSET:
+                                                 record_offset(position) + ID_OFFSET + ID_SIZE])
+                            for position in range(count)]
+        self.index = {product_id: position for position, product_id in enumerate(self.product_ids)}
+        self.load_categories()
+        self.layout = self.header(LAYOUT_OFFSET)
+
+    def load_categories(self):
+        # The category table is only appended to (a rewritten file starts a new one with a new layout)
+        self.categories = [decode_text(self.map[category_offset(code):category_offset(code + 1)])
+                           for code in range(self.header(CATEGORY_COUNT_OFFSET))]
+
+    def read_version(self):
+        if not self.exists():
+            return 0
+        self.open()
+        return self.header(VERSION_OFFSET)
+
+    def signature(self):
+        if not self.exists():
+            return None
+        self.open()
+        return (self.identity[0], self.header(VERSION_OFFSET))
+
+    def read_record(self, position: int):
+        price, quantity, code, product_id, product_name = RECORD.unpack_from(self.map, record_offset(position))
+        return decode_text(product_id), {"product_name": decode_text(product_name), "quantity": quantity,
+                                         "price": price, "category": self.categories[code]}
+
+    def iter_records(self):
+        self.open()
+        for position in range(self.header(COUNT_OFFSET)):
+            yield self.read_record(position)
+
+    def load_all(self):
+        return dict(self.iter_records())
+
+    def read(self, product_id: str):
+        self.open()
+        position = self.index.get(product_id)
+        return None if position is None else self.read_record(position)[1]
+
+    def read_many(self, product_ids):
+        self.open()
+        return {product_id: self.read_record(self.index[product_id])[1]
+                for product_id in product_ids if product_id in self.index}
+
+    def upsert(self, product_id: str, product: dict):
+        self.write_changes({product_id: product}, None)
+
+    def delete(self, product_id: str):
+        self.write_changes({product_id: None}, None)
+
+    def scan(self, **conditions):
+        check_conditions(conditions)
+        for product_id, product in self.iter_records():
+            if matches_conditions(product, conditions):
+                yield product_id, product
+
+    def total_value(self):
+        '''Sum of price * quantity. With NumPy the mapped records are read as arrays without copying them'''
+
+        if not self.exists():
+            return 0.0
+        self.open()
+        count = self.header(COUNT_OFFSET)
+        if np is None:
+            return math.fsum(product["price"] * product["quantity"] for product_id, product in self.iter_records())
+        records = np.frombuffer(self.map, dtype=RECORD_DTYPE, count=count, offset=DATA_OFFSET)
+        values = records["price"] * records["quantity"]
+        del records  # the map cannot be closed or grown while a view of it exists
+        return math.fsum(values)
+
+    def check_product(self, product_id: str, product: dict):
+        # Checked by CatalogCache before the cached catalog changes, and again before anything is written,
+        # so a product which does not fit leaves both unchanged
+        encode_text(product_id, ID_SIZE, "Product ID")
+        encode_text(product["product_name"], NAME_SIZE, "Product name")
+        encode_text(product["category"], CATEGORY_SIZE, "Category")
+        if product["category"] not in self.categories and self.exists():
+            self.open()  # another writer may have added the category
+            if product["category"] not in self.categories and len(self.categories) == MAX_CATEGORIES:
+                raise ValueError(f"Binary catalog holds at most {MAX_CATEGORIES} categories")
+
+    def category_code(self, category: str):
+        if category not in self.categories:
+            if len(self.categories) == MAX_CATEGORIES:
+                raise ValueError(f"Binary catalog holds at most {MAX_CATEGORIES} categories")
+            encoded = encode_text(category, CATEGORY_SIZE, "Category")
+            offset = category_offset(len(self.categories))
+            self.map[offset:offset + CATEGORY_SIZE] = encoded.ljust(CATEGORY_SIZE, b"\0")
+            self.categories.append(category)
+            self.set_header(CATEGORY_COUNT_OFFSET, len(self.categories))
+        return self.categories.index(category)
+
+    def pack_record(self, position: int, product_id: str, product: dict):
+        RECORD.pack_into(self.map, record_offset(position), float(product["price"]), float(product["quantity"]),
+                         self.category_code(product["category"]), encode_text(product_id, ID_SIZE, "Product ID"),
+                         encode_text(product["product_name"], NAME_SIZE, "Product name"))
+
+    def update_record(self, position: int, product_id: str, product: dict):
+        '''Writes only what changed: a new quantity or price is one 8 byte write'''
+
+        current = self.read_record(position)[1]
+        if current["product_name"] != product["product_name"] or current["category"] != product["category"]:
+            self.pack_record(position, product_id, product)
+            return
+        for field, offset in (("price", PRICE_OFFSET), ("quantity", QUANTITY_OFFSET)):
+            if current[field] != product[field]:
+                FLOAT.pack_into(self.map, record_offset(position) + offset, float(product[field]))
+
+    def update_fields(self, product_id: str, quantity=None, price=None):
+        '''Sets quantity and/or price of one product in place'''
+
+        with self.lock:
+            self.open()
+            if product_id not in self.index:
+                raise KeyError(product_id)
+            position = self.index[product_id]
+            if price is not None:
+                FLOAT.pack_into(self.map, record_offset(position) + PRICE_OFFSET, float(price))
+            if quantity is not None:
+                FLOAT.pack_into(self.map, record_offset(position) + QUANTITY_OFFSET, float(quantity))
+            self.set_header(VERSION_OFFSET, self.header(VERSION_OFFSET) + 1)
+
+    def append_record(self, product_id: str, product: dict):
+        count = self.header(COUNT_OFFSET)
+        if record_offset(count + 1) > len(self.map):
+            self.grow(count + 1)
+        self.pack_record(count, product_id, product)
+        self.set_header(COUNT_OFFSET, count + 1)
+        self.index[product_id] = count
+        self.product_ids.append(product_id)
+
+    def remove_record(self, product_id: str):
+        # Records behind the removed one move one place forward, so catalog order is kept
+        position = self.index.pop(product_id)
+        count = self.header(COUNT_OFFSET)
+        behind = record_offset(count) - record_offset(position + 1)
+        self.map.move(record_offset(position), record_offset(position + 1), behind)
+        del self.product_ids[position]
+        for moved_position in range(position, count - 1):
+            self.index[self.product_ids[moved_position]] = moved_position
+        self.set_header(COUNT_OFFSET, count - 1)
+
+    def grow(self, needed: int):
+        capacity = (len(self.map) - DATA_OFFSET) // RECORD.size
+        size = record_offset(max(needed, capacity * 2, INITIAL_CAPACITY))
+        self.map.close()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.identity = (os.fstat(self.file.fileno()).st_ino, size)
+
+    def write_changes(self, changes: dict, product_data: dict):
+        with self.lock:
+            if not self.exists():
+                if product_data is None:
+                    product_data = {product_id: product for product_id, product in changes.items() if product is not None}
+                self.write_all(product_data)
+                return
+            self.open()
+            for product_id, product in changes.items():
+                if product is not None:
+                    self.check_product(product_id, product)
+            moved = False
+            for product_id, product in changes.items():
+                if product is None:
+                    if product_id in self.index:
+                        self.remove_record(product_id)
+                        moved = True
+                elif product_id in self.index:
+                    self.update_record(self.index[product_id], product_id, product)
+                else:
+                    self.append_record(product_id, product)
+                    moved = True
+            if moved:
+                self.layout += 1
+                self.set_header(LAYOUT_OFFSET, self.layout)
+            self.set_header(VERSION_OFFSET, self.header(VERSION_OFFSET) + 1)
+
+    def write_all(self, product_data: dict):
+        '''Writes a new file next to the catalog and replaces the catalog with it'''
+
+        with self.lock:
+            version = layout = 0
+            if self.exists():
+                self.open()
+                version, layout = self.header(VERSION_OFFSET), self.header(LAYOUT_OFFSET)
+            categories = list(dict.fromkeys(product["category"] for product in product_data.values()))
+            if len(categories) > MAX_CATEGORIES:
+                raise ValueError(f"Binary catalog holds at most {MAX_CATEGORIES} categories")
+            codes = {category: code for code, category in enumerate(categories)}
+            capacity = max(len(product_data), INITIAL_CAPACITY)
+            data = bytearray(record_offset(capacity))
+            HEADER.pack_into(data, 0, MAGIC, version + 1, layout + 1, len(product_data), len(categories))
+            for code, category in enumerate(categories):
+                encoded = encode_text(category, CATEGORY_SIZE, "Category")
+                data[category_offset(code):category_offset(code + 1)] = encoded.ljust(CATEGORY_SIZE, b"\0")
+            for position, (product_id, product) in enumerate(product_data.items()):
+                RECORD.pack_into(data, record_offset(position), float(product["price"]), float(product["quantity"]),
+                                 codes[product["category"]], encode_text(product_id, ID_SIZE, "Product ID"),
+                                 encode_text(product["product_name"], NAME_SIZE, "Product name"))
+            handle, temp_path = tempfile.mkstemp(prefix=self.path.name, suffix=".tmp", dir=self.path.parent)
+            try:
+                with os.fdopen(handle, "wb") as file:
+                    file.write(data)
+                os.chmod(temp_path, file_mode(self.path))
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            self.close()
+
+    def flush(self):
+        '''Asks the OS to write changed pages to disk now'''
+
+        if self.map is not None:
+            self.map.flush()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+        self.map = self.file = self.identity = self.layout = None
@@ -0,0 +1,76 @@
+# This module 'bulk_io.py' is a part of 'Inventory Management System' Projects
+# This module streams products from and to CSV / JSONL files, row by row, so big feeds are not loaded at once
+
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+FIELDS = ["product_id", "product_name", "quantity", "price", "category"]
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path, file_format=None):
+    '''Returns "csv" or "jsonl", given explicitly or taken from file extension'''
+
+    file_format = file_format or Path(path).suffix.lstrip(".").lower()
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format '{file_format}', use one of: {', '.join(FORMATS)}")
+    return file_format
+
+
+def read_records(path, file_format=None):
+    '''Yields one dict per row of a CSV file, or one line (not parsed yet) of a JSONL file,
+    so a malformed line can be reported with its row number instead of stopping the reading'''
+
+    file_format = detect_format(path, file_format)
+    with open(path, "r", newline="") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield line
+
+
+def parse_row(record):
+    '''Returns the row of a record given by read_records (dicts are returned as they are)'''
+
+    return json.loads(record) if isinstance(record, str) else record
+
+
+def read_rows(path, file_format=None):
+    '''Yields one dict per row of given CSV or JSONL file'''
+
+    for record in read_records(path, file_format):
+        yield parse_row(record)
+
+
+def write_rows(path, rows, file_format=None):
+    '''Writes rows (dicts with FIELDS keys) to CSV or JSONL file, returns number of written rows'''
+
+    file_format = detect_format(path, file_format)
+    count = 0
+    with open(path, "w", newline="") as file:
+        if file_format == "csv":
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+                count += 1
+    return count
+
+
+def chunked(iterable, size: int):
+    '''Yields lists of at most size items'''
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,351 @@
+# This module 'catalog_cache.py' is a part of 'Inventory Management System' Projects
+# This module keeps the parsed product catalog in memory, so it is not re-read on every call
+
+import os
+from contextlib import contextmanager
+from inventory.instrumentation import instrumentation
+from inventory.ledger import StockLedger
+from inventory.name_index import NameIndex
+from inventory.locking import VersionConflictError
+from inventory.storage import StorageBackend, storage_for_path
+
+
+class CatalogCache:
+    ''' This class keeps the parsed catalog in memory and reloads it only when the stored catalog changes.
+    Catalog is stored by a StorageBackend, "product_catalog.json" (JsonFileBackend) by default.
+    '''
+
+    def __init__(self, file_path="product_catalog.json"):
+        self.storage = file_path if isinstance(file_path, StorageBackend) else storage_for_path(file_path)
+        self.database = self.storage.path
+        self.product_data = None
+        self.signature = None
+        self.loaded_version = None  # version of stored catalog the cached data was loaded from
+        self.hits = 0
+        self.misses = 0
+        self.version = 0  # increased on every change of cached catalog, views built from it check this
+        self.name_index = NameIndex()
+        self.indexes = [self.name_index]
+        self.pending = {}  # product_id -> product (or None when removed) changed since last save
+        self.batch_depth = 0
+        self.undo = {}  # product_id -> product as it was before the batch (None when it did not exist)
+        self.pending_before_batch = {}
+        self.ledger = None  # StockLedger, history of changes, when enabled
+        self.movements = []  # (product_id, old product, new product, reason) not saved yet
+        self.movements_before_batch = 0
+        self.reason = None  # reason recorded with movements, see InventoryManager.movement_reason
+        self.journaled = False
+
+    @property
+    def journal(self):
+        return getattr(self.storage, "journal", None)
+
+    def file_signature(self):
+        '''Returns signature of stored catalog (for JSON file its mtime, size and inode), None if there is none'''
+
+        return self.storage.signature()
+
+    def enable_journal(self, max_records=1000, max_bytes=1_000_000):
+        '''Switches to journaled mode: changes are appended to a log instead of rewriting the catalog'''
+
+        if not self.journaled:
+            self.storage.enable_journal(max_records, max_bytes)
+            self.journaled = True
+            self.invalidate()
+
+    def enable_ledger(self, snapshot_every=1000):
+        '''Starts recording every saved change in a StockLedger, with a first snapshot of the current catalog'''
+
+        if self.ledger is None:
+            ledger = StockLedger(self.database, self.storage.lock, snapshot_every)
+            with self.storage.lock:
+                ledger.ensure_baseline(self.load() if self.storage.exists() else {})
+            self.ledger = ledger
+
+    def load(self):
+        '''Returns the cached catalog, it is loaded again only if stored catalog changed since last load'''
+
+        if self.batch_depth and self.product_data is not None:
+            # Uncommitted batch works on cached catalog, changes made by others are seen after commit
+            self.hits += 1
+            return self.product_data
+
+        if self.is_current():
+            self.hits += 1
+            return self.product_data
+
+        # Reload under the lock, so a writer of this process never has the catalog replaced in the middle of its change
+        with self.storage.lock:
+            signature = self.file_signature()
+            if self.is_current(signature):
+                self.hits += 1
+                return self.product_data
+            self.misses += 1
+            # Version is read first: if someone writes in between, the version looks older than data
+            # and a conditional write fails instead of silently overwriting
+            self.loaded_version = self.storage.read_version()
+            self.product_data = self.storage.load_all()
+            self.pending = {}
+            self.movements = []
+            self.signature = signature
+            self.rebuild_indexes()
+            return self.product_data
+
+    def is_current(self, signature=None):
+        signature = self.file_signature() if signature is None else signature
+        return self.product_data is not None and signature is not None and signature == self.signature
+
+    def store(self, product_data: dict):
+        '''Called after the catalog has been written, so next load does not parse our own write again'''
+
+        if product_data is not self.product_data:
+            self.product_data = product_data
+            self.rebuild_indexes()
+        self.signature = self.file_signature()
+        self.loaded_version = self.storage.read_version()
+
+    def save(self, product_data: dict = None):
+        '''Persists the catalog. Only products changed since last save are passed to the storage
+        (JSON file in journaled mode appends them, otherwise writes whole file).
+        Inside a batch nothing is written until the batch is committed'''
+
+        if self.batch_depth:
+            return
+        if product_data is not None and product_data is not self.product_data:
+            self.product_data = product_data
+            self.rebuild_indexes()
+            self.storage.write_all(self.product_data)
+        else:
+            self.storage.write_changes(self.pending, self.product_data)
+        self.pending = {}
+        if self.ledger is not None and self.movements:
+            self.ledger.append(self.movements, self.product_data)
+            self.movements = []
+        self.signature = self.file_signature()
+        self.loaded_version = self.storage.read_version()
+        self.notify_indexes("saved")
+
+    def notify_indexes(self, event: str, *args):
+        '''Calls index.saved() / index.discarded() / index.deleted(product_id) on indexes which want to know about it'''
+
+        for index in list(self.indexes):
+            handler = getattr(index, event, None)
+            if handler is not None:
+                handler(*args)
+
+    @contextmanager
+    def locked(self):
+        '''Holds the catalog lock for a read-modify-write. Inside it the cached catalog is checked
+        against the stored version (reloaded if someone else wrote) and no other writer can change it.
+        Inside a batch it does nothing, the batch is checked when it is committed'''
+
+        if self.batch_depth:
+            yield self.load()
+            return
+        with self.storage.lock:
+            if not self.storage.exists():
+                yield self.product_data
+                return
+            if self.product_data is not None and self.storage.read_version() != self.loaded_version:
+                self.signature = None
+            yield self.load()
+
+    def check_version(self, expected_version):
+        '''Raises VersionConflictError when stored catalog is not at expected_version (call it holding the lock)'''
+
+        current_version = self.storage.read_version()
+        if expected_version is not None and current_version != expected_version:
+            raise VersionConflictError(expected_version, current_version)
+
+    def compact(self):
+        '''Folds the journal into a new snapshot of the catalog'''
+
+        self.load()
+        self.storage.compact(self.product_data)
+        self.signature = self.file_signature()
+
+    def begin(self):
+        '''Starts a batch: following changes are kept in memory and written once on commit()'''
+
+        if self.batch_depth == 0:
+            with self.locked():
+                pass  # start the batch from up to date catalog
+            self.undo = {}
+            self.pending_before_batch = dict(self.pending)
+            self.movements_before_batch = len(self.movements)
+        self.batch_depth += 1
+
+    def commit(self):
+        '''Ends a batch, the outermost commit writes all changes of the batch at once'''
+
+        if self.batch_depth == 0:
+            raise RuntimeError("commit() called without begin()")
+        if self.batch_depth > 1:
+            self.batch_depth -= 1
+            return
+        with self.storage.lock:
+            # Optimistic check: batch fails if somebody else wrote since the batch started
+            try:
+                self.check_version(self.loaded_version)
+            except VersionConflictError:
+                self.rollback()
+                self.signature = None
+                raise
+            self.batch_depth = 0
+            self.undo = {}
+            self.save()
+
+    def rollback(self):
+        '''Discards all changes made since begin() (nested batches are discarded as well)'''
+
+        if self.batch_depth == 0:
+            raise RuntimeError("rollback() called without begin()")
+        for product_id, product in self.undo.items():
+            self.replace(product_id, product)
+        self.pending = self.pending_before_batch
+        del self.movements[self.movements_before_batch:]
+        self.undo = {}
+        self.batch_depth = 0
+        self.notify_indexes("discarded")
+
+    def index(self, index_class):
+        '''Returns the index of given class, it is created and built on first use,
+        after that it is kept up to date like the name index'''
+
+        for index in self.indexes:
+            if type(index) is index_class:
+                return index
+        index = index_class()
+        if self.product_data is not None:
+            index.build(self.product_data)
+        self.indexes.append(index)
+        return index
+
+    def rebuild_indexes(self):
+        self.version += 1
+        for index in self.indexes:
+            index.build(self.product_data)
+
+    def put(self, product_id: str, product: dict):
+        '''Adds or replaces a product in cached catalog and keeps indexes up to date.
+        When an index rejects the product, the cache is left as it was and the error is raised'''
+
+        self.storage.check_product(product_id, product)
+        old_product = self.product_data.get(product_id)
+        self.replace(product_id, product)
+        self.remember(product_id, old_product)
+        self.record_movement(product_id, old_product, product)
+        self.pending[product_id] = product
+
+    def delete(self, product_id: str):
+        '''Removes a product from cached catalog and from indexes'''
+
+        if product_id not in self.product_data:
+            raise KeyError(product_id)
+        old_product = self.product_data[product_id]
+        self.replace(product_id, None)
+        self.remember(product_id, old_product)
+        self.record_movement(product_id, old_product, None)
+        self.pending[product_id] = None
+
+    def record_movement(self, product_id: str, old_product: dict, product: dict):
+        # Kept until the change is saved, a rolled back or discarded change leaves no trace in the ledger
+        if self.ledger is not None:
+            self.movements.append((product_id, old_product, product, self.reason))
+
+    def remember(self, product_id: str, old_product: dict):
+        # Inside a batch keep product as it was before the batch, so the batch can be rolled back
+        if self.batch_depth and product_id not in self.undo:
+            self.undo[product_id] = old_product
+
+    def replace(self, product_id: str, product: dict):
+        '''Sets product in cached catalog (removes it when product is None) and updates indexes.
+        If an index fails, the product is put back as it was and indexes are built again before raising'''
+
+        self.version += 1
+        old_product = self.product_data.get(product_id)
+        try:
+            if old_product is not None:
+                for index in self.indexes:
+                    index.remove(product_id, old_product)
+            if product is None:
+                self.product_data.pop(product_id, None)
+                self.notify_indexes("deleted", product_id)
+            else:
+                self.product_data[product_id] = product
+                for index in self.indexes:
+                    index.add(product_id, product)
+        except BaseException:
+            if old_product is None:
+                self.product_data.pop(product_id, None)
+            else:
+                self.product_data[product_id] = old_product
+            self.rebuild_indexes()
+            raise
+
+    def invalidate(self):
+        '''Drops cached catalog and the indexes built from it, next load will read the file again.
+        Indexes created on demand are created again when next used. The name index and indexes
+        which keep settings (low-stock thresholds and callbacks) stay, empty until the next load'''
+
+        self.product_data = None
+        self.signature = None
+        self.pending = {}
+        self.movements = []
+        self.batch_depth = 0
+        self.undo = {}
+        self.indexes = [index for index in self.indexes
+                        if index is self.name_index or getattr(index, "keeps_settings", False)]
+        for index in self.indexes:
+            index.build({})
+
+    def close(self):
+        '''Drops cached catalog and releases files or connections held by the storage'''
+
+        self.invalidate()
+        self.storage.close()
+
+    def stats(self):
+        '''Returns cache hit/miss counters'''
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": self.product_data is not None
+        }
+
+
+# Loads (hits and reloads) and saves of any storage backend are timed while instrumentation is enabled
+instrumentation.register(CatalogCache, ("load", "save", "compact"), "cache")
+
+_shared_caches = {}
+
+
+def shared_cache(file_path="product_catalog.json", journaled=False):
+    '''Returns the one CatalogCache for given catalog file (or StorageBackend),
+    so manager and products share parsed data.
+    Raises ValueError when the catalog is already open with another backend or another journal mode'''
+
+    path = file_path.path if isinstance(file_path, StorageBackend) else file_path
+    key = os.path.abspath(path)
+    if key not in _shared_caches:
+        cache = CatalogCache(file_path)
+        if journaled:
+            cache.enable_journal()
+        _shared_caches[key] = cache
+    cache = _shared_caches[key]
+    if isinstance(file_path, StorageBackend) and cache.storage is not file_path:
+        raise ValueError(f"Catalog '{path}' is already open with another storage backend")
+    if cache.journaled != journaled:
+        raise ValueError(f"Catalog '{path}' is already open {'with' if cache.journaled else 'without'} a journal")
+    return cache
+
+
+def release_cache(file_path="product_catalog.json"):
+    '''Closes the shared CatalogCache of given catalog file (or StorageBackend) and forgets it,
+    so its memory is freed once no manager uses it. Managers still using it have to be closed too'''
+
+    path = file_path.path if isinstance(file_path, StorageBackend) else file_path
+    cache = _shared_caches.pop(os.path.abspath(path), None)
+    if cache is not None:
+        cache.close()
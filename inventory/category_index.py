@@ -0,0 +1,31 @@
+# This module 'category_index.py' is a part of 'Inventory Management System' Projects
+# This module groups product IDs by category, so a category filter visits only products of that category
+
+
+class CategoryIndex:
+    ''' This class keeps {category: product IDs}, updated on every change of a product'''
+
+    def __init__(self):
+        self.ids_by_category = {}
+
+    def build(self, product_data: dict):
+        self.ids_by_category = {}
+        for product_id, product in product_data.items():
+            self.add(product_id, product)
+
+    def add(self, product_id: str, product: dict):
+        # dict is used as an ordered set, IDs stay in the order they were added
+        self.ids_by_category.setdefault(product["category"], {})[product_id] = None
+
+    def remove(self, product_id: str, product: dict):
+        product_ids = self.ids_by_category.get(product["category"])
+        if product_ids is not None:
+            product_ids.pop(product_id, None)
+            if not product_ids:
+                del self.ids_by_category[product["category"]]
+
+    def ids(self, category: str):
+        return self.ids_by_category.get(category, {}).keys()
+
+    def count(self, category: str):
+        return len(self.ids_by_category.get(category, ()))
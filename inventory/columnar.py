@@ -0,0 +1,89 @@
+# This module 'columnar.py' is a part of 'Inventory Management System' Projects
+# This module keeps the catalog as NumPy arrays (one per field), so totals and filters run as vector operations
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, InventoryManager falls back to plain dict loops without it
+    np = None
+
+
+def numpy_available():
+    return np is not None
+
+
+class ColumnarCatalog:
+    ''' This class holds a read-only, column-wise copy of the catalog:
+    product IDs, prices, quantities and category codes, all in catalog order.
+    Totals are exactly rounded sums, the same numbers InventoryAggregates keeps for the dict catalog.
+    '''
+
+    def __init__(self, product_data: dict, version=0):
+        if np is None:
+            raise ImportError("NumPy is required for ColumnarCatalog")
+        self.version = version
+        count = len(product_data)
+        products = product_data.values()
+        self.product_ids = list(product_data)
+        self.price = np.fromiter((product["price"] for product in products), dtype=np.float64, count=count)
+        self.quantity = np.fromiter((product["quantity"] for product in products), dtype=np.float64, count=count)
+        self.categories, self.category_codes = np.unique(
+            np.array([product["category"] for product in products], dtype=object), return_inverse=True)
+        self.categories = list(self.categories)
+        self.positions = None  # product_id -> position, built when a product threshold is used
+
+    def exact_sum(self, values):
+        # math.fsum is correctly rounded, like the fixed-point sums of InventoryAggregates
+        return math.fsum(values.tolist())
+
+    def total_value(self):
+        '''Sum of price * quantity over all products'''
+
+        return self.exact_sum(self.price * self.quantity)
+
+    def category_values(self):
+        '''Returns {category: sum of price * quantity} for all categories'''
+
+        values = self.price * self.quantity
+        return {category: self.exact_sum(values[self.category_codes == code])
+                for code, category in enumerate(self.categories)}
+
+    def ids_where(self, mask):
+        '''Returns product IDs (in catalog order) for which mask is True'''
+
+        return [self.product_ids[i] for i in np.flatnonzero(mask)]
+
+    def ids_in_price_range(self, min_price=None, max_price=None):
+        '''Product IDs with min_price <= price < max_price (either bound can be None)'''
+
+        mask = np.ones(len(self.product_ids), dtype=bool)
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price < max_price
+        return self.ids_where(mask)
+
+    def ids_with_quantity_below(self, quantity):
+        return self.ids_where(self.quantity < quantity)
+
+    def low_stock_ids(self, default_threshold, category_thresholds=None, product_thresholds=None):
+        '''Product IDs (in catalog order) with quantity below their threshold: the one of the product,
+        otherwise of its category, otherwise default_threshold (same rules as LowStockTracker)'''
+
+        thresholds = np.full(len(self.product_ids), float(default_threshold))
+        for category, threshold in (category_thresholds or {}).items():
+            if category in self.categories:
+                thresholds[self.category_codes == self.categories.index(category)] = threshold
+        if product_thresholds:
+            if self.positions is None:
+                self.positions = {product_id: position for position, product_id in enumerate(self.product_ids)}
+            for product_id, threshold in product_thresholds.items():
+                if product_id in self.positions:
+                    thresholds[self.positions[product_id]] = threshold
+        return self.ids_where(self.quantity < thresholds)
+
+    def ids_in_category(self, category):
+        if category not in self.categories:
+            return []
+        return self.ids_where(self.category_codes == self.categories.index(category))
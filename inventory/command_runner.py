@@ -0,0 +1,219 @@
+# This module 'command_runner.py' is a part of 'Inventory Management System' Projects
+# This module runs operations from a JSONL file against one loaded catalog, without the interactive menu
+#   python main.py --run commands.jsonl --output results.jsonl --commit-every 1000
+#
+# One command per line, ex.
+#   {"op": "add", "product_id": "E200", "product_name": "Radio", "quantity": 5, "price": 40, "category": "Electronics"}
+#   {"op": "quantity", "product_name": "Radio", "delta": -2}
+#   {"op": "filter", "category": "Electronics", "max_price": 100}
+
+import contextlib
+import json
+import sys
+from inventory.inventory_manager import InventoryManager
+
+
+class CommandError(ValueError):
+    ''' Raised for a command which cannot be run, it is reported and the other commands go on'''
+
+
+class CommandRunner:
+    ''' This class runs commands (dicts with an "op" key) in a batch of InventoryManager.
+    Changes are kept in memory and written every commit_every commands (or once at the end, when None).
+    Each command validates before it changes anything, so a failing command is reported and leaves no trace.
+
+        add        product_id, product_name, quantity, price, category
+        update     product_id, product_name, quantity, price, category
+        remove     product_id
+        quantity   product_id or product_name, delta, reason (kept in the stock ledger)
+        price      product_id or product_name, price
+        discount   product_id or product_name, percentage (0 - 100)
+        reprice    action (discount, markup, set or round), percentage / price / ending and step,
+                   category and/or product_ids, dry_run
+        get        product_id
+        search     product_name
+        complete   prefix, limit (names starting with prefix)
+        fuzzy      query, limit (names similar to query, typos allowed)
+        filter     category, min_price, max_price, max_quantity, order_by, descending, limit, offset
+        low_stock
+        aggregates
+    '''
+
+    def __init__(self, manager: InventoryManager, commit_every=None):
+        if commit_every is not None and commit_every < 1:
+            raise ValueError("commit_every must be at least 1")
+        self.manager = manager
+        self.commit_every = commit_every
+        self.operations = {
+            "add": self.add, "update": self.update, "remove": self.remove, "quantity": self.change_quantity,
+            "price": self.set_price, "discount": self.apply_discount, "reprice": self.reprice, "get": self.get, "search": self.search,
+            "complete": self.complete, "fuzzy": self.fuzzy, "filter": self.filter, "low_stock": self.low_stock, "aggregates": self.aggregates
+        }
+
+    def run(self, lines, output):
+        '''Runs commands from lines (JSON text each) and writes one JSON result per command to output.
+        Messages printed by the manager go to standard error, so they never mix with results written
+        to standard output. Returns {"commands", "errors", "commits"}'''
+
+        with contextlib.redirect_stdout(sys.stderr):
+            return self.run_commands(lines, output)
+
+    def run_commands(self, lines, output):
+        summary = {"commands": 0, "errors": 0, "commits": 0}
+        uncommitted = 0
+        self.manager.begin()
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                record = self.run_line(line_number, line)
+                summary["commands"] += 1
+                summary["errors"] += not record["ok"]
+                output.write(json.dumps(record) + "\n")
+                uncommitted += 1
+                if self.commit_every is not None and uncommitted >= self.commit_every:
+                    self.commit(output, summary, uncommitted)
+                    uncommitted = 0
+                    self.manager.begin()
+        except BaseException:
+            self.manager.rollback()
+            raise
+        self.commit(output, summary, uncommitted)
+        return summary
+
+    def commit(self, output, summary, commands):
+        try:
+            self.manager.commit()
+        except Exception as e:  # ex. VersionConflictError, the changes of these commands are not kept
+            summary["errors"] += 1
+            output.write(json.dumps({"op": "commit", "ok": False, "commands": commands, "error": str(e)}) + "\n")
+        else:
+            summary["commits"] += 1
+            output.write(json.dumps({"op": "commit", "ok": True, "commands": commands}) + "\n")
+
+    def run_line(self, line_number: int, line: str):
+        try:
+            command = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"line": line_number, "ok": False, "error": f"Invalid JSON: {e}"}
+        op = command.get("op") if isinstance(command, dict) else None
+        try:
+            if op not in self.operations:
+                raise CommandError(f"Unknown operation '{op}'")
+            self.manager.product_data = self.manager.read_product_data()
+            result = self.operations[op](command)
+        except (ValueError, TypeError, NameError, KeyError) as e:
+            message = f"Missing field {e}" if isinstance(e, KeyError) else str(e)
+            return {"line": line_number, "op": op, "ok": False, "error": message}
+        return {"line": line_number, "op": op, "ok": True, "result": result}
+
+    def find(self, command: dict):
+        '''Returns ID of product given by "product_id" or "product_name" of the command'''
+
+        if "product_id" in command:
+            product_id = command["product_id"]
+        elif "product_name" in command:
+            product_id = self.manager.cache.name_index.lookup(command["product_name"])
+            if product_id is None:
+                raise CommandError(f"Product '{command['product_name']}' not found")
+        else:
+            raise CommandError("Command needs product_id or product_name")
+        if product_id not in self.manager.product_data:
+            raise CommandError(f"Product with ID {product_id} not found")
+        return product_id
+
+    def add(self, command: dict):
+        product_id, product = self.manager.product_from_row(command)
+        self.manager.cache.put(product_id, product)
+        return {"product_id": product_id, **product}
+
+    def update(self, command: dict):
+        self.find({"product_id": command.get("product_id")})
+        product_id, product = self.manager.product_from_row(command, update_existing=True)
+        self.manager.cache.put(product_id, product)
+        return {"product_id": product_id, **product}
+
+    def remove(self, command: dict):
+        product_id = self.find({"product_id": command.get("product_id")})
+        self.manager.cache.delete(product_id)
+        return {"product_id": product_id}
+
+    # Inside the batch the manager keeps changes in memory, they are written on commit
+    def change_quantity(self, command: dict):
+        product_id = self.find(command)
+        return {"product_id": product_id, "quantity": self.manager.increment_quantity(
+            product_id, float(command["delta"]), reason=command.get("reason"))}
+
+    def set_price(self, command: dict):
+        product_id = self.find(command)
+        return {"product_id": product_id, "price": self.manager.update_price(product_id, float(command["price"]))}
+
+    def apply_discount(self, command: dict):
+        product_id = self.find(command)
+        return {"product_id": product_id,
+                "price": self.manager.apply_discount(product_id, float(command["percentage"]))}
+
+    def reprice(self, command: dict):
+        targets = {"category": command.get("category"), "product_ids": command.get("product_ids"),
+                   "dry_run": bool(command.get("dry_run"))}
+        action = command.get("action")
+        if action == "discount":
+            return self.manager.bulk_discount(float(command["percentage"]), **targets)
+        if action == "markup":
+            return self.manager.bulk_markup(float(command["percentage"]), **targets)
+        if action == "set":
+            return self.manager.bulk_set_price(float(command["price"]), **targets)
+        if action == "round":
+            return self.manager.bulk_round_prices(float(command.get("ending", 0.99)), float(command.get("step", 1.0)),
+                                                  **targets)
+        raise CommandError(f"Unknown reprice action '{action}'")
+
+    def get(self, command: dict):
+        product_id = self.find({"product_id": command.get("product_id")})
+        return {"product_id": product_id, **self.manager.product_data[product_id]}
+
+    def search(self, command: dict):
+        # DuplicateProductNameError is reported like other errors
+        product_id = self.find({"product_name": command["product_name"]})
+        return {"product_id": product_id, **self.manager.product_data[product_id]}
+
+    def complete(self, command: dict):
+        products = self.manager.search_by_prefix(command["prefix"], int(command.get("limit", 10)))
+        return [{"product_id": product_id, **product} for product_id, product in products]
+
+    def fuzzy(self, command: dict):
+        products = self.manager.fuzzy_search(command["query"], int(command.get("limit", 10)))
+        return [{"product_id": product_id, **product} for product_id, product in products]
+
+    def filter(self, command: dict):
+        query = self.manager.query()
+        if "category" in command:
+            query.where(category=command["category"])
+        if "min_price" in command or "max_price" in command:
+            query.price_between(command.get("min_price"), command.get("max_price"))
+        if "max_quantity" in command:
+            query.quantity_below(command["max_quantity"])
+        if "order_by" in command:
+            query.order_by(command["order_by"], bool(command.get("descending")))
+        if "limit" in command:
+            query.limit(command["limit"])
+        if "offset" in command:
+            query.offset(command["offset"])
+        return [{"product_id": product_id, **product} for product_id, product in query]
+
+    def low_stock(self, command: dict):
+        return [{"product_id": product_id, **product} for product_id, product in self.manager.low_stock_products()]
+
+    def aggregates(self, command: dict):
+        return self.manager.get_aggregates()
+
+
+def run_command_file(manager: InventoryManager, commands_path, output_path=None, commit_every=None):
+    '''Runs commands of a JSONL file, writes results as JSONL to output_path (standard output when None)'''
+
+    runner = CommandRunner(manager, commit_every)
+    with open(commands_path, "r") as commands:
+        if output_path is None:
+            return runner.run(commands, sys.stdout)
+        with open(output_path, "w") as output:
+            return runner.run(commands, output)
@@ -0,0 +1,46 @@
+# This module 'http_client.py' is a part of 'Inventory Management System' Projects
+# This module is a minimal asyncio HTTP/1.1 client for the inventory service (keep-alive, JSON bodies)
+
+import asyncio
+import json
+
+
+class ServiceConnection:
+    ''' This class keeps one connection to the inventory service and sends JSON requests over it'''
+
+    def __init__(self, host="127.0.0.1", port=8080):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def request(self, method: str, path: str, body=None):
+        '''Sends a request, returns (status code, decoded JSON response)'''
+
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n")
+        self.writer.write(head.encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self.reader.readexactly(length) if length else b""
+        return status, (json.loads(data) if data else None)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
@@ -0,0 +1,169 @@
+# This module 'instrumentation.py' is a part of 'Inventory Management System' Projects
+# This module counts and times InventoryManager and Product operations and catalog file reads and writes.
+# It is off by default: enable() replaces registered methods with timed wrappers and disable() puts
+# the original methods back, so when it is off the methods run exactly as written, with no extra calls.
+#   from inventory.instrumentation import instrumentation
+#   instrumentation.enable()
+#   ...
+#   manager.stats()
+
+import bisect
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+
+# Upper bounds (seconds) of latency histogram buckets, the last bucket takes everything slower
+LATENCY_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+BUCKET_LABELS = ("<=1us", "<=10us", "<=100us", "<=1ms", "<=10ms", "<=100ms", "<=1s", "<=10s", ">10s")
+
+
+class LatencyHistogram:
+    ''' Call count, total, max and counts per latency bucket of one operation'''
+
+    __slots__ = ("count", "total_seconds", "max_seconds", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * len(BUCKET_LABELS)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def to_dict(self):
+        return {
+            "calls": self.count,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "histogram": {label: count for label, count in zip(BUCKET_LABELS, self.buckets) if count}
+        }
+
+
+class Instrumentation:
+    ''' Collects operation latencies and file I/O counters for the whole process'''
+
+    def __init__(self):
+        self.enabled = False
+        self.registered = []  # (class, method name, operation name)
+        self.originals = {}  # (class, method name) -> method replaced while enabled
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+            self.file_io = {"reads": 0, "read_bytes": 0, "read_seconds": 0.0, "parse_seconds": 0.0,
+                            "writes": 0, "write_bytes": 0, "write_seconds": 0.0, "serialize_seconds": 0.0}
+
+    def register(self, cls, method_names, prefix: str):
+        '''Registers methods of cls to be timed as "<prefix>.<method name>" while instrumentation is enabled'''
+
+        for name in method_names:
+            self.registered.append((cls, name, f"{prefix}.{name}"))
+        if self.enabled:
+            self.install()
+
+    def enable(self):
+        self.enabled = True
+        self.install()
+
+    def disable(self):
+        self.enabled = False
+        for (cls, name), method in self.originals.items():
+            setattr(cls, name, method)
+        self.originals = {}
+
+    def install(self):
+        for cls, name, operation in self.registered:
+            if (cls, name) not in self.originals:
+                self.originals[(cls, name)] = cls.__dict__[name]
+                setattr(cls, name, self.timed(cls.__dict__[name], operation))
+
+    def timed(self, method, operation: str):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(operation, time.perf_counter() - started)
+        return wrapper
+
+    def record(self, operation: str, seconds: float):
+        with self.lock:
+            histogram = self.operations.get(operation)
+            if histogram is None:
+                histogram = self.operations[operation] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def record_read(self, size: int, read_seconds: float, parse_seconds: float):
+        # Called by storage only when self.enabled, a read is raw file read then parsing
+        with self.lock:
+            self.file_io["reads"] += 1
+            self.file_io["read_bytes"] += size
+            self.file_io["read_seconds"] += read_seconds
+            self.file_io["parse_seconds"] += parse_seconds
+
+    def record_write(self, size: int, write_seconds: float, serialize_seconds: float):
+        with self.lock:
+            self.file_io["writes"] += 1
+            self.file_io["write_bytes"] += size
+            self.file_io["write_seconds"] += write_seconds
+            self.file_io["serialize_seconds"] += serialize_seconds
+
+    def stats(self):
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "operations": {name: histogram.to_dict() for name, histogram in sorted(self.operations.items())},
+                "file_io": dict(self.file_io)
+            }
+
+    def dump(self, path, extra=None):
+        '''Writes stats (with extra entries added) to a JSON file'''
+
+        stats = self.stats()
+        stats.update(extra or {})
+        with open(path, "w") as file:
+            json.dump(stats, file, indent=4)
+
+
+instrumentation = Instrumentation()
+
+
+def profile_call(function, *args, profiler="cprofile", limit=20, **kwargs):
+    '''Runs function(*args, **kwargs) once under cProfile ("cprofile") or tracemalloc ("tracemalloc"),
+    returns (result, text report): top functions by cumulative time, or top allocating lines with peak memory'''
+
+    if profiler == "cprofile":
+        profile = cProfile.Profile()
+        result = profile.runcall(function, *args, **kwargs)
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(limit)
+        return result, report.getvalue()
+    if profiler == "tracemalloc":
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            result = function(*args, **kwargs)
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not already_tracing:
+                tracemalloc.stop()
+        lines = [f"Peak memory: {peak} bytes, still allocated: {current} bytes"]
+        lines += [str(statistic) for statistic in snapshot.statistics("lineno")[:limit]]
+        return result, "\n".join(lines)
+    raise ValueError(f"Unknown profiler '{profiler}', use 'cprofile' or 'tracemalloc'")
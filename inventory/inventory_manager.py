@@ -1,32 +1,83 @@
 # This module 'inventory_manager.py' is a part of 'Inventory Management System' Projects
 # This module handles operations related to managing inventory which consists of different products
 
+import heapq
 import json
+import math
+from contextlib import contextmanager
 from pathlib import Path
 from inventory.product import Product
+from inventory.catalog_cache import release_cache, shared_cache
+from inventory.bulk_io import read_records, parse_row, write_rows, chunked
+from inventory.columnar import ColumnarCatalog, numpy_available
+from inventory.price_index import PriceIndex
+from inventory.query import Query
+from inventory.aggregates import InventoryAggregates, summarize
+from inventory.low_stock import LowStockTracker
+from inventory.name_index import DuplicateProductNameError
+from inventory import pricing
+from inventory.category_index import CategoryIndex
+from inventory.name_search import NameTrie, NGramIndex, scan_fuzzy, scan_prefix
+from inventory.storage import check_conditions, matches_conditions
+from inventory.instrumentation import instrumentation, profile_call
 import re
 
+# Patterns are compiled once, validation runs for every added product and every imported row
+PRODUCT_ID_PATTERN = re.compile(r"^[A-Z]\d{3}$")
+# Wider IDs for big catalogs (ex. 'E100', 'EL1000042'), pass it as InventoryManager(product_id_pattern=...)
+WIDE_PRODUCT_ID_PATTERN = re.compile(r"^[A-Z]{1,3}\d{3,9}$")
+PRODUCT_NAME_PATTERN = re.compile(r"^[A-Za-z]+[_\d\s-]*[A-Za-z\d]+$")
+# ex. 'iphone', 'Iphone10', 'iphone-10', 'iphone_10', 'my iphone' ..ect
+CATEGORY_LIST = ["Electronics", "electronics", "Furniture", "furniture", "Clothes", "clothes", "Footwear", "footware"]
+CATEGORY_OPTIONS = {"1": "Electronics", "2": "Furniture", "3": "Footwear", "4": "Clothes"}
+
 
 class InventoryManager:
     ''' This class provides objects for management, ie "manager" of inventory'''
 
-    def __init__(self, file_path="product_catalog.json"):
-        self.database = Path(file_path)
+    def __init__(self, file_path="product_catalog.json", journaled=False, columnar=False, backend=None,
+                 streaming=False, product_id_pattern=PRODUCT_ID_PATTERN, ledger=False, snapshot_every=1000):
+        # Catalog is kept in "product_catalog.json" by default, a .db/.sqlite file is kept in SQLite,
+        # any other StorageBackend can be given as backend
+        self.database = Path(file_path) if backend is None else Path(backend.path)
         self.json_file_available = False
         self.product_data = {}
+        # With journaled=True changes are appended to "product_catalog.journal.jsonl" instead of rewriting
+        # whole catalog. All managers of one catalog share its cache, so they have to use the same mode
+        self.cache = shared_cache(self.database if backend is None else backend, journaled)
+        self.storage = self.cache.storage
+        if ledger:
+            # Every saved change is also appended to "product_catalog.ledger.jsonl", with a snapshot
+            # of the catalog every snapshot_every changes, see StockLedger
+            self.cache.enable_ledger(snapshot_every)
+        # With columnar=True (and NumPy installed) totals and filters run over NumPy arrays
+        self.columnar = columnar
+        self.columnar_view = None
+        # With streaming=True read-only operations (search, filters, aggregates, export) read products
+        # one by one from storage instead of loading the catalog, for catalogs bigger than memory
+        self.streaming = streaming
+        if isinstance(product_id_pattern, str):
+            product_id_pattern = re.compile(product_id_pattern)
+        self.product_id_pattern = product_id_pattern
 
     def read_product_data(self):
-        '''Reads the product data from the JSON file.'''
+        '''Reads the product data from the JSON file.
+        Parsed data is cached, file is parsed again only when it changed on disk.'''
 
-        if not self.database.exists():
+        if not self.storage.exists():
+            # A new catalog is started once. After that the cached catalog may hold changes not written yet
+            # (ex. products added inside a batch), so it is not replaced
+            if self.cache.product_data is not None:
+                self.product_data = self.cache.product_data
+                return self.product_data
             print("Product catalog file does not exist. Returning an empty inventory.")
-            return {}  # Return an empty dictionary if the file doesn't exist or self.product_data
+            self.cache.store({})
+            return self.cache.product_data  # Return an empty dictionary if the file doesn't exist or self.product_data
 
         try:
-            with open(self.database, "r") as file:
-                self.json_file_available = True  # The file is available and has been read successfully.
-                self.product_data = json.load(file)
-                return self.product_data
+            self.product_data = self.cache.load()
+            self.json_file_available = True  # The file is available and has been read successfully.
+            return self.product_data
         except (json.JSONDecodeError, FileNotFoundError) as e:
             print(f"Error reading the file: {e}")
             return {}  # Return an empty dictionary in case of errors
@@ -35,46 +86,163 @@ class InventoryManager:
         '''This method will be called to save changes made to database.
         Here changes to database are, like add_product, update_product'''
 
-        with open(self.database, "w") as file:
-            json.dump(self.product_data, file, indent=4)
+        self.cache.save(self.product_data)
 
-    def add_product(self, product_id: str, product: Product):
-        '''With this method, manager can add product of type Product to database'''
+    def begin(self):
+        '''Starts a batch, changes are made in memory and written once on commit()'''
 
         self.product_data = self.read_product_data()
-        if product_id not in self.product_data and self.valid_product_id(product_id):
-            if self.validate_product(product):
-                self.product_data[product_id] = product.to_dict()
-                self.save_product()
-                print("\n")
-                print(f"Product with ID '{product_id}' added successfully.")
-                print("\n")
-        else:
-            print("Something went wrong, product cannot be added")
+        self.cache.begin()
+
+    def commit(self):
+        '''Writes all changes made since begin() at once'''
+
+        self.cache.commit()
+
+    def rollback(self):
+        '''Discards all changes made since begin()'''
+
+        self.cache.rollback()
+
+    @contextmanager
+    def batch(self):
+        '''Groups many changes into one write:
+            with manager.batch():
+                manager.add_product(...)
+                manager.update_product(...)
+        If anything inside the block fails, none of the changes are kept.
+        '''
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            # An inner batch failing with the same exception has already rolled back the whole batch
+            if self.cache.batch_depth:
+                self.rollback()
+            raise
+        self.commit()
+
+    def report_failure(self, message: str):
+        '''Prints why a change was not made. Inside a batch the whole batch has to fail, so it raises instead'''
+
+        if self.cache.batch_depth:
+            raise ValueError(message)
+        print(message)
+
+    def compact(self):
+        '''In journaled mode, folds the journal back into "product_catalog.json"'''
+
+        self.cache.compact()
 
-    def update_product(self, product_id: str, updated_product: Product):
-        '''With this method already present product in daabase can be modified/updated'''
+    def invalidate(self):
+        '''Drops cached catalog, so next call reads "product_catalog.json" again'''
 
+        self.product_data = {}
+        self.columnar_view = None
+        self.cache.invalidate()
+
+    def close(self):
+        '''Releases the cached catalog of this manager's catalog file and its indexes (shared by all managers
+        of that file), ex. when done with one of many catalogs. A manager created afterwards starts a new cache'''
+
+        self.invalidate()
+        release_cache(self.storage)
+
+    def cache_stats(self):
+        '''Returns hit/miss counters of catalog cache'''
+
+        return self.cache.stats()
+
+    def stats(self):
+        '''Returns collected instrumentation: calls and latency histogram per operation, catalog file reads
+        and writes (bytes, read/parse and serialize/write seconds) and cache hit/miss counters.
+        Operations are collected only after instrumentation.enable()'''
+
+        stats = instrumentation.stats()
+        stats["cache"] = self.cache_stats()
+        return stats
+
+    def dump_stats(self, path):
+        '''Writes stats() to a JSON file'''
+
+        instrumentation.dump(path, {"cache": self.cache_stats()})
+
+    def profile_operation(self, operation: str, *args, profiler="cprofile", **kwargs):
+        '''Runs one manager operation (ex. "get_total_inventory_value") under cProfile or tracemalloc,
+        returns (result, text report)'''
+
+        return profile_call(getattr(self, operation), *args, profiler=profiler, **kwargs)
+
+    def columnar_catalog(self):
+        '''Returns ColumnarCatalog of current catalog, or None when columnar mode is off or NumPy is missing.
+        Arrays are built again only after the catalog has changed'''
+
+        if not (self.columnar and numpy_available()):
+            return None
         self.product_data = self.read_product_data()
-        if product_id not in self.product_data:
-            print(f"There is no product with given product_id '{product_id}'")
-            return False
-        elif not (isinstance(updated_product, Product)):
-            raise TypeError("updated_product must be of type 'Product'")
-        elif self.validate_product(updated_product):
-            # self.product_data[product_id] = vars(updated_product)
-            data = updated_product.to_dict()
-            self.product_data[product_id] = data
-            self.save_product()
-            return True
-        else:
-            print("Something went wrong, product cannot be updated")
+        if self.columnar_view is None or self.columnar_view.version != self.cache.version:
+            self.columnar_view = ColumnarCatalog(self.product_data, self.cache.version)
+        return self.columnar_view
+
+    def iter_products(self, **conditions):
+        '''Yields (product_id, product) matching scan conditions (see storage.SCAN_CONDITIONS).
+        In streaming mode products are read from storage one at a time, so memory use does not grow
+        with the catalog and the caller can stop early. Otherwise the cached catalog is used'''
+
+        if self.streaming and not self.cache.batch_depth:  # a batch has uncommitted changes in memory only
+            if self.storage.exists():
+                yield from self.storage.scan(**conditions)
+            return
+        check_conditions(conditions)
+        self.product_data = self.read_product_data()
+        for product_id, product in list(self.product_data.items()):
+            if matches_conditions(product, conditions):
+                yield product_id, product
+
+    def products_with_ids(self, product_ids):
+        return [(product_id, self.product_data[product_id]) for product_id in product_ids]
+
+    def add_product(self, product_id: str, product: Product):
+        '''With this method, manager can add product of type Product to database'''
+
+        with self.cache.locked():  # nobody else writes between reading and saving
+            self.product_data = self.read_product_data()
+            if product_id not in self.product_data and self.valid_product_id(product_id):
+                if self.validate_product(product):
+                    self.cache.put(product_id, product.to_dict())
+                    self.save_product()
+                    print("\n")
+                    print(f"Product with ID '{product_id}' added successfully.")
+                    print("\n")
+            else:
+                self.report_failure("Something went wrong, product cannot be added")
+
+    def update_product(self, product_id: str, updated_product: Product, expected_version=None):
+        '''With this method already present product in daabase can be modified/updated.
+        With expected_version (see catalog_version()) it fails with VersionConflictError
+        if someone else changed the catalog in the meantime'''
+
+        with self.cache.locked():
+            self.cache.check_version(expected_version)
+            self.product_data = self.read_product_data()
+            if product_id not in self.product_data:
+                self.report_failure(f"There is no product with given product_id '{product_id}'")
+                return False
+            elif not (isinstance(updated_product, Product)):
+                raise TypeError("updated_product must be of type 'Product'")
+            elif self.validate_product(updated_product):
+                # self.product_data[product_id] = vars(updated_product)
+                data = updated_product.to_dict()
+                self.cache.put(product_id, data)
+                self.save_product()
+                return True
+            else:
+                self.report_failure("Something went wrong, product cannot be updated")
 
     def valid_product_id(self, product_id: str):
         '''Each product has a unique Id, which should follow given pattern'''
 
-        pattern = r"^[A-Z]\d{3}$"
-        if re.match(pattern, product_id):
+        if self.product_id_pattern.match(product_id):
             return True
         raise ValueError("Product ID must be a valid product ID.")
 
@@ -83,103 +251,461 @@ class InventoryManager:
         if quantity, and price is of float type, and category is from the given list
         '''
 
-        pattern = r"^[A-Za-z]+[_\d\s-]*[A-Za-z\d]+$"
-        # ex. 'iphone', 'Iphone10', 'iphone-10', 'iphone_10', 'my iphone' ..ect
-
-        category_list = ["Electronics", "electronics", "Furniture", "furniture", "Clothes", "clothes", "Footwear", "footware"]
-
         if not (isinstance(product, Product)):
             raise TypeError("Type of product is not 'Product'")
+        return self.validate_fields(product.product_name, product.quantity, product.price, product.category)
+
+    def validate_fields(self, product_name, quantity, price, category):
+        '''Same checks as validate_product, for product given by its fields (ex. a row of imported file)'''
+
         # Makes sure quantity and quality is not zero 
-        elif not (product.product_name and product.quantity and product.price and product.category):
+        if not (product_name and quantity and price and category):
             raise TypeError("Product can not be empty")
-        elif not (re.match(pattern, product.product_name)):
+        elif not (PRODUCT_NAME_PATTERN.match(product_name)):
             raise NameError("product_name does not follow required pattern")
-        elif product.category not in category_list:
+        elif category not in CATEGORY_LIST:
             raise NameError("Category not in list")
-        elif not ((isinstance(product.price, float)) and (isinstance(product.quantity, float))):
+        elif not ((isinstance(price, float)) and (isinstance(quantity, float))):
             raise TypeError("price and quantity should be of type float")
+        elif not (math.isfinite(quantity) and math.isfinite(price)):
+            raise ValueError("Quantity and price must be finite numbers")
         else:
             return True
 
-    def search_product_by_name(self, product_name: str):
-        ''' This method searches product in "product_catalog.json" by name of product'''
+    def product_from_row(self, row: dict, update_existing=False):
+        '''Converts and validates one imported row, returns (product_id, product dict)'''
 
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object with product fields")
+        product_id = row.get("product_id")
+        if not isinstance(product_id, str):
+            raise ValueError("Product ID must be a valid product ID.")
+        product_id = product_id.strip()
+        self.valid_product_id(product_id)
+        if product_id in self.product_data and not update_existing:
+            raise ValueError(f"Product with ID '{product_id}' already exists")
+        product = {
+            "product_name": str(row.get("product_name") or "").strip(),
+            "quantity": float(row.get("quantity")),
+            "price": float(row.get("price")),
+            "category": str(row.get("category") or "").strip()
+        }
+        self.validate_fields(**product)
+        return product_id, product
+
+    def import_products(self, source, file_format=None, chunk_size=1000, update_existing=False):
+        '''Imports products from a CSV or JSONL file, or from any iterable of dicts, with keys:
+        product_id, product_name, quantity, price, category.
+        Rows are read one at a time, validated and committed in chunks of chunk_size products.
+        Invalid rows are skipped and reported: {"imported": n, "errors": [{"row", "product_id", "error"}]}
+        '''
+        if isinstance(source, (str, Path)):
+            source = read_records(source, file_format)
         self.product_data = self.read_product_data()
-        for product_id, product in self.product_data.items():
-            if product_name.lower() == (product["product_name"]).lower():
-                return product
-        else:
+        report = {"imported": 0, "errors": []}
+        for chunk in chunked(enumerate(source, start=1), chunk_size):
+            self.cache.begin()
+            try:
+                for row_number, row in chunk:
+                    try:
+                        row = parse_row(row)
+                        product_id, product = self.product_from_row(row, update_existing)
+                    except (TypeError, NameError, ValueError) as e:
+                        product_id = row.get("product_id") if isinstance(row, dict) else None
+                        report["errors"].append({"row": row_number, "product_id": product_id, "error": str(e)})
+                        continue
+                    self.cache.put(product_id, product)
+                    report["imported"] += 1
+            except BaseException:
+                self.cache.rollback()
+                raise
+            self.cache.commit()
+        return report
+
+    def export_products(self, path, file_format=None):
+        '''Writes all products to a CSV or JSONL file, returns number of exported products'''
+
+        rows = ({"product_id": product_id, **product} for product_id, product in self.iter_products())
+        return write_rows(path, rows, file_format)
+
+    def find_product_id(self, product_name: str):
+        ''' Returns ID of product with given name (case-insensitive), None if there is no such product.
+        Raises DuplicateProductNameError when more than one product has given name.
+        In streaming mode all stored products are scanned, so a second product with the name is found too'''
+
+        if self.streaming:
+            return self.scan_by_name(product_name)[0]
+        self.product_data = self.read_product_data()
+        return self.cache.name_index.lookup(product_name)
+
+    def scan_by_name(self, product_name: str):
+        '''Streaming lookup by name, returns (product_id, product) or (None, None), raises like the name index'''
+
+        matches = list(self.iter_products(product_name=product_name))
+        if len(matches) > 1:
+            raise DuplicateProductNameError(product_name, [product_id for product_id, product in matches])
+        return matches[0] if matches else (None, None)
+
+    def search_product_by_name(self, product_name: str):
+        ''' This method searches product in "product_catalog.json" by name of product (case-insensitive).
+        Raises DuplicateProductNameError when more than one product has given name'''
+
+        if self.streaming:
+            product_id, product = self.scan_by_name(product_name)
+            return False if product_id is None else product
+        product_id = self.find_product_id(product_name)
+        if product_id is None:
             return False
+        return self.product_data[product_id]
+
+    def search_by_prefix(self, prefix: str, limit=10):
+        ''' Returns up to limit (product_id, product) whose name starts with prefix (case-insensitive),
+        for autocomplete: shortest names first, then alphabetical. Uses a trie of names, kept up to date
+        on every change; in streaming mode stored products are scanned instead'''
+
+        if self.streaming and not self.cache.batch_depth:
+            return scan_prefix(self.iter_products(), prefix, limit)
+        self.product_data = self.read_product_data()
+        return self.products_with_ids(product_id for name, product_id in self.cache.index(NameTrie).complete(prefix, limit))
+
+    def fuzzy_search(self, query: str, limit=10, max_typos=None):
+        ''' Returns up to limit (product_id, product) whose name is similar to query, most similar first.
+        Tolerates typos (by default one in queries up to 5 letters, two in longer ones), ex. "iphnoe" finds
+        "iphone_11". Uses an index of name trigrams; in streaming mode stored products are scanned instead'''
+
+        if self.streaming and not self.cache.batch_depth:
+            return scan_fuzzy(self.iter_products(), query, limit, max_typos)
+        self.product_data = self.read_product_data()
+        matches = self.cache.index(NGramIndex).search(query, limit, max_typos)
+        return self.products_with_ids(product_id for score, product_id in matches)
 
-    def get_total_inventory_value(self):
-        ''' This method provides total value of inventory '''
+    def get_total_inventory_value(self, as_of=None):
+        ''' This method provides total value of inventory.
+        With as_of (datetime or seconds since epoch) it is the value at that time, from the stock ledger '''
 
+        if as_of is not None:
+            return self.stock_ledger().total_value_at(as_of)
         if not self.database:
             print("Error: The product catalog file is not available. Cannot calculate total inventory value.")
             return 0  # Return 0 since we can't calculate the total value 
-        total_value: float = 0.0
+        if self.streaming and not self.cache.batch_depth:
+            # Summed by the storage, a binary catalog reads its mapped records without copying them
+            return self.storage.total_value() if self.storage.exists() else 0
+        columns = self.columnar_catalog()
+        if columns is not None:
+            return columns.total_value()
+        return self.get_aggregates()["total_value"]
+
+    def get_category_values(self):
+        ''' This method provides value of inventory per category, {category: value}'''
+
+        columns = self.columnar_catalog()
+        if columns is not None and not self.streaming:
+            return columns.category_values()
+        return self.get_aggregates()["value_by_category"]
+
+    def get_aggregates(self):
+        ''' Returns inventory totals: total_value, total_units, product_count, the same per category,
+        and min_price/max_price. They are kept up to date on every change, so this does not scan the catalog.
+        In streaming mode they are computed in one pass over stored products'''
+
+        if self.streaming and not self.cache.batch_depth:
+            return self.storage.aggregates() if self.storage.exists() else summarize([])
         self.product_data = self.read_product_data()
-        for product_id, product in self.product_data.items():
-            total_value += product["price"] * product["quantity"]
-        return total_value
+        aggregates = self.cache.index(InventoryAggregates).summary()
+        prices = self.cache.index(PriceIndex).entries
+        aggregates["min_price"] = prices[0][0] if prices else None
+        aggregates["max_price"] = prices[-1][0] if prices else None
+        return aggregates
 
-    def remove_product(self, product_id: str):
+    def verify_aggregates(self):
+        ''' Recomputes aggregates from the catalog, returns differences to maintained ones (empty dict if none)'''
+
+        self.product_data = self.read_product_data()
+        return self.cache.index(InventoryAggregates).verify(self.product_data)
+
+    def remove_product(self, product_id: str, expected_version=None):
         ''' This method removes a product from inventory, when given correct product_id.
         And also updates 'product_catalog.json'
         '''
         if not self.database:
             print("Error: The product catalog file is not available. Cannot remove product.")
             return
-        self.product_data = self.read_product_data()
-        if product_id in self.product_data:
-            del self.product_data[product_id]
+        with self.cache.locked():
+            self.cache.check_version(expected_version)
+            self.product_data = self.read_product_data()
+            if product_id in self.product_data:
+                self.cache.delete(product_id)
+                self.save_product()
+                print(f"Product with ID {product_id} has been removed from the inventory.")
+            else:
+                self.report_failure(f"Product with ID {product_id} not found.")
+
+    def change_product(self, product_id: str, change, expected_version=None, reason=None):
+        ''' Applies change(product) to a Product made from the stored product and saves the result,
+        under the catalog lock, so changes made at the same time by other threads or processes are not lost.
+        Returns the changed Product, or None when there is no product with given ID.
+        reason is recorded in the stock ledger, when it is enabled'''
+
+        with self.cache.locked(), self.movement_reason(reason):
+            self.cache.check_version(expected_version)
+            self.product_data = self.read_product_data()
+            if product_id not in self.product_data:
+                self.report_failure(f"Product with ID {product_id} not found.")
+                return None
+            product = Product(**self.product_data[product_id])
+            change(product)
+            self.cache.put(product_id, product.to_dict())
             self.save_product()
-            print(f"Product with ID {product_id} has been removed from the inventory.")
+            return product
+
+    def increment_quantity(self, product_id: str, delta: float, expected_version=None, reason=None):
+        ''' Adds delta (can be negative) to quantity of product, returns new quantity'''
+
+        product = self.change_product(product_id, lambda product: product.update_quantity(delta), expected_version,
+                                      reason)
+        return None if product is None else product.quantity
+
+    def update_price(self, product_id: str, new_price: float, expected_version=None, reason=None):
+        ''' Sets price of product, returns new price'''
+
+        product = self.change_product(product_id, lambda product: product.update_price(new_price), expected_version,
+                                      reason)
+        return None if product is None else product.price
+
+    def apply_discount(self, product_id: str, discount_percentage: float, expected_version=None, reason=None):
+        ''' Lowers price of product by discount_percentage (0 - 100), returns new price'''
+
+        product = self.change_product(product_id, lambda product: product.apply_discount(discount_percentage),
+                                      expected_version, reason)
+        return None if product is None else product.price
+
+    @contextmanager
+    def movement_reason(self, reason):
+        '''Changes made inside the block are recorded in the stock ledger with given reason:
+            with manager.movement_reason("stocktake"):
+                manager.update_product(...)
+        Without a reason the ledger records the kind of change ("added", "removed", "quantity", "price")'''
+
+        if reason is None:
+            yield
+            return
+        previous = self.cache.reason
+        self.cache.reason = reason
+        try:
+            yield
+        finally:
+            self.cache.reason = previous
+
+    def stock_ledger(self):
+        '''Returns the StockLedger of the catalog, raises ValueError when the ledger is not enabled'''
+
+        if self.cache.ledger is None:
+            raise ValueError("Stock ledger is not enabled, use InventoryManager(..., ledger=True)")
+        return self.cache.ledger
+
+    def products_as_of(self, when):
+        ''' Returns the catalog {product_id: product} as it was at given time (datetime or seconds since epoch)'''
+
+        return self.stock_ledger().products_at(when)
+
+    def stock_movements(self, start=None, end=None, product_id=None, category=None):
+        ''' Yields stock ledger records of changes made between start and end (end excluded, either can be None),
+        of one product and/or category. Records are read one at a time from the ledger'''
+
+        return self.stock_ledger().movements(start, end, product_id, category)
+
+    def movement_report(self, start=None, end=None, product_id=None, category=None):
+        ''' Returns totals of stock movements between start and end: movements, quantity_in, quantity_out,
+        net_quantity, price_changes and value_change'''
+
+        return self.stock_ledger().report(start, end, product_id, category)
+
+    def select_products(self, category=None, product_ids=None, where=None):
+        ''' Returns list of (product_id, product) matching all given targets: a category, a list of IDs
+        and a predicate where(product_id, product). Unknown IDs are reported and skipped'''
+
+        self.product_data = self.read_product_data()
+        if product_ids is not None:
+            selected = []
+            for product_id in product_ids:
+                if product_id in self.product_data:
+                    selected.append((product_id, self.product_data[product_id]))
+                else:
+                    self.report_failure(f"Product with ID {product_id} not found.")
+        elif category is not None:
+            selected = self.products_with_ids(self.cache.index(CategoryIndex).ids(category))
         else:
-            print(f"Product with ID {product_id} not found.")
+            selected = list(self.product_data.items())
+        if category is not None:
+            selected = [(product_id, product) for product_id, product in selected if product["category"] == category]
+        if where is not None:
+            selected = [(product_id, product) for product_id, product in selected if where(product_id, product)]
+        return selected
+
+    def reprice(self, new_price, category=None, product_ids=None, where=None, dry_run=False, expected_version=None,
+                reason=None):
+        ''' Sets price of every selected product (see select_products) to new_price(price) in one pass
+        and saves them with one write. All new prices are checked before anything changes.
+        Returns the diff, list of {"product_id", "product_name", "old_price", "new_price"} of changed products.
+        With dry_run=True nothing is saved, only the diff is returned. reason is recorded in the stock ledger'''
+
+        with self.cache.locked(), self.movement_reason(reason):
+            self.cache.check_version(expected_version)
+            diff = []
+            for product_id, product in self.select_products(category, product_ids, where):
+                price = new_price(product["price"])
+                pricing.check_price(price)
+                if price != product["price"]:
+                    diff.append({"product_id": product_id, "product_name": product["product_name"],
+                                 "old_price": product["price"], "new_price": price})
+            if dry_run or not diff:
+                return diff
+            for change in diff:
+                self.cache.put(change["product_id"], dict(self.product_data[change["product_id"]],
+                                                          price=change["new_price"]))
+            self.save_product()
+            return diff
+
+    def bulk_discount(self, discount_percentage: float, category=None, product_ids=None, where=None, dry_run=False,
+                      expected_version=None, reason=None):
+        ''' Lowers prices of selected products by discount_percentage (0 - 100), see reprice'''
+
+        return self.reprice(pricing.discount(discount_percentage), category, product_ids, where, dry_run,
+                            expected_version, reason)
+
+    def bulk_markup(self, markup_percentage: float, category=None, product_ids=None, where=None, dry_run=False,
+                    expected_version=None, reason=None):
+        ''' Raises prices of selected products by markup_percentage (0 - 100), see reprice'''
+
+        return self.reprice(pricing.markup(markup_percentage), category, product_ids, where, dry_run,
+                            expected_version, reason)
+
+    def bulk_set_price(self, new_price: float, category=None, product_ids=None, where=None, dry_run=False,
+                       expected_version=None, reason=None):
+        ''' Sets price of selected products to new_price, see reprice'''
+
+        return self.reprice(pricing.fixed_price(new_price), category, product_ids, where, dry_run,
+                            expected_version, reason)
+
+    def bulk_round_prices(self, ending=0.99, step=1.0, category=None, product_ids=None, where=None,
+                          dry_run=False, expected_version=None, reason=None):
+        ''' Moves prices of selected products to nearest price point n * step + ending (ex. 4.20 -> 3.99), see reprice'''
+
+        return self.reprice(pricing.price_points(ending, step), category, product_ids, where, dry_run,
+                            expected_version, reason)
+
+    def catalog_version(self):
+        ''' Returns version number of stored catalog, it grows with every write.
+        Pass it as expected_version to make a change only if nobody else changed the catalog since'''
+
+        return self.storage.read_version()
 
     def filter_product_by_price(self):
         ''' This method filters product by price (between 0 and given price)'''
 
-        self.product_data = self.read_product_data()
         print("products will be filtered between 0 and price provided")
         price = float(input("Please enter your price: "))
+        if self.streaming:
+            return list(self.iter_products(max_price=price))
+        self.product_data = self.read_product_data()
+        columns = self.columnar_catalog()
+        if columns is not None:
+            return self.products_with_ids(columns.ids_in_price_range(max_price=price))
         filtered = list(filter(lambda x: x[1]["price"] < price, self.product_data.items()))
         return filtered
 
+    def query(self):
+        ''' Starts a query, filters can be combined and the best index is used to answer it, ex.
+        manager.query().where(category="Electronics").price_between(100, 500).quantity_below(5).order_by("price").limit(50)
+        '''
+        return Query(self)
+
+    def find_by_price_range(self, min_price=None, max_price=None, limit=None, offset=0):
+        ''' Returns list of (product_id, product) with min_price <= price < max_price, cheapest first.
+        Either bound can be None. Uses sorted price index, so only matching products are visited.
+        In streaming mode matching products are picked from a scan, keeping at most offset + limit of them'''
+
+        if self.streaming:
+            bounds = {name: value for name, value in (("min_price", min_price), ("max_price", max_price))
+                      if value is not None}
+            matches = self.iter_products(**bounds)
+            key = lambda item: (item[1]["price"], item[0])  # same order as the price index
+            if limit is None:
+                return sorted(matches, key=key)[offset:]
+            return heapq.nsmallest(offset + limit, matches, key=key)[offset:]
+        self.product_data = self.read_product_data()
+        product_ids = self.cache.index(PriceIndex).range(min_price, max_price, limit, offset)
+        return self.products_with_ids(product_ids)
+
+    def products_in_category(self, category: str):
+        ''' Returns list of (product_id, product) of given category'''
+
+        if self.streaming:
+            return list(self.iter_products(category=category))
+        columns = self.columnar_catalog()
+        if columns is not None:
+            return self.products_with_ids(columns.ids_in_category(category))
+        self.product_data = self.read_product_data()
+        return list(filter(lambda x: x[1]["category"] == category, self.product_data.items()))
+
     def filter_product_by_category(self):
         ''' This method filters product by category. 
         User needs to type numbers like 1, 2..ect corresponding to category
         '''
-        self.product_data = self.read_product_data()
         try:
             category = input("Please enter your option for category\n1 -Electronics \n2 -Furniture \n3 -Footwear \n4 -Clothes\nCategory: ").strip()
-            if category == "1":
-                filtered_category = list(filter(lambda x: x[1]["category"] == "Electronics", self.product_data.items()))
-                result = filtered_category
-            elif category == "2":
-                filtered_category = list(filter(lambda x: x[1]["category"] == "Furniture", self.product_data.items()))
-                result = filtered_category
-            elif category == "3":
-                filtered_category = list(filter(lambda x: x[1]["category"] == "Footwear", self.product_data.items()))
-                result = filtered_category
-            elif category == "4":
-                filtered_category = list(filter(lambda x: x[1]["category"] == "Clothes", self.product_data.items()))
-                result = filtered_category
-            else:
-                print("Category not in list! Please enter no between (1 - 4)")
-            return result
+            if category in CATEGORY_OPTIONS:
+                return self.products_in_category(CATEGORY_OPTIONS[category])
+            print("Category not in list! Please enter no between (1 - 4)")
         except Exception as e:
             print(f"Error: {e}")
 
-    def filter_product_with_low_quantity(self):
-        ''' This method provides list of products with low available quantity (below 5)'''
+    def low_stock_products(self):
+        ''' Returns list of (product_id, product) with quantity below their low-stock threshold.
+        The list is kept up to date on every change, so this costs only the number of low products'''
+
+        if self.streaming:
+            tracker = self.cache.index(LowStockTracker)
+            return [(product_id, product) for product_id, product in self.iter_products()
+                    if product["quantity"] < tracker.threshold(product_id, product)]
+        self.product_data = self.read_product_data()
+        tracker = self.cache.index(LowStockTracker)
+        columns = self.columnar_catalog()
+        if columns is not None:
+            # Checked over arrays in catalog order, thresholds are taken from the tracker
+            return self.products_with_ids(columns.low_stock_ids(tracker.default_threshold, tracker.category_thresholds,
+                                                                tracker.product_thresholds))
+        return self.products_with_ids(tracker.product_ids())
+
+    def set_low_stock_threshold(self, threshold: float, product_id=None, category=None):
+        ''' Sets low-stock threshold for one product, for a category, or the default one (5)'''
 
         self.product_data = self.read_product_data()
-        products_with_minimum_quantity = list(filter(lambda x: x[1]["quantity"] < 5, self.product_data.items()))
+        self.cache.index(LowStockTracker).set_threshold(threshold, self.product_data, product_id, category)
+
+    def on_low_stock(self, callback):
+        ''' Registers callback(product_id, product, threshold), called once when a product drops below its threshold'''
+
+        self.product_data = self.read_product_data()
+        self.cache.index(LowStockTracker).callbacks.append(callback)
+
+    def filter_product_with_low_quantity(self):
+        ''' This method provides list of products with low available quantity (below 5, or threshold set
+        with set_low_stock_threshold)'''
+
+        products_with_minimum_quantity = self.low_stock_products()
         result = products_with_minimum_quantity
         if len(result) > 0:
             return result
         else:
             print("All products have quantity more than minimum required!!")
+
+
+# Operations timed while instrumentation is enabled
+instrumentation.register(InventoryManager, (
+    "read_product_data", "save_product", "commit", "add_product", "update_product", "remove_product",
+    "change_product", "increment_quantity", "update_price", "apply_discount", "reprice", "find_product_id",
+    "search_product_by_name", "search_by_prefix", "fuzzy_search", "get_total_inventory_value", "get_aggregates", "find_by_price_range",
+    "products_in_category", "low_stock_products", "query", "import_products", "export_products", "compact"
+), "manager")
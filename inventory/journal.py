@@ -0,0 +1,143 @@
+# This module 'journal.py' is a part of 'Inventory Management System' Projects
+# This module keeps an append-only log of catalog changes, so a single change does not rewrite whole catalog
+
+import json
+import os
+import time
+from pathlib import Path
+from inventory.instrumentation import instrumentation
+
+
+class CatalogJournal:
+    ''' This class appends one JSON line per changed product next to "product_catalog.json".
+    On load the journal is replayed over the last snapshot, compaction folds it back into the snapshot.
+    '''
+
+    def __init__(self, file_path="product_catalog.json", max_records=1000, max_bytes=1_000_000):
+        self.database = Path(file_path)
+        self.journal_path = self.database.with_suffix(".journal.jsonl")
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.record_count = 0
+
+    def file_signature(self):
+        '''Returns (mtime, size, inode) of the journal, or None if there is no journal yet'''
+
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    @staticmethod
+    def make_record(product_id: str, product: dict):
+        if product is None:
+            return {"op": "delete", "product_id": product_id}
+        return {"op": "put", "product_id": product_id, "product": product}
+
+    def append(self, changes: dict):
+        '''Appends given changes {product_id: product or None (removed)} to the journal.
+        Several changes are written as one "batch" line, so they are replayed all together or not at all'''
+
+        started = time.perf_counter() if instrumentation.enabled else None
+        records = [self.make_record(product_id, product) for product_id, product in changes.items()]
+        if len(records) == 1:
+            line = json.dumps(records[0])
+        else:
+            line = json.dumps({"op": "batch", "records": records})
+        serialized = time.perf_counter() if started is not None else None
+        self.drop_torn_tail()
+        with open(self.journal_path, "a") as file:
+            file.write(line + "\n")
+            file.flush()
+        if started is not None:
+            instrumentation.record_write(len(line) + 1, time.perf_counter() - serialized, serialized - started)
+        self.record_count += len(records)
+
+    def drop_torn_tail(self):
+        '''Cuts off a last record left without its newline by a process stopped in the middle of writing it,
+        so the next record starts on its own line instead of being glued to the fragment'''
+
+        try:
+            file = open(self.journal_path, "r+b")
+        except FileNotFoundError:
+            return
+        with file:
+            end = file.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            file.seek(end - 1)
+            if file.read(1) == b"\n":
+                return
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    file.truncate(start + newline + 1)
+                    return
+                position = start
+            file.truncate(0)
+
+    def records(self):
+        '''Yields journal records in order. An unreadable last record (cut by a crash) is skipped,
+        an unreadable record followed by others means the journal is damaged and raises ValueError'''
+
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "r") as file:
+            lines = iter(file)
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    if any(rest.strip() for rest in lines):
+                        raise ValueError(f"Damaged record in the middle of journal '{self.journal_path}'")
+                    print(f"Ignoring incomplete journal record in '{self.journal_path}'")
+                    return
+                yield record
+
+    def apply(self, product_data: dict, record: dict):
+        if record["op"] == "put":
+            product_data[record["product_id"]] = record["product"]
+        elif record["op"] == "delete":
+            product_data.pop(record["product_id"], None)
+        elif record["op"] == "batch":
+            for batch_record in record["records"]:
+                self.apply(product_data, batch_record)
+            return len(record["records"])
+        return 1
+
+    def replay(self, product_data: dict):
+        '''Applies journal records over given snapshot, returns number of applied records'''
+
+        self.record_count = 0
+        for record in self.records():
+            self.record_count += self.apply(product_data, record)
+        return self.record_count
+
+    def changes(self):
+        '''Returns {product_id: product or None (removed)}, the last recorded change of each product.
+        Used to correct a snapshot which is read product by product instead of loaded at once'''
+
+        changes = {}
+        for record in self.records():
+            for change in (record["records"] if record["op"] == "batch" else [record]):
+                changes[change["product_id"]] = change.get("product")
+        return changes
+
+    def needs_compaction(self):
+        '''Journal is compacted when it has too many records or grew too big'''
+
+        if self.record_count >= self.max_records:
+            return True
+        signature = self.file_signature()
+        return signature is not None and signature[1] >= self.max_bytes
+
+    def truncate(self):
+        '''Called after the snapshot has been written, records are part of snapshot now'''
+
+        if self.journal_path.exists():
+            os.remove(self.journal_path)
+        self.record_count = 0
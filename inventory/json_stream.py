@@ -0,0 +1,89 @@
+# This module 'json_stream.py' is a part of 'Inventory Management System' Projects
+# This module reads "product_catalog.json" incrementally, one product at a time, so a scan
+# does not need the whole catalog in memory and can stop as soon as it found what it needs
+
+import json
+
+WHITESPACE = " \t\n\r"
+DECODER = json.JSONDecoder()
+
+
+class ChunkReader:
+    ''' This class reads JSON values from a text file in chunks, text already parsed is dropped from the buffer'''
+
+    def __init__(self, file, chunk_size=65536):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+
+    def fill(self):
+        '''Reads next chunk, returns False at end of file'''
+
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer) or not self.fill():
+                return
+
+    def next_char(self):
+        self.skip_whitespace()
+        if self.position >= len(self.buffer):
+            raise ValueError("Unexpected end of catalog file")
+        char = self.buffer[self.position]
+        self.position += 1
+        return char
+
+    def expect(self, expected: str):
+        char = self.next_char()
+        if char != expected:
+            raise ValueError(f"Expected '{expected}' in catalog file, found '{char}'")
+
+    def value(self):
+        '''Parses next JSON value, reading more chunks while the value is incomplete'''
+
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A value ending exactly at the end of the buffer (ex. a number) may continue in next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_catalog(path, chunk_size=65536):
+    '''Yields (product_id, product) from a catalog file in "product_catalog.json" format,
+    {"<product_id>": {"product_name": ..., "quantity": ..., "price": ..., "category": ...}, ...},
+    in the order they are written in the file. Only the product being parsed is held in memory'''
+
+    with open(path, "r") as file:
+        reader = ChunkReader(file, chunk_size)
+        reader.expect("{")
+        reader.skip_whitespace()
+        if reader.buffer[reader.position:reader.position + 1] == "}":
+            return
+        while True:
+            product_id = reader.value()
+            if not isinstance(product_id, str):
+                raise ValueError("Product IDs in catalog file must be strings")
+            reader.expect(":")
+            yield product_id, reader.value()
+            separator = reader.next_char()
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' in catalog file, found '{separator}'")
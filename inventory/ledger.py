@@ -0,0 +1,260 @@
+# This module 'ledger.py' is a part of 'Inventory Management System' Projects
+# This module keeps the history of stock: every change of a product (quantity, price, added, removed)
+# is appended to "product_catalog.ledger.jsonl" with its time and reason, and every snapshot_every
+# changes the whole catalog is saved as a snapshot. The catalog as it was at any time is the nearest
+# earlier snapshot with the changes made after it, so the history is never replayed from the start.
+
+import json
+import math
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from inventory.aggregates import summarize
+from inventory.locking import CatalogLock
+
+SNAPSHOT_INDEX = "index.jsonl"
+
+
+def timestamp(when):
+    '''Seconds since epoch for a datetime (naive ones are local time) or a number'''
+
+    return when.timestamp() if isinstance(when, datetime) else float(when)
+
+
+def default_reason(old_product, new_product):
+    if old_product is None:
+        return "added"
+    if new_product is None:
+        return "removed"
+    if old_product["price"] == new_product["price"]:
+        return "quantity"
+    if old_product["quantity"] == new_product["quantity"]:
+        return "price"
+    return "update"
+
+
+def product_value(product):
+    return 0.0 if product is None else product["price"] * product["quantity"]
+
+
+class StockLedger:
+    ''' This class appends stock movements to a JSON lines file and keeps snapshots of the catalog
+    in "product_catalog.snapshots/" (one JSON file per snapshot, listed in its index.jsonl).
+    Movement record: {"time", "product_id", "category", "reason", "quantity_change", "price_change",
+    "value_change", "product"}, where product is the product after the change (None when removed).
+    Times never go backwards in the file, so a reader stops at the first record after the time it wants.
+    '''
+
+    def __init__(self, file_path="product_catalog.json", lock=None, snapshot_every=1000):
+        self.database = Path(file_path)
+        self.ledger_path = self.database.with_suffix(".ledger.jsonl")
+        self.snapshot_dir = self.database.with_suffix(".snapshots")
+        self.index_path = self.snapshot_dir / SNAPSHOT_INDEX
+        self.lock = lock if lock is not None else CatalogLock(self.ledger_path)
+        self.snapshot_every = snapshot_every
+
+    def snapshots(self):
+        '''Returns list of {"time", "offset", "total_value", "file"}, oldest first'''
+
+        if not self.index_path.exists():
+            return []
+        with open(self.index_path, "r") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def ledger_size(self):
+        try:
+            return os.path.getsize(self.ledger_path)
+        except FileNotFoundError:
+            return 0
+
+    def ensure_baseline(self, product_data: dict):
+        '''Saves the first snapshot, history starts from the catalog as it is when the ledger is enabled'''
+
+        with self.lock:
+            if not self.snapshots():
+                self.snapshot(product_data)
+
+    def snapshot(self, product_data: dict, when=None):
+        '''Saves product_data as the catalog at the current end of the ledger'''
+
+        with self.lock:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            offset = self.ledger_size()
+            entry = {"time": time.time() if when is None else when, "offset": offset,
+                     "total_value": summarize(product_data.items())["total_value"],
+                     "file": f"snapshot-{offset:012d}.json"}
+            handle, temp_path = tempfile.mkstemp(prefix="snapshot", suffix=".tmp", dir=self.snapshot_dir)
+            try:
+                with os.fdopen(handle, "w") as file:
+                    json.dump(product_data, file)
+                os.replace(temp_path, self.snapshot_dir / entry["file"])
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            with open(self.index_path, "a") as file:
+                file.write(json.dumps(entry) + "\n")
+            return entry
+
+    def last_time(self):
+        '''Time of the last record (or snapshot), new records never get an earlier time'''
+
+        snapshots = self.snapshots()
+        last = snapshots[-1]["time"] if snapshots else 0.0
+        size = self.ledger_size()
+        if size == 0:
+            return last
+        with open(self.ledger_path, "rb") as file:
+            file.seek(max(0, size - 4096))
+            for line in reversed(file.read().splitlines()):
+                try:
+                    return max(last, json.loads(line)["time"])
+                except ValueError:
+                    continue  # incomplete last record or a line cut by the seek
+        return last
+
+    def append(self, movements, product_data: dict):
+        '''Appends movements [(product_id, old product or None, new product or None, reason)],
+        product_data is the catalog after them, saved as a snapshot when snapshot_every records were added'''
+
+        with self.lock:
+            now = max(time.time(), self.last_time())
+            lines = []
+            for product_id, old_product, new_product, reason in movements:
+                if old_product == new_product:
+                    continue
+                product = new_product if new_product is not None else old_product
+                lines.append(json.dumps({
+                    "time": now,
+                    "product_id": product_id,
+                    "category": product["category"],
+                    "reason": reason or default_reason(old_product, new_product),
+                    "quantity_change": (0.0 if new_product is None else new_product["quantity"])
+                                       - (0.0 if old_product is None else old_product["quantity"]),
+                    "price_change": 0.0 if old_product is None or new_product is None
+                                    else new_product["price"] - old_product["price"],
+                    "value_change": product_value(new_product) - product_value(old_product),
+                    "product": new_product
+                }))
+            if not lines:
+                return
+            with open(self.ledger_path, "a+b") as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell():
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        lines.insert(0, "")  # a record cut by a crash is ended, readers skip it
+                file.write(("\n".join(lines) + "\n").encode("utf-8"))
+            if self.snapshot_every and self.count_records(len(lines)) >= self.snapshot_every:
+                self.snapshot(product_data, now)
+
+    def count_records(self, added: int):
+        '''Adds to the number of records appended since the last snapshot, kept in "<ledger>.count"
+        with the offset of that snapshot (so it starts from 0 after a new snapshot). Returns the new number'''
+
+        count_path = self.ledger_path.with_name(self.ledger_path.name + ".count")
+        snapshots = self.snapshots()
+        offset = snapshots[-1]["offset"] if snapshots else 0
+        count = 0
+        if count_path.exists():
+            with open(count_path, "r") as file:
+                stored_offset, stored_count = json.load(file)
+            if stored_offset == offset:
+                count = stored_count
+        with open(count_path, "w") as file:
+            json.dump([offset, count + added], file)
+        return count + added
+
+    def records(self, offset=0):
+        '''Yields records from byte offset of the ledger, one line at a time'''
+
+        if not self.ledger_path.exists():
+            return
+        with open(self.ledger_path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # record cut by a process stopped in the middle of writing it
+                yield record
+
+    def nearest_snapshot(self, when: float):
+        '''Latest snapshot taken at or before when'''
+
+        earlier = [entry for entry in self.snapshots() if entry["time"] <= when]
+        if not earlier:
+            raise ValueError(f"No stock history before {datetime.fromtimestamp(when)}")
+        return earlier[-1]
+
+    def products_at(self, when):
+        '''Returns the catalog {product_id: product} as it was at given time (datetime or seconds since epoch)'''
+
+        when = timestamp(when)
+        entry = self.nearest_snapshot(when)
+        with open(self.snapshot_dir / entry["file"], "r") as file:
+            product_data = json.load(file)
+        for record in self.records(entry["offset"]):
+            if record["time"] > when:
+                break
+            if record["product"] is None:
+                product_data.pop(record["product_id"], None)
+            else:
+                product_data[record["product_id"]] = record["product"]
+        return product_data
+
+    def total_value_at(self, when):
+        '''Total inventory value at given time: total of the nearest snapshot plus value changes after it,
+        the snapshot itself is not loaded'''
+
+        when = timestamp(when)
+        entry = self.nearest_snapshot(when)
+        parts = [entry["total_value"]]
+        for record in self.records(entry["offset"]):
+            if record["time"] > when:
+                break
+            parts.append(record["value_change"])
+        return math.fsum(parts)
+
+    def movements(self, start=None, end=None, product_id=None, category=None):
+        '''Yields movement records with start <= time < end (either can be None), of one product
+        and/or category. Reading starts at the nearest snapshot before start and stops at end'''
+
+        start = None if start is None else timestamp(start)
+        end = None if end is None else timestamp(end)
+        offset = 0
+        if start is not None:
+            earlier = [entry for entry in self.snapshots() if entry["time"] <= start]
+            offset = earlier[-1]["offset"] if earlier else 0
+        for record in self.records(offset):
+            if start is not None and record["time"] < start:
+                continue
+            if end is not None and record["time"] >= end:
+                return
+            if product_id is not None and record["product_id"] != product_id:
+                continue
+            if category is not None and record["category"] != category:
+                continue
+            yield record
+
+    def report(self, start=None, end=None, product_id=None, category=None):
+        '''Totals of movements (see movements), computed while reading, in constant memory'''
+
+        report = {"movements": 0, "quantity_in": 0.0, "quantity_out": 0.0, "net_quantity": 0.0,
+                  "price_changes": 0, "value_change": 0.0}
+        value_changes = []
+        for record in self.movements(start, end, product_id, category):
+            report["movements"] += 1
+            if record["quantity_change"] > 0:
+                report["quantity_in"] += record["quantity_change"]
+            else:
+                report["quantity_out"] -= record["quantity_change"]
+            if record["price_change"]:
+                report["price_changes"] += 1
+            value_changes.append(record["value_change"])
+            if len(value_changes) >= 1000:
+                value_changes = [math.fsum(value_changes)]
+        report["net_quantity"] = report["quantity_in"] - report["quantity_out"]
+        report["value_change"] = math.fsum(value_changes)
+        return report
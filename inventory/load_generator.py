@@ -0,0 +1,96 @@
+# This module 'load_generator.py' is a part of 'Inventory Management System' Projects
+# This module sends many concurrent requests to the inventory service and reports throughput and latency
+#   python -m inventory.load_generator --port 8080 --requests 10000 --concurrency 50 --write-ratio 0.1
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from inventory.http_client import ServiceConnection
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load(host="127.0.0.1", port=8080, requests=10000, concurrency=50, write_ratio=0.1, seed=None):
+    '''Sends requests from concurrency connections: reads of single products, searches and aggregates,
+    and write_ratio of quantity changes (+1 then -1, so the catalog ends as it started).
+    Returns {"requests", "seconds", "requests_per_second", "p50_ms", "p99_ms", "errors"}'''
+
+    rng = random.Random(seed)
+    connection = await ServiceConnection(host, port).open()
+    status, listing = await connection.request("GET", "/products?limit=1000")
+    await connection.close()
+    products = listing["products"] if status == 200 else []
+    if not products:
+        raise ValueError("Service has no products to request")
+
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    def next_requests():
+        # A write takes two of the remaining requests, +1 and then -1 for the same product
+        product = rng.choice(products)
+        if rng.random() < write_ratio and next(remaining, None) is not None:
+            path = f"/products/{product['product_id']}/quantity"
+            return [("POST", path, {"delta": 1}), ("POST", path, {"delta": -1})]
+        return [read_request(product)]
+
+    def read_request(product):
+        kind = rng.random()
+        if kind < 0.6:
+            return "GET", f"/products/{product['product_id']}", None
+        elif kind < 0.8:
+            return "GET", f"/products?category={product['category']}&limit=10", None
+        elif kind < 0.9:
+            return "GET", f"/products?max_price={product['price']}&order_by=price&limit=10", None
+        return "GET", "/aggregates", None
+
+    async def worker():
+        nonlocal errors
+        connection = await ServiceConnection(host, port).open()
+        try:
+            for _ in remaining:
+                for method, path, body in next_requests():
+                    started = time.perf_counter()
+                    status, _ = await connection.request(method, path, body)
+                    latencies.append(time.perf_counter() - started)
+                    if status >= 400:
+                        errors += 1
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "errors": errors
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against the inventory service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    report = asyncio.run(run_load(args.host, args.port, args.requests, args.concurrency, args.write_ratio, args.seed))
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# This module 'locking.py' is a part of 'Inventory Management System' Projects
+# This module makes sure only one writer at a time changes the catalog, across threads and processes
+
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, there only threads of one process are kept apart
+    fcntl = None
+
+
+class VersionConflictError(RuntimeError):
+    ''' Raised when the catalog was changed by someone else since the version the caller expected'''
+
+    def __init__(self, expected_version, current_version):
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(f"Catalog changed: expected version {expected_version}, current version {current_version}")
+
+
+class CatalogLock:
+    ''' This class is an advisory lock on "<catalog>.lock" file (fcntl.flock), held by one process at a time.
+    Inside the process a re-entrant thread lock keeps threads apart, so the lock can be taken again by its holder.
+    '''
+
+    def __init__(self, catalog_path):
+        catalog_path = Path(catalog_path)
+        self.lock_path = catalog_path.with_name(catalog_path.name + ".lock")
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+    def acquire(self):
+        self.thread_lock.acquire()
+        if self.depth == 0 and fcntl is not None:
+            try:
+                self.file = open(self.lock_path, "a")
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0 and self.file is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+        self.thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+def retry_on_conflict(operation, attempts=5):
+    '''Calls operation() again when it raises VersionConflictError, at most attempts times'''
+
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except VersionConflictError:
+            if attempt == attempts - 1:
+                raise
+
+
+def read_version_file(path: Path):
+    try:
+        with open(path, "r") as file:
+            return int(file.read() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_version_file(path: Path, version: int):
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w") as file:
+        file.write(str(version))
+    os.replace(temp_path, path)
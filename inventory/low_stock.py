@@ -0,0 +1,104 @@
+# This module 'low_stock.py' is a part of 'Inventory Management System' Projects
+# This module keeps the list of products with low quantity up to date as quantities change
+
+DEFAULT_THRESHOLD = 5.0
+
+
+class LowStockTracker:
+    ''' This class keeps products whose quantity is below their threshold.
+    Threshold is taken from the product, otherwise from its category, otherwise the default one.
+    Registered callbacks are called as callback(product_id, product, threshold) when a product becomes low,
+    after the change is saved (CatalogCache calls saved()); changes rolled back are not reported.
+    '''
+
+    keeps_settings = True  # thresholds and callbacks stay when CatalogCache.invalidate drops other indexes
+
+    def __init__(self):
+        self.default_threshold = DEFAULT_THRESHOLD
+        self.product_thresholds = {}
+        self.category_thresholds = {}
+        self.callbacks = []
+        self.low = {}  # dict used as an ordered set of product IDs
+        self.removed_while_low = set()  # an update is remove + add, this remembers state between the two
+        self.crossings = []  # (product_id, product, threshold) which became low, reported when saved
+        self.building = False
+
+    def threshold(self, product_id: str, product: dict):
+        if product_id in self.product_thresholds:
+            return self.product_thresholds[product_id]
+        return self.category_thresholds.get(product["category"], self.default_threshold)
+
+    def build(self, product_data: dict):
+        # Products which are already low when catalog is loaded are not reported to callbacks
+        self.low = {}
+        self.removed_while_low = set()
+        self.crossings = []
+        self.building = True
+        try:
+            for product_id, product in product_data.items():
+                self.add(product_id, product)
+        finally:
+            self.building = False
+
+    def add(self, product_id: str, product: dict):
+        threshold = self.threshold(product_id, product)
+        was_low = product_id in self.removed_while_low
+        self.removed_while_low.discard(product_id)
+        if product["quantity"] < threshold:
+            self.low[product_id] = None
+            if not (was_low or self.building):
+                self.crossings.append((product_id, product, threshold))
+
+    def remove(self, product_id: str, product: dict):
+        if product_id in self.low:
+            del self.low[product_id]
+            self.removed_while_low.add(product_id)
+
+    def deleted(self, product_id: str):
+        # Not an update, a product added again later under this ID is new
+        self.removed_while_low.discard(product_id)
+
+    def set_threshold(self, threshold: float, product_data: dict, product_id=None, category=None):
+        '''Sets threshold of one product, of a category or (without product_id and category) the default one.
+        Affected products are checked again, the ones which become low are reported to callbacks'''
+
+        if product_id is not None:
+            self.product_thresholds[product_id] = threshold
+            affected = [product_id] if product_id in product_data else []
+        elif category is not None:
+            self.category_thresholds[category] = threshold
+            affected = [product_id for product_id, product in product_data.items() if product["category"] == category]
+        else:
+            self.default_threshold = threshold
+            affected = list(product_data)
+        pending = len(self.crossings)
+        for affected_id in affected:
+            self.remove(affected_id, product_data[affected_id])
+            self.add(affected_id, product_data[affected_id])
+        # Nothing is saved for a new threshold, its crossings are reported now
+        crossings = self.crossings[pending:]
+        del self.crossings[pending:]
+        self.report(crossings)
+
+    def saved(self):
+        '''Reports products which became low in the changes just saved'''
+
+        crossings, self.crossings = self.crossings, []
+        self.report(crossings)
+
+    def discarded(self):
+        '''Changes were rolled back, products which became low in them are not reported'''
+
+        self.crossings = []
+
+    def report(self, crossings):
+        # A failing callback does not stop the others, the change is already saved
+        for product_id, product, threshold in crossings:
+            for callback in self.callbacks:
+                try:
+                    callback(product_id, product, threshold)
+                except Exception as e:
+                    print(f"Low stock callback failed for {product_id}: {e}")
+
+    def product_ids(self):
+        return list(self.low)
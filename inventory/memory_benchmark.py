@@ -0,0 +1,66 @@
+# This module 'memory_benchmark.py' is a part of 'Inventory Management System' Projects
+# This module measures memory taken by many products held at once, Product (__slots__) against
+# the former Product layout (instance dict, own Path and own catalog dict)
+#   python -m inventory.memory_benchmark --products 1000000
+
+import argparse
+import json
+import tracemalloc
+from pathlib import Path
+from inventory.product import Product
+
+
+class DictProduct:
+    ''' Layout of Product before it became a value: attributes in an instance dict,
+    its own Path of the catalog and its own product_data dict (empty until read_product_data filled it)'''
+
+    def __init__(self, product_name, quantity, price, category, file_path="product_catalog.json"):
+        self.product_name = product_name
+        self.quantity = quantity
+        self.price = price
+        self.category = category
+        self.database = Path(file_path)
+        self.product_data = {}
+
+
+def measure(make, count: int):
+    '''Returns bytes allocated per product while count products made by make(i) are alive'''
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        products = [make(i) for i in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    del products
+    return used / count
+
+
+def run_benchmark(count=100_000):
+    '''Returns {layout: bytes per product}. Names, categories and numbers are shared between layouts,
+    so the difference is the per-object overhead'''
+
+    names = [f"product{i % 1000}" for i in range(1000)]
+    categories = ["Electronics", "Furniture", "Clothes", "Footwear"]
+    return {
+        "product_slots": round(measure(lambda i: Product(names[i % 1000], 1.0, 2.0, categories[i % 4]), count), 1),
+        "former_product": round(measure(lambda i: DictProduct(names[i % 1000], 1.0, 2.0, categories[i % 4]), count), 1),
+        "dict": round(measure(lambda i: {"product_name": names[i % 1000], "quantity": 1.0, "price": 2.0,
+                                         "category": categories[i % 4]}, count), 1)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare memory taken per product")
+    parser.add_argument("--products", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    report = {"products": args.products, "bytes_per_product": run_benchmark(args.products)}
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
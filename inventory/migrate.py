@@ -0,0 +1,36 @@
+# This module 'migrate.py' is a part of 'Inventory Management System' Projects
+# This module moves an existing catalog into another storage format, chosen by file extension:
+# .json (JSON file), .db/.sqlite/.sqlite3 (SQLite) or .bin (fixed-width binary records)
+#   python -m inventory.migrate product_catalog.json product_catalog.db
+#   python -m inventory.migrate product_catalog.json product_catalog.bin
+#   python -m inventory.migrate product_catalog.bin product_catalog.json
+
+import argparse
+from inventory.storage import storage_for_path
+
+
+def migrate_catalog(source_path, target_path):
+    '''Copies all products from source catalog into target catalog (replacing its products),
+    returns number of migrated products'''
+
+    source, target = storage_for_path(source_path), storage_for_path(target_path)
+    try:
+        product_data = source.load_all()
+        target.write_all(product_data)
+    finally:
+        source.close()
+        target.close()
+    return len(product_data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move product catalog into another storage format")
+    parser.add_argument("source_path", nargs="?", default="product_catalog.json")
+    parser.add_argument("target_path", nargs="?", default="product_catalog.db")
+    args = parser.parse_args(argv)
+    count = migrate_catalog(args.source_path, args.target_path)
+    print(f"Migrated {count} products from '{args.source_path}' to '{args.target_path}'")
+
+
+if __name__ == "__main__":
+    main()
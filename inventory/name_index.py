@@ -0,0 +1,56 @@
+# This module 'name_index.py' is a part of 'Inventory Management System' Projects
+# This module maps product names to product IDs, so products can be found by name without scanning catalog
+
+
+class DuplicateProductNameError(ValueError):
+    ''' Raised when a name lookup matches more than one product'''
+
+    def __init__(self, product_name: str, product_ids):
+        self.product_name = product_name
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Product name '{product_name}' is used by more than one product: {', '.join(self.product_ids)}")
+
+
+class NameIndex:
+    ''' This class keeps case-insensitive index from product_name to product IDs'''
+
+    def __init__(self):
+        self.ids_by_name = {}
+
+    @staticmethod
+    def normalize(product_name: str):
+        return product_name.casefold()
+
+    def build(self, product_data: dict):
+        '''Builds index from scratch for given catalog'''
+
+        self.ids_by_name = {}
+        for product_id, product in product_data.items():
+            self.add(product_id, product)
+
+    def add(self, product_id: str, product: dict):
+        self.ids_by_name.setdefault(self.normalize(product["product_name"]), set()).add(product_id)
+
+    def remove(self, product_id: str, product: dict):
+        key = self.normalize(product["product_name"])
+        product_ids = self.ids_by_name.get(key)
+        if product_ids:
+            product_ids.discard(product_id)
+            if not product_ids:
+                del self.ids_by_name[key]
+
+    def lookup(self, product_name: str):
+        '''Returns product ID for given name or None if not found.
+        Raises DuplicateProductNameError when more than one product has this name'''
+
+        product_ids = self.ids_by_name.get(self.normalize(product_name))
+        if not product_ids:
+            return None
+        if len(product_ids) > 1:
+            raise DuplicateProductNameError(product_name, product_ids)
+        return next(iter(product_ids))
+
+    def duplicates(self):
+        '''Returns {name: [product IDs]} for all names used by more than one product'''
+
+        return {name: sorted(product_ids) for name, product_ids in self.ids_by_name.items() if len(product_ids) > 1}
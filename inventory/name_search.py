@@ -0,0 +1,205 @@
+# This module 'name_search.py' is a part of 'Inventory Management System' Projects
+# This module indexes product names for search as you type: a trie answers prefix (autocomplete) queries
+# and an index of character trigrams finds names with typos ("iphnoe" -> "iphone_11").
+# Both are kept up to date like other catalog indexes (build/add/remove, see CatalogCache.index).
+
+import heapq
+
+NGRAM_SIZE = 3
+PAD = "$"  # marks start and end of a name, so first and last letters get their own trigrams
+
+
+def normalize(product_name: str):
+    return product_name.casefold()
+
+
+def ngrams(text: str):
+    '''Returns set of character trigrams of normalized text, ex. "tv" -> {"$$t", "$tv", "tv$"}.
+    Start is padded twice (like PostgreSQL pg_trgm), so the first letters, where typos are rare, weigh more'''
+
+    padded = f"{PAD * 2}{text}{PAD}"
+    return {padded[position:position + NGRAM_SIZE] for position in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def typos_allowed(query: str, max_typos=None):
+    # Like "fuzziness: AUTO" of search engines: no typo in 1-2 letters, one in up to 5, two in longer queries
+    if max_typos is not None:
+        return max_typos
+    return 0 if len(query) <= 2 else 1 if len(query) <= 5 else 2
+
+
+def required_grams(query_grams: set, query: str, max_typos=None):
+    # A typo changes at most NGRAM_SIZE trigrams, a match shares all the others with the query
+    return max(1, len(query_grams) - NGRAM_SIZE * typos_allowed(query, max_typos))
+
+
+def similarity(query_grams: set, name_grams: set):
+    '''Dice coefficient of two trigram sets, 1.0 for equal names, 0.0 for nothing in common'''
+
+    return 2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams))
+
+
+class TrieNode:
+    __slots__ = ("children", "product_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.product_ids = None  # set of IDs of products whose name ends at this node
+
+
+class NameTrie:
+    ''' This class keeps normalized product names in a trie, for prefix queries'''
+
+    def __init__(self):
+        self.root = TrieNode()
+
+    def build(self, product_data: dict):
+        self.root = TrieNode()
+        for product_id, product in product_data.items():
+            self.add(product_id, product)
+
+    def add(self, product_id: str, product: dict):
+        node = self.root
+        for char in normalize(product["product_name"]):
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if node.product_ids is None:
+            node.product_ids = set()
+        node.product_ids.add(product_id)
+
+    def remove(self, product_id: str, product: dict):
+        path = [self.root]
+        name = normalize(product["product_name"])
+        for char in name:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if not path[-1].product_ids:
+            return
+        path[-1].product_ids.discard(product_id)
+        if not path[-1].product_ids:
+            path[-1].product_ids = None
+        # Drop nodes which lead to no name any more
+        for position in range(len(name), 0, -1):
+            node = path[position]
+            if node.children or node.product_ids:
+                break
+            del path[position - 1].children[name[position - 1]]
+
+    def complete(self, prefix: str, limit=10):
+        '''Returns up to limit (name, product_id) of names starting with prefix (case-insensitive),
+        shortest names first, names of the same length in alphabetical order.
+        Nodes are taken from a heap in that order, so it stops as soon as limit names are found,
+        having looked only at nodes which come before the last of them'''
+
+        node = self.root
+        prefix = normalize(prefix)
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        results = []
+        heap = [(len(prefix), prefix, node)]  # texts of nodes are unique, nodes are never compared
+        while heap and len(results) < limit:
+            length, text, node = heapq.heappop(heap)
+            if node.product_ids:
+                results.extend((text, product_id) for product_id in sorted(node.product_ids))
+            for char, child in node.children.items():
+                heapq.heappush(heap, (length + 1, text + char, child))
+        return results[:limit]
+
+
+class NGramIndex:
+    ''' This class keeps {trigram: product IDs} of product names, for fuzzy (typo tolerant) search'''
+
+    def __init__(self, max_postings=20_000):
+        self.ids_by_gram = {}
+        self.names = {}  # product_id -> (normalized name, number of its trigrams)
+        # Trigrams of more products than this (ex. "ite" of every "item_...") do not bring candidates,
+        # unless the query has no rarer trigram; they still count in the score
+        self.max_postings = max_postings
+
+    def build(self, product_data: dict):
+        self.ids_by_gram = {}
+        self.names = {}
+        for product_id, product in product_data.items():
+            self.add(product_id, product)
+
+    def add(self, product_id: str, product: dict):
+        name = normalize(product["product_name"])
+        grams = ngrams(name)
+        self.names[product_id] = (name, len(grams))
+        for gram in grams:
+            self.ids_by_gram.setdefault(gram, set()).add(product_id)
+
+    def remove(self, product_id: str, product: dict):
+        name, gram_count = self.names.pop(product_id, (None, 0))
+        if name is None:
+            return
+        for gram in ngrams(name):
+            product_ids = self.ids_by_gram.get(gram)
+            if product_ids is not None:
+                product_ids.discard(product_id)
+                if not product_ids:
+                    del self.ids_by_gram[gram]
+
+    def search(self, query: str, limit=10, max_typos=None, min_similarity=0.3):
+        '''Returns up to limit (similarity, product_id) of names similar to query, most similar first
+        (then closest in length, then alphabetical).
+        A match shares at least `required` trigrams with the query, so it is found in one of the
+        len(query trigrams) - required + 1 rarest of them. Only those posting lists bring candidates,
+        and candidates are scored by set lookups in the posting lists of the query, names are not split again'''
+
+        query = normalize(query)
+        query_grams = ngrams(query)
+        required = required_grams(query_grams, query, max_typos)
+        postings = sorted((self.ids_by_gram.get(gram, set()) for gram in query_grams), key=len)
+        sources = postings[:len(postings) - required + 1]
+        sources = ([product_ids for product_ids in sources if 0 < len(product_ids) <= self.max_postings]
+                   or [product_ids for product_ids in sources if product_ids][:1])
+
+        def scored():
+            for product_id in set().union(*sources):
+                shared = sum(product_id in product_ids for product_ids in postings)
+                if shared < required:
+                    continue
+                name, gram_count = self.names[product_id]
+                score = 2 * shared / (len(query_grams) + gram_count)
+                if score >= min_similarity:
+                    yield -score, abs(len(name) - len(query)), name, product_id
+
+        return [(-score, product_id) for score, distance, name, product_id in heapq.nsmallest(limit, scored())]
+
+
+def scan_prefix(products, prefix: str, limit=10):
+    '''Same ranking as NameTrie.complete over (product_id, product) read one by one (streaming mode),
+    returns up to limit (product_id, product)'''
+
+    prefix = normalize(prefix)
+    matches = ((len(name), name, product_id, product) for product_id, product in products
+               for name in (normalize(product["product_name"]),) if name.startswith(prefix))
+    return [(product_id, product) for length, name, product_id, product in heapq.nsmallest(limit, matches)]
+
+
+def scan_fuzzy(products, query: str, limit=10, max_typos=None, min_similarity=0.3):
+    '''Same ranking as NGramIndex.search over (product_id, product) read one by one (streaming mode),
+    returns up to limit (product_id, product)'''
+
+    query = normalize(query)
+    query_grams = ngrams(query)
+    required = required_grams(query_grams, query, max_typos)
+
+    def scored():
+        for product_id, product in products:
+            name = normalize(product["product_name"])
+            name_grams = ngrams(name)
+            if len(query_grams & name_grams) >= required:
+                score = similarity(query_grams, name_grams)
+                if score >= min_similarity:
+                    yield -score, abs(len(name) - len(query)), name, product_id, product
+
+    # nsmallest keeps only limit entries, memory does not grow with the catalog
+    return [(product_id, product) for score, distance, name, product_id, product in heapq.nsmallest(limit, scored())]
@@ -0,0 +1,65 @@
+# This module 'price_index.py' is a part of 'Inventory Management System' Projects
+# This module keeps products sorted by price (or quantity), so range queries do not scan whole catalog
+
+from bisect import bisect_left, insort
+
+
+class SortedIndex:
+    ''' This class keeps sorted list of (value of field, product_id), updated on every change of a product'''
+
+    field = None
+
+    def __init__(self):
+        self.entries = []
+
+    def build(self, product_data: dict):
+        self.entries = sorted((product[self.field], product_id) for product_id, product in product_data.items())
+
+    def add(self, product_id: str, product: dict):
+        insort(self.entries, (product[self.field], product_id))
+
+    def remove(self, product_id: str, product: dict):
+        entry = (product[self.field], product_id)
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def bounds(self, min_value=None, max_value=None):
+        '''Returns (start, end) positions of entries with min_value <= value < max_value'''
+
+        start = 0 if min_value is None else bisect_left(self.entries, (min_value,))
+        end = len(self.entries) if max_value is None else bisect_left(self.entries, (max_value,))
+        return start, max(start, end)
+
+    def count(self, min_value=None, max_value=None):
+        start, end = self.bounds(min_value, max_value)
+        return end - start
+
+    def iter_range(self, min_value=None, max_value=None, descending=False):
+        '''Yields product IDs with min_value <= value < max_value in order of value'''
+
+        start, end = self.bounds(min_value, max_value)
+        positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+        for position in positions:
+            yield self.entries[position][1]
+
+    def range(self, min_value=None, max_value=None, limit=None, offset=0):
+        '''Returns product IDs with min_value <= value < max_value, smallest first.
+        Either bound can be None, limit/offset select a page of the result'''
+
+        start, end = self.bounds(min_value, max_value)
+        start += offset
+        if limit is not None:
+            end = min(end, start + limit)
+        return [product_id for value, product_id in self.entries[start:end]]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PriceIndex(SortedIndex):
+    field = "price"
+
+
+class QuantityIndex(SortedIndex):
+    field = "quantity"
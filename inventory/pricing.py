@@ -0,0 +1,48 @@
+# This module 'pricing.py' is a part of 'Inventory Management System' Projects
+# This module has the price changes used by bulk repricing (InventoryManager.reprice and bulk_* methods).
+# Each returns a function new_price(price), checked once before any product is changed.
+
+
+def check_percentage(percentage, kind="Discount"):
+    # Same rule as Product.apply_discount
+    if not (0 <= percentage <= 100):
+        raise ValueError(f"{kind} percentage must be between 0 and 100")
+
+
+def check_price(price):
+    # Same rule as Product.update_price
+    if price < 0:
+        raise ValueError("Price can not be negative")
+
+
+def discount(percentage):
+    '''Lowers prices by percentage (0 - 100), like Product.apply_discount'''
+
+    check_percentage(percentage, "Discount")
+    factor = percentage / 100
+    return lambda price: max(0, price - price * factor)
+
+
+def markup(percentage):
+    '''Raises prices by percentage (0 - 100)'''
+
+    check_percentage(percentage, "Markup")
+    factor = percentage / 100
+    return lambda price: price + price * factor
+
+
+def fixed_price(new_price):
+    '''Sets every price to new_price'''
+
+    check_price(new_price)
+    return lambda price: new_price
+
+
+def price_points(ending=0.99, step=1.0):
+    '''Moves prices to the nearest price point n * step + ending (n = 0, 1, 2 ...),
+    ex. with ending 0.99: 4.20 -> 3.99, 4.60 -> 4.99; with step 10 and ending 9.99: 42.00 -> 39.99'''
+
+    check_price(ending)
+    if step <= 0:
+        raise ValueError("Price point step must be positive")
+    return lambda price: round(max(0, round((price - ending) / step)) * step + ending, 2)
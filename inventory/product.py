@@ -1,61 +1,44 @@
-import json
-from pathlib import Path
+from inventory.instrumentation import instrumentation
+
 
 class Product:
-    
-    def __init__(self, product_name, quantity, price, category, file_path = "product_catalog.json"):
+    # A product value: name, quantity, price and category, nothing else.
+    # It does no file I/O, changes of stored products go through InventoryManager
+    # (increment_quantity, update_price, apply_discount). __slots__ keeps each instance small,
+    # so many products can be held in memory.
+
+    __slots__ = ("product_name", "quantity", "price", "category")
+
+    def __init__(self, product_name, quantity, price, category):
         self.product_name = product_name
         self.quantity = quantity
         self.price = price
         self.category = category
-        self.database = Path(file_path)
-        self.product_data = {}
 
-    def read_product_data(self):
-        # Read complete database
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
 
-        if not self.database.exists():
-            raise FileNotFoundError
-        else:
-            with open(self.database, "r") as file:
-                self.product_data = json.load(file)
-                return self.product_data
+    def __hash__(self):
+        # Equal products hash alike; like a dict key, a product must not be changed while in a set
+        return hash((self.product_name, self.quantity, self.price, self.category))
 
+    def __repr__(self):
+        return (f"Product(product_name={self.product_name!r}, quantity={self.quantity!r}, "
+                f"price={self.price!r}, category={self.category!r})")
 
     def update_quantity(self, added_quantity):
-        self.product_data = self.read_product_data()
-        # Update the quantity of the product
-
-        # Find the product by name and update its quantity
-        product_found = False
-        for product_id, product_info in self.product_data.items():
-            if product_info["product_name"] == self.product_name: 
-                self.product_data[product_id]["quantity"] += added_quantity
-                product_found = True
-                self.save_product_data()
-                return self.product_data[product_id]["quantity"]
-        if not product_found:
-            print(f"Product '{self.product_name}' not found in the catalog.")
-            return
+        # Adds added_quantity (can be negative) to quantity of this value, returns new quantity
+        self.quantity += added_quantity
+        return self.quantity
 
     def update_price(self, new_price):
-    # Update the price of the product
-        self.product_data = self.read_product_data()
+        # Sets price of this value
+        if new_price < 0:
+            raise ValueError("Price can not be negative")
         self.price = new_price
-
-        product_found = False
-        for product_id, product_info in self.product_data.items():
-            if product_info["product_name"].lower() == self.product_name.lower():
-                self.product_data[product_id]["price"] = self.price
-                product_found = True
-                break
-
-        if not product_found:
-            print(f"Product '{self.product_name}' not found in the catalog.")
-            return
-
-        self.save_product_data()
-
+        return self.price
 
     def display_product_info(self):
         #displays the product information
@@ -64,23 +47,18 @@ class Product:
                 f"Category: {self.category}")
         print(info)
         return info
-    
+
     def is_in_stock(self):
         # checks if the product is in stock
         return self.quantity > 0
-    
+
     def apply_discount(self, discount_percentage):
         # Apply a discount to the product price.
         if not (0 <= discount_percentage <= 100):
             raise ValueError("Discount percentage must be between 0 and 100")
         discount = self.price * (discount_percentage / 100)
         discounted_price = max(0, self.price - discount)
-        self.update_price(discounted_price)
-
-    def save_product_data(self):
-        # Save the updated product data back to the JSON file
-        with open(self.database, "w") as file:
-            json.dump(self.product_data, file, indent=4)
+        return self.update_price(discounted_price)
 
     def to_dict(self):
     #"""Returns the product attributes as a dictionary."""
@@ -91,14 +69,7 @@ class Product:
             "category": self.category
             }
         return data
-    
 
 
-# product1 = Product("earphone", 10, 1000, "Electronics")
-# product1.read_product_data()
-# product1.display_product_info()
-# product1.apply_discount(10)
-# product1.update_quantity(20)
-# product1.update_quantity(20)
-# product1.update_price(5000)
-# product1.to_dict()
\ No newline at end of file
+instrumentation.register(Product, ("update_quantity", "update_price", "apply_discount", "is_in_stock", "to_dict"),
+                         "product")
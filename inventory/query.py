@@ -0,0 +1,169 @@
+# This module 'query.py' is a part of 'Inventory Management System' Projects
+# This module lets filters be combined into one query, which is answered using the most selective index
+
+import heapq
+from itertools import islice
+from inventory.category_index import CategoryIndex
+from inventory.price_index import PriceIndex, QuantityIndex
+
+
+class Query:
+    ''' This class builds a query over the catalog, ex.
+        manager.query().where(category="Electronics").price_between(100, 500).quantity_below(5).order_by("price").limit(50)
+    Results are (product_id, product) pairs, produced lazily while iterating.
+    Price and quantity ranges are half-open: min <= value < max.
+    '''
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.equals = {}
+        self.ranges = {}  # field -> (min_value, max_value)
+        self.predicates = []
+        self.order_field = None
+        self.descending = False
+        self.limit_count = None
+        self.offset_count = 0
+
+    def where(self, **fields):
+        '''Keeps products whose fields are equal to given values, ex. where(category="Furniture")'''
+
+        self.equals.update(fields)
+        return self
+
+    def price_between(self, min_price=None, max_price=None):
+        self.ranges["price"] = (min_price, max_price)
+        return self
+
+    def quantity_below(self, quantity):
+        self.ranges["quantity"] = (None, quantity)
+        return self
+
+    def filter(self, predicate):
+        '''Keeps products for which predicate(product_id, product) is true'''
+
+        self.predicates.append(predicate)
+        return self
+
+    def order_by(self, field: str, descending=False):
+        self.order_field = field
+        self.descending = descending
+        return self
+
+    def limit(self, count: int):
+        self.limit_count = count
+        return self
+
+    def offset(self, count: int):
+        self.offset_count = count
+        return self
+
+    def plan(self):
+        '''Chooses the index which gives fewest candidates, returns (index name, estimated rows)'''
+
+        cache = self.manager.cache
+        options = []
+        if "category" in self.equals:
+            options.append(("category", cache.index(CategoryIndex).count(self.equals["category"])))
+        if "price" in self.ranges:
+            options.append(("price", cache.index(PriceIndex).count(*self.ranges["price"])))
+        if "quantity" in self.ranges:
+            options.append(("quantity", cache.index(QuantityIndex).count(*self.ranges["quantity"])))
+        if not options:
+            return "full scan", len(self.manager.product_data)
+        return min(options, key=lambda option: option[1])
+
+    def candidates(self, index_name):
+        cache = self.manager.cache
+        if index_name == "category":
+            return cache.index(CategoryIndex).ids(self.equals["category"])
+        elif index_name in ("price", "quantity"):
+            index = cache.index(PriceIndex if index_name == "price" else QuantityIndex)
+            # Sorted index already yields products in order of its field, no sorting needed afterwards
+            descending = self.descending and self.order_field == index_name
+            return index.iter_range(*self.ranges[index_name], descending=descending)
+        return self.manager.product_data.keys()
+
+    def matches(self, product_id: str, product: dict, index_name: str):
+        for field, value in self.equals.items():
+            if field == index_name:
+                continue
+            if product.get(field) != value:
+                return False
+        for field, (min_value, max_value) in self.ranges.items():
+            if field == index_name:
+                continue
+            if min_value is not None and product[field] < min_value:
+                return False
+            if max_value is not None and product[field] >= max_value:
+                return False
+        return all(predicate(product_id, product) for predicate in self.predicates)
+
+    def scan_conditions(self):
+        '''Filters which storage can apply itself while streaming, the rest is checked by matches()'''
+
+        conditions = {}
+        if "category" in self.equals:
+            conditions["category"] = self.equals["category"]
+        min_price, max_price = self.ranges.get("price", (None, None))
+        if min_price is not None:
+            conditions["min_price"] = min_price
+        if max_price is not None:
+            conditions["max_price"] = max_price
+        if self.ranges.get("quantity", (None, None))[1] is not None:
+            conditions["max_quantity"] = self.ranges["quantity"][1]
+        return conditions
+
+    def streamed(self):
+        return self.manager.streaming and not self.manager.cache.batch_depth
+
+    def __iter__(self):
+        if self.streamed():
+            # Products come one by one from storage, indexes of the cached catalog are not used
+            index_name = "storage scan"
+            products = self.manager.iter_products(**self.scan_conditions())
+            results = ((product_id, product) for product_id, product in products
+                       if self.matches(product_id, product, index_name))
+        else:
+            self.manager.product_data = self.manager.read_product_data()
+            product_data = self.manager.product_data
+            index_name, estimated = self.plan()
+            results = ((product_id, product_data[product_id]) for product_id in self.candidates(index_name)
+                       if self.matches(product_id, product_data[product_id], index_name))
+
+        if self.order_field is not None and self.order_field != index_name:
+            key = lambda item: item[1][self.order_field]
+            if self.limit_count is not None:
+                # Only the first offset + limit products are kept while going through candidates
+                pick = heapq.nlargest if self.descending else heapq.nsmallest
+                results = iter(pick(self.offset_count + self.limit_count, results, key=key))
+            else:
+                results = iter(sorted(results, key=key, reverse=self.descending))
+
+        stop = None if self.limit_count is None else self.offset_count + self.limit_count
+        return islice(results, self.offset_count, stop)
+
+    def all(self):
+        return list(self)
+
+    def explain(self):
+        '''Describes how the query will be answered: used index, estimated rows, remaining filters, ordering'''
+
+        if self.streamed():
+            index_name, estimated = "storage scan", "unknown"
+        else:
+            self.manager.product_data = self.manager.read_product_data()
+            index_name, estimated = self.plan()
+        filters = [f"{field} == {value!r}" for field, value in self.equals.items() if field != index_name]
+        for field, (min_value, max_value) in self.ranges.items():
+            if field != index_name:
+                filters.append(f"{min_value if min_value is not None else '-inf'} <= {field} < "
+                               f"{max_value if max_value is not None else 'inf'}")
+        filters += [f"predicate {getattr(predicate, '__name__', predicate)}" for predicate in self.predicates]
+        lines = [f"index: {index_name} (estimated rows: {estimated})",
+                 f"filters: {', '.join(filters) if filters else 'none'}"]
+        if self.order_field is not None:
+            how = "from index" if self.order_field == index_name else "sorted after filtering"
+            lines.append(f"order by: {self.order_field}{' desc' if self.descending else ''} ({how})")
+        if self.limit_count is not None or self.offset_count:
+            lines.append(f"limit: {self.limit_count}, offset: {self.offset_count}")
+        return "\n".join(lines)
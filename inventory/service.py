@@ -0,0 +1,275 @@
+# This module 'service.py' is a part of 'Inventory Management System' Projects
+# This module serves InventoryManager operations as JSON over HTTP, using asyncio from standard library
+#   python -m inventory.service --catalog product_catalog.json --port 8080
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from inventory.inventory_manager import InventoryManager
+from inventory.locking import VersionConflictError
+from inventory.name_index import DuplicateProductNameError
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    ''' Raised by request handlers, turned into an error response with given status'''
+
+    def __init__(self, status: int, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+def product_item(product_id: str, product: dict):
+    return {"product_id": product_id, **product}
+
+
+class InventoryService:
+    ''' This class answers HTTP requests from the in-memory catalog of an InventoryManager.
+    Writes arriving within coalesce_window seconds are applied together and saved in one batch.
+    The manager is only used from one worker thread, so file writes and lock waits never hold up the event loop.
+
+        GET    /products/<id>                 one product
+        GET    /products?name=<name>          search by name
+        GET    /products?category=&min_price=&max_price=&max_quantity=&order_by=&descending=&limit=&offset=
+        GET    /aggregates                    inventory totals
+        GET    /low-stock                     products below their low-stock threshold
+        GET    /service-stats                 number of requests, writes and saved batches
+        POST   /products                      add product (JSON body with product_id and product fields)
+        PUT    /products/<id>                 update product
+        DELETE /products/<id>                 remove product
+        POST   /products/<id>/quantity        add {"delta": n} to quantity
+    '''
+
+    def __init__(self, manager: InventoryManager, coalesce_window=0.005, max_batch=1000):
+        self.manager = manager
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.write_queue = None
+        self.writer_task = None
+        self.server = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inventory-service")
+        self.stats = {"requests": 0, "writes": 0, "batches": 0}
+
+    async def start(self, host="127.0.0.1", port=8080):
+        await self.call(self.manager.read_product_data)
+        self.write_queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.write_loop())
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        '''Stops accepting connections. Writes already queued are still saved, later ones are answered with 503'''
+
+        self.server.close()
+        await self.server.wait_closed()
+        await self.write_queue.put(None)
+        await self.writer_task
+        while not self.write_queue.empty():
+            change, result = self.write_queue.get_nowait()
+            if not result.done():
+                result.set_result((503, {"error": "Service is stopping"}))
+        self.executor.shutdown()
+
+    async def call(self, function, *args):
+        '''Runs function on the worker thread, one call at a time'''
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def handle_connection(self, reader, writer):
+        # Connections are kept open (HTTP/1.1 keep-alive) until the client closes them
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length) if length else b""
+                status, response = await self.dispatch(method, target, body)
+                payload = json.dumps(response).encode()
+                writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                              f"Content-Length: {len(payload)}\r\n\r\n").encode() + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes):
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            data = json.loads(body) if body else {}
+            if method == "GET":
+                return 200, await self.call(self.read, parts, params)
+            if not isinstance(data, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            return await self.write(method, parts, data)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (DuplicateProductNameError, VersionConflictError) as e:
+            return 409, {"error": str(e)}
+        except (ValueError, TypeError, NameError, KeyError) as e:
+            return 400, {"error": str(e)}
+
+    def read(self, parts, params):
+        '''Reads are answered from the cached catalog and its indexes'''
+
+        manager = self.manager
+        product_data = manager.read_product_data()
+        if parts == ["products"] and "name" in params:
+            product_id = manager.cache.name_index.lookup(params["name"])
+            if product_id is None:
+                raise HTTPError(404, f"Product '{params['name']}' not found")
+            return product_item(product_id, product_data[product_id])
+        elif parts == ["products"]:
+            query = manager.query()
+            if "category" in params:
+                query.where(category=params["category"])
+            if "min_price" in params or "max_price" in params:
+                query.price_between(float(params["min_price"]) if "min_price" in params else None,
+                                    float(params["max_price"]) if "max_price" in params else None)
+            if "max_quantity" in params:
+                query.quantity_below(float(params["max_quantity"]))
+            if "order_by" in params:
+                query.order_by(params["order_by"], params.get("descending") == "true")
+            query.limit(int(params.get("limit", 100))).offset(int(params.get("offset", 0)))
+            return {"products": [product_item(product_id, product) for product_id, product in query]}
+        elif len(parts) == 2 and parts[0] == "products":
+            if parts[1] not in product_data:
+                raise HTTPError(404, f"Product with ID {parts[1]} not found")
+            return product_item(parts[1], product_data[parts[1]])
+        elif parts == ["aggregates"]:
+            return manager.get_aggregates()
+        elif parts == ["low-stock"]:
+            return {"products": [product_item(product_id, product) for product_id, product in manager.low_stock_products()]}
+        elif parts == ["service-stats"]:
+            return self.stats
+        raise HTTPError(404, "Unknown path")
+
+    async def write(self, method, parts, data):
+        '''Queues the change for the writer task and waits until its batch is saved'''
+
+        if method == "POST" and parts == ["products"]:
+            change = lambda: self.add(data)
+        elif method == "PUT" and len(parts) == 2 and parts[0] == "products":
+            change = lambda: self.update(parts[1], data)
+        elif method == "DELETE" and len(parts) == 2 and parts[0] == "products":
+            change = lambda: self.remove(parts[1])
+        elif method == "POST" and len(parts) == 3 and parts[0] == "products" and parts[2] == "quantity":
+            change = lambda: self.change_quantity(parts[1], data)
+        else:
+            raise HTTPError(405, f"{method} not allowed for {'/' + '/'.join(parts)}")
+        if self.writer_task.done():
+            raise HTTPError(503, "Service is stopping")
+        result = asyncio.get_running_loop().create_future()
+        await self.write_queue.put((change, result))
+        return await result
+
+    async def write_loop(self):
+        # None in the queue is put by stop(), the changes queued before it are applied first
+        stopping = False
+        while not stopping:
+            change = await self.write_queue.get()
+            if change is None:
+                break
+            changes = [change]
+            await asyncio.sleep(self.coalesce_window)  # let more writes arrive
+            while not self.write_queue.empty() and len(changes) < self.max_batch:
+                change = self.write_queue.get_nowait()
+                if change is None:
+                    stopping = True
+                    break
+                changes.append(change)
+            for result, response in await self.call(self.apply, changes):
+                if not result.done():
+                    result.set_result(response)
+
+    def apply(self, changes):
+        '''Applies queued changes in one batch. A change which fails validation is answered with an error,
+        the others are saved together. Returns [(result future, response)], answered on the event loop'''
+
+        responses = []
+        try:
+            with self.manager.batch():
+                for change, result in changes:
+                    try:
+                        responses.append((result, change()))
+                    except HTTPError as e:
+                        responses.append((result, (e.status, {"error": str(e)})))
+                    except (ValueError, TypeError, NameError, KeyError, AttributeError) as e:
+                        responses.append((result, (400, {"error": str(e)})))
+        except Exception as e:
+            status = 409 if isinstance(e, VersionConflictError) else 500
+            responses = [(result, (status, {"error": str(e)})) for change, result in changes]
+        else:
+            self.stats["writes"] += len(changes)
+            self.stats["batches"] += 1
+        return responses
+
+    def existing(self, product_id: str):
+        self.manager.product_data = self.manager.read_product_data()
+        if product_id not in self.manager.product_data:
+            raise HTTPError(404, f"Product with ID {product_id} not found")
+        return self.manager.product_data[product_id]
+
+    # Changes below run inside the writer's batch, they validate first and change the catalog last,
+    # so a failing change leaves nothing behind
+    def add(self, data: dict):
+        self.manager.product_data = self.manager.read_product_data()
+        product_id, product = self.manager.product_from_row(data)
+        self.manager.cache.put(product_id, product)
+        return 201, product_item(product_id, product)
+
+    def update(self, product_id: str, data: dict):
+        self.existing(product_id)
+        product_id, product = self.manager.product_from_row({**data, "product_id": product_id}, update_existing=True)
+        self.manager.cache.put(product_id, product)
+        return 200, product_item(product_id, product)
+
+    def remove(self, product_id: str):
+        self.existing(product_id)
+        self.manager.cache.delete(product_id)
+        return 200, {"product_id": product_id, "removed": True}
+
+    def change_quantity(self, product_id: str, data: dict):
+        self.existing(product_id)
+        self.manager.increment_quantity(product_id, float(data["delta"]))
+        return 200, product_item(product_id, self.manager.product_data[product_id])
+
+
+async def serve(catalog="product_catalog.json", host="127.0.0.1", port=8080, coalesce_window=0.005):
+    service = InventoryService(InventoryManager(catalog), coalesce_window)
+    port = await service.start(host, port)
+    print(f"Inventory service listening on http://{host}:{port}")
+    await service.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve inventory as JSON over HTTP")
+    parser.add_argument("--catalog", default="product_catalog.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--coalesce-ms", type=float, default=5.0, help="how long writes are collected into one batch")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.catalog, args.host, args.port, args.coalesce_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# This module 'sharded_storage.py' is a part of 'Inventory Management System' Projects
+# This module splits the catalog into several files (shards) kept in one directory, ex. "product_catalog.shards/".
+# A product goes to the shard of its ID prefix (E100 -> shard-E.json) or, with shard_count, to a shard by hash.
+# A write rewrites only the shards it changed, scans of a category read only shards which have that category.
+
+import json
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from inventory.aggregates import aggregate, combine
+from inventory.locking import CatalogLock, read_version_file, write_version_file
+from inventory.storage import StorageBackend, check_conditions, storage_for_path
+
+ID_PREFIX_PATTERN = re.compile(r"^[A-Za-z]*")
+MANIFEST_NAME = "manifest.json"
+SHARD_PREFIX = "shard-"
+
+
+def shard_aggregates(shard_path, journaled=False):
+    '''Aggregates of one shard file, runs in a worker thread or process'''
+
+    shard = storage_for_path(shard_path)
+    if journaled:
+        shard.enable_journal()
+    try:
+        return aggregate(shard.scan())
+    finally:
+        shard.close()
+
+
+class ShardedBackend(StorageBackend):
+    ''' Products stored in one file per shard in a directory, each shard kept by the backend of its file type
+    (JSON by default, ".db" or ".bin" with shard_suffix). Shards are by ID prefix (letters before the number),
+    or by crc32 of the ID when shard_count is given. Shard layout is kept in "manifest.json" of the directory,
+    so an existing catalog is always opened with the layout it was written with.
+    Aggregates over all shards are computed in parallel (threads, or processes with executor="process").
+    '''
+
+    def __init__(self, directory="product_catalog.shards", shard_count=None, shard_suffix=".json", max_workers=None,
+                 executor="thread"):
+        self.path = Path(directory)
+        self.lock = CatalogLock(self.path)
+        self.version_path = self.path / "catalog.version"
+        self.manifest_path = self.path / MANIFEST_NAME
+        self.shard_count = shard_count
+        self.shard_suffix = shard_suffix
+        self.max_workers = max_workers
+        self.executor = executor
+        self.journaled = False
+        self.shards = {}  # shard key -> backend of its file
+        self.shard_ids = {}  # shard key -> dict used as an ordered set of its product IDs
+        self.categories = {}  # shard key -> categories found in it (may hold categories no longer there)
+        if self.exists():
+            self.read_manifest()
+
+    def read_manifest(self):
+        with open(self.manifest_path, "r") as file:
+            manifest = json.load(file)
+        self.shard_count = manifest["shard_count"]
+        self.shard_suffix = manifest["shard_suffix"]
+        self.categories = {key: set(categories) for key, categories in manifest["categories"].items()}
+
+    def write_manifest(self):
+        manifest = {"shard_count": self.shard_count, "shard_suffix": self.shard_suffix,
+                    "categories": {key: sorted(categories) for key, categories in sorted(self.categories.items())}}
+        temp_path = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        with open(temp_path, "w") as file:
+            json.dump(manifest, file, indent=4)
+        temp_path.replace(self.manifest_path)
+
+    def shard_key(self, product_id: str):
+        if self.shard_count is None:
+            return ID_PREFIX_PATTERN.match(product_id).group().upper() or "_"
+        return f"h{zlib.crc32(product_id.encode('utf-8')) % self.shard_count:03d}"
+
+    def shard_path(self, key: str):
+        return self.path / f"{SHARD_PREFIX}{key}{self.shard_suffix}"
+
+    def shard(self, key: str):
+        if key not in self.shards:
+            self.shards[key] = storage_for_path(self.shard_path(key))
+            if self.journaled:
+                self.shards[key].enable_journal()
+        return self.shards[key]
+
+    def shard_keys(self):
+        '''Keys of shards which have a file, in sorted order'''
+
+        if self.exists():
+            self.read_manifest()
+        return sorted(key for key in self.categories if self.shard_path(key).exists())
+
+    def enable_journal(self, max_records=1000, max_bytes=1_000_000):
+        # Only JSON shards have a journal
+        self.journaled = self.shard_suffix == ".json"
+        if self.journaled:
+            for shard in self.shards.values():
+                shard.enable_journal(max_records, max_bytes)
+
+    def exists(self):
+        return self.manifest_path.exists()
+
+    def read_version(self):
+        return read_version_file(self.version_path)
+
+    def signature(self):
+        # Every write goes through this backend and increases the version
+        if not self.exists():
+            return None
+        return (self.manifest_path.stat().st_mtime_ns, self.read_version())
+
+    def map_shards(self, function, keys):
+        '''Calls function(key) for every shard in a thread pool, returns results in order of keys'''
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            return list(pool.map(function, keys))
+
+    def load_all(self):
+        keys = self.shard_keys()
+        parts = self.map_shards(lambda key: self.shard(key).load_all(), keys)
+        product_data = {}
+        self.shard_ids = {}
+        for key, part in zip(keys, parts):
+            product_data.update(part)
+            self.shard_ids[key] = dict.fromkeys(part)
+        return product_data
+
+    def read(self, product_id: str):
+        key = self.shard_key(product_id)
+        if not self.shard_path(key).exists():
+            return None
+        return self.shard(key).read(product_id)
+
+    def read_many(self, product_ids):
+        by_shard = {}
+        for product_id in product_ids:
+            by_shard.setdefault(self.shard_key(product_id), []).append(product_id)
+        found = {}
+        for key, shard_product_ids in by_shard.items():
+            if self.shard_path(key).exists():
+                found.update(self.shard(key).read_many(shard_product_ids))
+        return found
+
+    def check_product(self, product_id: str, product: dict):
+        self.shard(self.shard_key(product_id)).check_product(product_id, product)
+
+    def upsert(self, product_id: str, product: dict):
+        self.write_changes({product_id: product}, None)
+
+    def delete(self, product_id: str):
+        self.write_changes({product_id: None}, None)
+
+    def scan(self, **conditions):
+        '''With a category condition only shards which have that category are read'''
+
+        check_conditions(conditions)
+        for key in self.shard_keys():
+            if "category" in conditions and conditions["category"] not in self.categories.get(key, ()):
+                continue
+            yield from self.shard(key).scan(**conditions)
+
+    def scan_prefix(self, prefix: str, **conditions):
+        '''Yields (product_id, product) whose ID starts with prefix, with ID prefix sharding only
+        shards which can hold such IDs are read'''
+
+        check_conditions(conditions)
+        letters = ID_PREFIX_PATTERN.match(prefix).group().upper()
+        for key in self.shard_keys():
+            if self.shard_count is None:
+                # "E" can be in shards E, EL, ..., "E1" only in shard E
+                if not (key.startswith(letters) if letters == prefix.upper() else key == letters):
+                    continue
+            for product_id, product in self.shard(key).scan(**conditions):
+                if product_id.startswith(prefix):
+                    yield product_id, product
+
+    def aggregates(self):
+        '''Aggregates of every shard are computed in parallel and combined exactly'''
+
+        if not self.exists():
+            return combine([])
+        paths = [str(self.shard_path(key)) for key in self.shard_keys()]
+        pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        with pool_class(self.max_workers) as pool:
+            parts = list(pool.map(shard_aggregates, paths, [self.journaled] * len(paths)))
+        return combine(parts)
+
+    def total_value(self):
+        return self.aggregates()["total_value"]
+
+    def write_changes(self, changes: dict, product_data: dict):
+        '''Writes only the shards which have a changed product'''
+
+        with self.lock:
+            if not self.exists():
+                if product_data is None:
+                    product_data = {product_id: product for product_id, product in changes.items() if product is not None}
+                self.write_all(product_data)
+                return
+            self.read_manifest()  # another process may have added shards
+            by_shard = {}
+            for product_id, product in changes.items():
+                by_shard.setdefault(self.shard_key(product_id), {})[product_id] = product
+            manifest_changed = False
+            for key, shard_changes in by_shard.items():
+                shard = self.shard(key)
+                if key not in self.shard_ids:
+                    # IDs of a shard not loaded by this backend yet, so its other products are kept
+                    self.shard_ids[key] = dict.fromkeys(shard.load_all() if shard.exists() else ())
+                ids = self.shard_ids[key]
+                categories = self.categories.setdefault(key, set())
+                for product_id, product in shard_changes.items():
+                    if product is None:
+                        ids.pop(product_id, None)
+                    else:
+                        ids[product_id] = None
+                        if product["category"] not in categories:
+                            categories.add(product["category"])
+                            manifest_changed = True
+                if product_data is None:
+                    shard_data = None
+                else:
+                    shard_data = {product_id: product_data[product_id] for product_id in ids}
+                if shard_data is None or not shard.exists():
+                    for product_id, product in shard_changes.items():
+                        if product is not None:
+                            shard.upsert(product_id, product)
+                        elif shard.exists():
+                            shard.delete(product_id)
+                else:
+                    shard.write_changes(shard_changes, shard_data)
+            if manifest_changed:
+                self.write_manifest()
+            write_version_file(self.version_path, self.read_version() + 1)
+
+    def write_all(self, product_data: dict):
+        with self.lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            by_shard = {}
+            for product_id, product in product_data.items():
+                by_shard.setdefault(self.shard_key(product_id), {})[product_id] = product
+            for key in set(self.categories) - set(by_shard):
+                if self.shard_path(key).exists():
+                    self.shard(key).write_all({})
+            self.map_shards(lambda key: self.shard(key).write_all(by_shard[key]), list(by_shard))
+            self.shard_ids = {key: dict.fromkeys(shard_data) for key, shard_data in by_shard.items()}
+            self.categories = {key: {product["category"] for product in shard_data.values()}
+                               for key, shard_data in by_shard.items()}
+            self.write_manifest()
+            write_version_file(self.version_path, self.read_version() + 1)
+
+    def compact(self, product_data: dict):
+        self.write_all(product_data)
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        self.shards = {}
@@ -0,0 +1,161 @@
+# This module 'sqlite_storage.py' is a part of 'Inventory Management System' Projects
+# This module stores products in a SQLite database with indexed columns
+
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from inventory.storage import StorageBackend, check_conditions
+from inventory.locking import CatalogLock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_product_name ON products (product_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS products_category ON products (category);
+CREATE INDEX IF NOT EXISTS products_price ON products (price);
+CREATE INDEX IF NOT EXISTS products_quantity ON products (quantity);
+CREATE TABLE IF NOT EXISTS catalog_meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL);
+INSERT OR IGNORE INTO catalog_meta (id, version) VALUES (1, 0);
+"""
+
+# Statements are constant strings, so each pooled connection prepares them once and reuses them
+SELECT_ALL = "SELECT product_id, product_name, quantity, price, category FROM products ORDER BY rowid"
+SELECT_ONE = "SELECT product_id, product_name, quantity, price, category FROM products WHERE product_id = ?"
+UPSERT = """INSERT INTO products (product_id, product_name, quantity, price, category) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (product_id) DO UPDATE SET product_name = excluded.product_name, quantity = excluded.quantity,
+price = excluded.price, category = excluded.category"""
+DELETE = "DELETE FROM products WHERE product_id = ?"
+DELETE_ALL = "DELETE FROM products"
+SELECT_VERSION = "SELECT version FROM catalog_meta WHERE id = 1"
+BUMP_VERSION = "UPDATE catalog_meta SET version = version + 1 WHERE id = 1"
+
+SCAN_CLAUSES = {
+    "category": "category = ?",
+    "product_name": "product_name = ? COLLATE NOCASE",
+    "min_price": "price >= ?",
+    "max_price": "price < ?",
+    "max_quantity": "quantity < ?"
+}
+
+
+def row_to_product(row):
+    product_id, product_name, quantity, price, category = row
+    return product_id, {"product_name": product_name, "quantity": quantity, "price": price, "category": category}
+
+
+def product_to_row(product_id: str, product: dict):
+    return (product_id, product["product_name"], product["quantity"], product["price"], product["category"])
+
+
+class ConnectionPool:
+    ''' This class hands out SQLite connections to threads, at most pool_size are open at once'''
+
+    def __init__(self, db_path, pool_size=4):
+        self.db_path = str(db_path)
+        self.connections = queue.LifoQueue()
+        for _ in range(pool_size):
+            self.connections.put(None)  # connections are opened on first use
+
+    @contextmanager
+    def connection(self):
+        connection = self.connections.get()
+        try:
+            if connection is None:
+                connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            yield connection
+        finally:
+            self.connections.put(connection)
+
+    def close(self):
+        while not self.connections.empty():
+            connection = self.connections.get_nowait()
+            if connection is not None:
+                connection.close()
+
+
+class SQLiteBackend(StorageBackend):
+    ''' Products stored in a SQLite database, product_name, category, price and quantity are indexed.
+    Safe to use from several threads, each call takes a connection from the pool.
+    '''
+
+    def __init__(self, db_path="product_catalog.db", pool_size=4):
+        self.path = Path(db_path)
+        self.pool = ConnectionPool(self.path, pool_size)
+        self.lock = CatalogLock(self.path)
+        with self.pool.connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")  # readers do not wait for writers
+            connection.executescript(SCHEMA)
+
+    def exists(self):
+        return self.path.exists()
+
+    def read_version(self):
+        # Version is increased by every write, also by writes of other processes
+        with self.pool.connection() as connection:
+            return connection.execute(SELECT_VERSION).fetchone()[0]
+
+    def signature(self):
+        return self.read_version()
+
+    def load_all(self):
+        with self.pool.connection() as connection:
+            return dict(row_to_product(row) for row in connection.execute(SELECT_ALL))
+
+    def read(self, product_id: str):
+        with self.pool.connection() as connection:
+            row = connection.execute(SELECT_ONE, (product_id,)).fetchone()
+        return None if row is None else row_to_product(row)[1]
+
+    def read_many(self, product_ids):
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+        placeholders = ", ".join("?" * len(product_ids))
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                f"SELECT product_id, product_name, quantity, price, category FROM products "
+                f"WHERE product_id IN ({placeholders})", product_ids)
+            return dict(row_to_product(row) for row in rows)
+
+    def upsert(self, product_id: str, product: dict):
+        self.write_changes({product_id: product}, None)
+
+    def delete(self, product_id: str):
+        self.write_changes({product_id: None}, None)
+
+    def scan(self, **conditions):
+        check_conditions(conditions)
+        sql = "SELECT product_id, product_name, quantity, price, category FROM products"
+        if conditions:
+            sql += " WHERE " + " AND ".join(SCAN_CLAUSES[name] for name in conditions)
+        with self.pool.connection() as connection:
+            for row in connection.execute(sql + " ORDER BY rowid", list(conditions.values())):
+                yield row_to_product(row)
+
+    def write_changes(self, changes: dict, product_data: dict):
+        '''Writes all changes in one transaction'''
+
+        upserts = [product_to_row(product_id, product) for product_id, product in changes.items() if product is not None]
+        deletes = [(product_id,) for product_id, product in changes.items() if product is None]
+        with self.pool.connection() as connection:
+            with connection:
+                connection.executemany(UPSERT, upserts)
+                connection.executemany(DELETE, deletes)
+                connection.execute(BUMP_VERSION)
+
+    def write_all(self, product_data: dict):
+        with self.pool.connection() as connection:
+            with connection:
+                connection.execute(DELETE_ALL)
+                connection.executemany(UPSERT, (product_to_row(product_id, product)
+                                                for product_id, product in product_data.items()))
+                connection.execute(BUMP_VERSION)
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,304 @@
+# This module 'storage.py' is a part of 'Inventory Management System' Projects
+# This module defines how products are stored, "product_catalog.json" is one implementation of it
+
+import json
+import math
+import os
+import stat
+import tempfile
+import time
+from pathlib import Path
+from inventory.aggregates import summarize
+from inventory.instrumentation import instrumentation
+from inventory.journal import CatalogJournal
+from inventory.json_stream import iter_catalog
+from inventory.locking import CatalogLock, read_version_file, write_version_file
+
+# Conditions understood by StorageBackend.scan(), ranges are half-open: min <= value < max
+SCAN_CONDITIONS = ("category", "product_name", "min_price", "max_price", "max_quantity")
+
+
+def matches_conditions(product: dict, conditions: dict):
+    '''Checks product against scan conditions, used by backends which scan in Python'''
+
+    for name, value in conditions.items():
+        if name == "category" and product["category"] != value:
+            return False
+        elif name == "product_name" and product["product_name"].casefold() != value.casefold():
+            return False
+        elif name == "min_price" and product["price"] < value:
+            return False
+        elif name == "max_price" and product["price"] >= value:
+            return False
+        elif name == "max_quantity" and product["quantity"] >= value:
+            return False
+    return True
+
+
+def check_conditions(conditions: dict):
+    unknown = set(conditions) - set(SCAN_CONDITIONS)
+    if unknown:
+        raise ValueError(f"Unknown scan conditions: {', '.join(sorted(unknown))}")
+
+
+class StorageBackend:
+    ''' This class describes storage of products used by InventoryManager.
+    Products are dicts with keys product_name, quantity, price, category, stored under their product_id.
+    '''
+
+    path = None
+    lock = None  # CatalogLock, held around every read-modify-write of the catalog
+
+    def exists(self):
+        '''Returns True when there is a stored catalog'''
+        raise NotImplementedError
+
+    def signature(self):
+        '''Returns a value which changes whenever stored catalog changes (None when there is no catalog),
+        CatalogCache compares it to decide if the catalog has to be loaded again'''
+        raise NotImplementedError
+
+    def read_version(self):
+        '''Returns version number of stored catalog, increased by every write'''
+        raise NotImplementedError
+
+    def load_all(self):
+        '''Returns whole catalog as {product_id: product}'''
+        raise NotImplementedError
+
+    def read(self, product_id: str):
+        '''Returns one product, or None if there is no such product'''
+        raise NotImplementedError
+
+    def read_many(self, product_ids):
+        '''Returns {product_id: product} for given IDs which exist'''
+        raise NotImplementedError
+
+    def upsert(self, product_id: str, product: dict):
+        '''Adds product or replaces existing one'''
+        raise NotImplementedError
+
+    def delete(self, product_id: str):
+        '''Removes product, does nothing if there is no such product'''
+        raise NotImplementedError
+
+    def scan(self, **conditions):
+        '''Yields (product_id, product) matching all conditions, see SCAN_CONDITIONS'''
+        raise NotImplementedError
+
+    def total_value(self):
+        '''Sum of price * quantity over stored products, read one at a time'''
+
+        return math.fsum(product["price"] * product["quantity"] for product_id, product in self.scan())
+
+    def aggregates(self):
+        '''Inventory totals (see InventoryAggregates.summary, with min_price and max_price) of stored products,
+        computed in one pass without loading the catalog'''
+
+        return summarize(self.scan())
+
+    def check_product(self, product_id: str, product: dict):
+        '''Raises ValueError when the product cannot be stored by this backend (ex. a name too long for
+        fixed-width records). Called before the cached catalog is changed'''
+
+    def write_changes(self, changes: dict, product_data: dict):
+        '''Persists changes {product_id: product or None (removed)}, product_data is whole catalog after them'''
+        raise NotImplementedError
+
+    def write_all(self, product_data: dict):
+        '''Replaces whole stored catalog'''
+        raise NotImplementedError
+
+    def compact(self, product_data: dict):
+        '''Reorganizes storage, if the backend needs that'''
+
+    def close(self):
+        '''Releases files or connections held by the backend'''
+
+
+class JsonFileBackend(StorageBackend):
+    ''' Products stored in one JSON file ("product_catalog.json"), optionally with a journal of changes'''
+
+    def __init__(self, file_path="product_catalog.json"):
+        self.path = Path(file_path)
+        self.journal = None
+        self.lock = CatalogLock(self.path)
+        self.version_path = self.path.with_name(self.path.name + ".version")
+
+    def enable_journal(self, max_records=1000, max_bytes=1_000_000):
+        if self.journal is None:
+            self.journal = CatalogJournal(self.path, max_records, max_bytes)
+
+    def exists(self):
+        return self.path.exists()
+
+    def signature(self):
+        '''(mtime, size, inode) of the file, in journaled mode with signature of the journal added'''
+
+        try:
+            file_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+        if self.journal is not None:
+            return signature + (self.journal.file_signature(),)
+        return signature
+
+    def read_version(self):
+        return read_version_file(self.version_path)
+
+    def load_all(self):
+        with open(self.path, "r") as file:
+            product_data = self.timed_load(file) if instrumentation.enabled else json.load(file)
+        if self.journal is not None:
+            self.journal.replay(product_data)
+        return product_data
+
+    @staticmethod
+    def timed_load(file):
+        # Same as json.load, with read and parse time recorded apart
+        started = time.perf_counter()
+        text = file.read()
+        read_done = time.perf_counter()
+        product_data = json.loads(text)
+        instrumentation.record_read(os.fstat(file.fileno()).st_size, read_done - started,
+                                    time.perf_counter() - read_done)
+        return product_data
+
+    @staticmethod
+    def timed_dump(product_data: dict, file):
+        # Same as json.dump, with serialize and write time recorded apart
+        started = time.perf_counter()
+        text = json.dumps(product_data, indent=4)
+        serialized = time.perf_counter()
+        file.write(text)
+        file.flush()
+        instrumentation.record_write(file.tell(), time.perf_counter() - serialized, serialized - started)
+
+    # A JSON file has no indexes, single product operations go through the whole file
+    def read(self, product_id: str):
+        return self.load_all().get(product_id)
+
+    def read_many(self, product_ids):
+        product_data = self.load_all()
+        return {product_id: product_data[product_id] for product_id in product_ids if product_id in product_data}
+
+    def upsert(self, product_id: str, product: dict):
+        with self.lock:
+            product_data = self.load_all() if self.exists() else {}
+            product_data[product_id] = product
+            self.write_changes({product_id: product}, product_data)
+
+    def delete(self, product_id: str):
+        with self.lock:
+            product_data = self.load_all()
+            if product_data.pop(product_id, None) is not None:
+                self.write_changes({product_id: None}, product_data)
+
+    def scan(self, **conditions):
+        '''Reads the file product by product (see json_stream), the catalog is never loaded at once'''
+
+        check_conditions(conditions)
+        for product_id, product in self.iter_products():
+            if matches_conditions(product, conditions):
+                yield product_id, product
+
+    def iter_products(self):
+        # In journaled mode products changed since the snapshot are taken from the journal
+        changes = {} if self.journal is None else self.journal.changes()
+        for product_id, product in iter_catalog(self.path):
+            if product_id in changes:
+                product = changes.pop(product_id)
+                if product is None:
+                    continue
+            yield product_id, product
+        for product_id, product in changes.items():
+            if product is not None:
+                yield product_id, product
+
+    def write_changes(self, changes: dict, product_data: dict):
+        '''In journaled mode only changes are appended to the journal,
+        otherwise (or when journal is due for compaction) whole catalog is written'''
+
+        with self.lock:
+            if self.journal is None or not self.exists():
+                self.write_all(product_data)
+                return
+            if changes:
+                self.journal.append(changes)
+                write_version_file(self.version_path, self.read_version() + 1)
+            if self.journal.needs_compaction():
+                self.write_all(product_data)
+
+    def compact(self, product_data: dict):
+        self.write_all(product_data)
+
+    def write_all(self, product_data: dict):
+        '''Writes whole catalog to a temporary file and replaces the catalog with it,
+        so the catalog on disk is never half written'''
+
+        with self.lock:
+            handle, temp_path = tempfile.mkstemp(prefix=self.path.name, suffix=".tmp", dir=self.path.parent)
+            try:
+                with os.fdopen(handle, "w") as file:
+                    if instrumentation.enabled:
+                        self.timed_dump(product_data, file)
+                    else:
+                        json.dump(product_data, file, indent=4)
+                os.chmod(temp_path, self.file_mode())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            if self.journal is not None:
+                self.journal.truncate()
+            write_version_file(self.version_path, self.read_version() + 1)
+
+    def file_mode(self):
+        return file_mode(self.path)
+
+
+def file_mode(path):
+    '''Permissions for a catalog file written through a temporary file (created readable by owner only):
+    those of the existing file, or new_file_mode() for a new one'''
+
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return new_file_mode()
+
+
+def new_file_mode():
+    '''Permissions of a new catalog file: 0o666 less the umask of the process. The umask is read from
+    /proc (os.umask can only read it by changing it for all threads), 0o644 where /proc is not available'''
+
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except OSError:
+        pass
+    return 0o644
+
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+BINARY_SUFFIXES = (".bin",)
+SHARDED_SUFFIXES = (".shards",)
+
+
+def storage_for_path(file_path):
+    '''Returns backend for given catalog file: SQLite for .db/.sqlite/.sqlite3 files,
+    fixed-width binary records for .bin files, a directory of shards for .shards, JSON file otherwise'''
+
+    suffix = Path(file_path).suffix.lower()
+    if suffix in SQLITE_SUFFIXES:
+        from inventory.sqlite_storage import SQLiteBackend
+        return SQLiteBackend(file_path)
+    if suffix in BINARY_SUFFIXES:
+        from inventory.binary_storage import BinaryCatalogBackend
+        return BinaryCatalogBackend(file_path)
+    if suffix in SHARDED_SUFFIXES:
+        from inventory.sharded_storage import ShardedBackend
+        return ShardedBackend(file_path)
+    return JsonFileBackend(file_path)
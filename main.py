@@ -1,229 +1,350 @@
+import argparse
 from inventory.inventory_manager import InventoryManager
 from inventory.product import Product
+from inventory.name_index import DuplicateProductNameError
+from inventory.command_runner import run_command_file
+from inventory.instrumentation import instrumentation
 
 
-print("\n")
-print("*"*70)
-print("------------ Welcome to Inventory management System ------------")
-print("*"*70)
-
-manager = InventoryManager()
-while True:
-    print("\nInventory Management System")
-    print("1. Modify/Update Inventory")
-    print("2. Search a Product")  
-    print("3. Modify/update Product")  
-    print("4. Filter Products")  
-    print("5. Exit")  
-    print("-"*75)
-    choice = input("Enter your choice (1-5):  ").strip()
-    print("-"*75)
-
-    if choice == "1":
-        submenu_1 = True
-        while submenu_1:
-            print("\n")
-            print(".......... Modify/Update Inventory (menu) ..........")
-            print("1. Display all products available in inventory")
-            print("2. Get total inventory value")
-            print("3. Add Product")  
-            print("4. Update Product")  
-            print("5. Remove Product")
-            print("6. Go back")
-            print("-"*75)
-            print("You are now in submenu: Modify/Update Inventory")
-            choice = input("Enter your choice (1-6):  ").strip()
-            print("-"*75)
-            if choice == "1":  # Displays all products available in inventory with its price (works ok)
-                all_products = manager.read_product_data()
-                print("Available products in inventory are: ")
-                for item, value in all_products.items():
-                    print(f"-- {all_products[item]['product_name']},  -----   Price: ${all_products[item]['price']:.2f}")
-                print("\n")
-            elif choice == "2":
-                print("-"*75)
-                print(f"Total inventory value is ${manager.get_total_inventory_value()}")
-                print("-"*75)
-            elif choice == "3":  # Adds a product to inventory, by validating id and product (works ok)
-                product_id = input("Enter Product ID (format: A123): ").strip()
-                product_name = input("Enter Product Name: ").strip()
-                quantity = float(input("Enter Quantity: ").strip())
-                price = float(input("Enter Price: ").strip())
-                category = input("Enter Category (Electronics, Furniture, Clothes, Footwear): ").strip()
-                product = Product(product_name, quantity, price, category)
-                try:
-                    manager.add_product(product_id, product)
-                except Exception as e:
-                    print(f"Error: {e}")
-            elif choice == "4":  # updates a product when Product ID is given( works ok)
-                product_id = input("Enter Product ID to update: ").strip()
-                product_name = input("Enter New Product Name: ").strip()
-                quantity = float(input("Enter New Quantity: ").strip())
-                price = float(input("Enter New Price: ").strip())
-                category = input("Enter New Category: ").strip()
-                updated_product = Product(product_name, quantity, price, category)
-                try:
-                    if manager.update_product(product_id, updated_product):
-                        print("Product updated successfully.")
-                    else:
-                        print("Product not found.")
-                except Exception as e:
-                    print(f"Error: {e}")
-            elif choice == "5":  # Removes a product from inventory, when given correct product_id
-                product_id = input("Enter Product ID to remove: ").strip()
-                try:
-                    manager.remove_product(product_id)
-                except Exception as e:
-                    print(f"Error: {e}")
-            elif choice == "6":  # Goes back to main menu
-                submenu_1 = False
-            else:
-                print("Invalid option! Please Enter a no between (1 - 6)")
+def search_by_name(manager, product_name):
+    # Searches product by name, reports when the name is used by more than one product
+    try:
+        return manager.search_product_by_name(product_name)
+    except DuplicateProductNameError as e:
+        print(f"Error: {e}")
+        return False
+
+
+def find_id_by_name(manager, product_name):
+    # Returns ID of product with given name, None when not found or when the name is used by more than one product
+    try:
+        return manager.find_product_id(product_name)
+    except DuplicateProductNameError as e:
+        print(f"Error: {e}")
+        return None
+
+
+def print_stats(manager):
+    # Prints calls and mean latency per operation, then catalog file reads/writes
+    stats = manager.stats()
+    print(f"Instrumentation is {'on' if stats['enabled'] else 'off'}")
+    for operation, operation_stats in stats["operations"].items():
+        print(f"-- {operation}: {operation_stats['calls']} calls, mean {operation_stats['mean_seconds'] * 1000:.3f} ms, "
+              f"max {operation_stats['max_seconds'] * 1000:.3f} ms")
+    file_io = stats["file_io"]
+    print(f"File reads: {file_io['reads']} ({file_io['read_bytes']} bytes, parse {file_io['parse_seconds']:.3f} s)")
+    print(f"File writes: {file_io['writes']} ({file_io['write_bytes']} bytes, serialize {file_io['serialize_seconds']:.3f} s)")
+    print(f"Catalog cache: {stats['cache']['hits']} hits, {stats['cache']['misses']} misses")
 
-    elif choice == "2":
-        submenu_2 = True
-        while submenu_2:
-            print("\n")
-            print(".......... Search a Product (menu) ..........")
-            print("1. Search Product by ID")
-            print("2. Search Product by product_name")  # 1
-            print("3. Go back")
-            print("-"*75)
-            choice = input("Enter your choice (1-3):  ").strip()
-            print("-"*75)
-            if choice == "1":  # Display Product Info/Search product by ID (works ok)
-                product_id = input("Enter Product ID to display: ").strip()
-                product_data = manager.read_product_data()
-                if product_id in product_data:
-                    product_info = product_data[product_id]
-                    print(f"Product ID: {product_id}")
-                    print(f"Name: {product_info['product_name']}")
-                    print(f"Quantity: {product_info['quantity']}")
-                    print(f"Price: {product_info['price']}")
-                    print(f"Category: {product_info['category']}")
-                else:
-                    print("Product not found.")
-
-            elif choice == "2":  # can search a product by name (works ok)
-                product_name = input("Enter name of product:  ").strip()
-                product_found = manager.search_product_by_name(product_name)
-                if product_found:
-                    print(f"Name: {product_found['product_name']}")
-                    print(f"Quantity: {product_found['quantity']}")
-                    print(f"Price: {product_found['price']}")
-                    print(f"Category: {product_found['category']}")
-                else:
-                    print("Product not found.")
 
-            elif choice == "3":  # Goes back to main menu
-                submenu_2 = False
+def run_diagnostics_menu(manager):
+    # Instrumentation stats and profiling of single operations
+    while True:
+        print("\n")
+        print(".......... Diagnostics (menu) ..........")
+        print(f"1. Turn instrumentation {'off' if instrumentation.enabled else 'on'}")
+        print("2. Show stats")
+        print("3. Save stats to a JSON file")
+        print("4. Reset stats")
+        print("5. Profile total inventory value (cProfile)")
+        print("6. Profile memory of loading the catalog (tracemalloc)")
+        print("7. Go back")
+        print("-"*75)
+        choice = input("Enter your choice (1-7):  ").strip()
+        print("-"*75)
+        if choice == "1":
+            if instrumentation.enabled:
+                instrumentation.disable()
             else:
-                print("Invalid option! Please Enter a no between (1 - 3)")
+                instrumentation.enable()
+            print(f"Instrumentation is {'on' if instrumentation.enabled else 'off'}")
+        elif choice == "2":
+            print_stats(manager)
+        elif choice == "3":
+            path = input("Enter file name (default: inventory_stats.json): ").strip() or "inventory_stats.json"
+            manager.dump_stats(path)
+            print(f"Stats saved to {path}")
+        elif choice == "4":
+            instrumentation.reset()
+            print("Stats were reset")
+        elif choice == "5":
+            result, report = manager.profile_operation("get_total_inventory_value")
+            print(report)
+        elif choice == "6":
+            manager.invalidate()
+            result, report = manager.profile_operation("read_product_data", profiler="tracemalloc")
+            print(report)
+        elif choice == "7":
+            return
+        else:
+            print("Invalid option! Please Enter a no between (1 - 7)")
 
-    elif choice == "3":
-        submenu_3 = True
-        while submenu_3:
-            print("\n")
-            print(".......... Modify/Update Product (menu) ..........")
-            print("1. update quantity of specific product")  # 2
-            print("2. Update price of specific product")  # 2
-            print("3. Apply Discount") 
-            print("4. Go back")
-            print("-"*75)
-            choice = input("Enter your choice (1-4):  ").strip()
-            print("-"*75)
-            if choice == "1":  # Updates quantity of a product, when name is given
-                product_name = input("Enter name of product: ").strip()
-                product_found = manager.search_product_by_name(product_name)
-                if isinstance(product_found, dict):
-                    added_quantity = float(input("Enter quantity to be added/subtracted: ").strip())
-                    product_obj = Product(**product_found)
+
+def run_menu(manager):
+    # Interactive menu, started only when main.py is run without --run
+    print("\n")
+    print("*"*70)
+    print("------------ Welcome to Inventory management System ------------")
+    print("*"*70)
+
+    while True:
+        print("\nInventory Management System")
+        print("1. Modify/Update Inventory")
+        print("2. Search a Product")  
+        print("3. Modify/update Product")  
+        print("4. Filter Products")  
+        print("5. Diagnostics")
+        print("6. Exit")  
+        print("-"*75)
+        choice = input("Enter your choice (1-6):  ").strip()
+        print("-"*75)
+
+        if choice == "1":
+            submenu_1 = True
+            while submenu_1:
+                print("\n")
+                print(".......... Modify/Update Inventory (menu) ..........")
+                print("1. Display all products available in inventory")
+                print("2. Get total inventory value")
+                print("3. Add Product")  
+                print("4. Update Product")  
+                print("5. Remove Product")
+                print("6. Go back")
+                print("-"*75)
+                print("You are now in submenu: Modify/Update Inventory")
+                choice = input("Enter your choice (1-6):  ").strip()
+                print("-"*75)
+                if choice == "1":  # Displays all products available in inventory with its price (works ok)
+                    all_products = manager.read_product_data()
+                    print("Available products in inventory are: ")
+                    for item, value in all_products.items():
+                        print(f"-- {all_products[item]['product_name']},  -----   Price: ${all_products[item]['price']:.2f}")
+                    print("\n")
+                elif choice == "2":
+                    print("-"*75)
+                    print(f"Total inventory value is ${manager.get_total_inventory_value()}")
+                    print("-"*75)
+                elif choice == "3":  # Adds a product to inventory, by validating id and product (works ok)
+                    product_id = input("Enter Product ID (format: A123): ").strip()
+                    product_name = input("Enter Product Name: ").strip()
+                    quantity = float(input("Enter Quantity: ").strip())
+                    price = float(input("Enter Price: ").strip())
+                    category = input("Enter Category (Electronics, Furniture, Clothes, Footwear): ").strip()
+                    product = Product(product_name, quantity, price, category)
                     try:
-                        updated_quantity = product_obj.update_quantity(added_quantity)
-                        print(f"Quantity of given product '{product_name}' has been updated to {updated_quantity}")
+                        manager.add_product(product_id, product)
                     except Exception as e:
                         print(f"Error: {e}")
-                else:
-                    print("Product not found!")
-            elif choice == "2":  # # Updates price of a product, when name is given
-                product_name = input("Enter name of product: ").strip()
-                product_found = manager.search_product_by_name(product_name)
-                if isinstance(product_found, dict):
-                    updated_price = float(input("Enter new price: ").strip())
-                    product_obj = Product(**product_found)
+                elif choice == "4":  # updates a product when Product ID is given( works ok)
+                    product_id = input("Enter Product ID to update: ").strip()
+                    product_name = input("Enter New Product Name: ").strip()
+                    quantity = float(input("Enter New Quantity: ").strip())
+                    price = float(input("Enter New Price: ").strip())
+                    category = input("Enter New Category: ").strip()
+                    updated_product = Product(product_name, quantity, price, category)
                     try:
-                        product_obj.update_price(updated_price)
-                        print("\n")
-                        print(f"Price of given product '{product_name}' has been updated to '${updated_price}'")
+                        if manager.update_product(product_id, updated_product):
+                            print("Product updated successfully.")
+                        else:
+                            print("Product not found.")
                     except Exception as e:
                         print(f"Error: {e}")
-                else:
-                    print("Product not found!")
-            elif choice == "3":  # applies discount to a product, when name is given
-                product_name = input("Enter name of product: ").strip()
-                product_found = manager.search_product_by_name(product_name)
-                if isinstance(product_found, dict):
-                    product_found_obj = Product(**product_found)
-                    discount_percentage = float(input("Enter Discount Percentage: "))
+                elif choice == "5":  # Removes a product from inventory, when given correct product_id
+                    product_id = input("Enter Product ID to remove: ").strip()
                     try:
-                        if product_found:
-                            product_found_obj.apply_discount(discount_percentage)
-                            print("\n")
-                            print(f"Discount applied successfully! New Price: {product_found_obj.price}")
-                        else:
-                            print("\n")
-                            print("Product not found.")
+                        manager.remove_product(product_id)
                     except Exception as e:
                         print(f"Error: {e}")
+                elif choice == "6":  # Goes back to main menu
+                    submenu_1 = False
                 else:
-                    print("Product not found!")
-            elif choice == "4":  # Goes back to main menu
-                submenu_3 = False
-            else:
-                print("Invalid option! Please Enter a no between (1 - 4)")
+                    print("Invalid option! Please Enter a no between (1 - 6)")
 
-    elif choice == "4":
-        submenu_4 = True
-        while submenu_4:
-            print("\n")
-            print(".......... Filter Products (menu) ..........")
-            print("1. Filter products by price")  # 3
-            print("2. Filter products by category")  # 3
-            print("3. Filter products by low quantity (less than 5)")
-            print("4. Go back")
-            print("-"*75)
-            choice = input("Enter your choice (1-4):  ").strip()
-            print("-"*75)
-            if choice == "1":  # Provides a list of products with price below given price
-                result = manager.filter_product_by_price()
-                if result:
-                    for items in result:
-                        print(f"Product_name: {items[1]['product_name']}--- Product_price: {items[1]['price']}")
+        elif choice == "2":
+            submenu_2 = True
+            while submenu_2:
+                print("\n")
+                print(".......... Search a Product (menu) ..........")
+                print("1. Search Product by ID")
+                print("2. Search Product by product_name")  # 1
+                print("3. Search Products by start of product_name")
+                print("4. Go back")
+                print("-"*75)
+                choice = input("Enter your choice (1-4):  ").strip()
+                print("-"*75)
+                if choice == "1":  # Display Product Info/Search product by ID (works ok)
+                    product_id = input("Enter Product ID to display: ").strip()
+                    product_data = manager.read_product_data()
+                    if product_id in product_data:
+                        product_info = product_data[product_id]
+                        print(f"Product ID: {product_id}")
+                        print(f"Name: {product_info['product_name']}")
+                        print(f"Quantity: {product_info['quantity']}")
+                        print(f"Price: {product_info['price']}")
+                        print(f"Category: {product_info['category']}")
+                    else:
+                        print("Product not found.")
+
+                elif choice == "2":  # can search a product by name (works ok)
+                    product_name = input("Enter name of product:  ").strip()
+                    product_found = search_by_name(manager, product_name)
+                    if product_found:
+                        print(f"Name: {product_found['product_name']}")
+                        print(f"Quantity: {product_found['quantity']}")
+                        print(f"Price: {product_found['price']}")
+                        print(f"Category: {product_found['category']}")
+                    else:
+                        print("Product not found.")
+                        similar = manager.fuzzy_search(product_name, limit=5)
+                        if similar:
+                            print("Did you mean: " + ", ".join(product["product_name"] for product_id, product in similar))
+
+                elif choice == "3":  # Lists products whose name starts with given text
+                    prefix = input("Enter start of product name:  ").strip()
+                    products = manager.search_by_prefix(prefix, limit=20)
+                    for product_id, product in products:
+                        print(f"-- {product_id}: {product['product_name']},  -----   Price: ${product['price']:.2f}")
+                    if not products:
+                        print("No product found!")
+
+                elif choice == "4":  # Goes back to main menu
+                    submenu_2 = False
                 else:
-                    print("No product found!")
-            elif choice == "2":  # Provides a list of products with choosen category
-                products = manager.filter_product_by_category()
-                if isinstance(products, list):
-                    for items in products:
-                        print(f"Product_name: {items[1]['product_name']}--- Product_price: {items[1]['price']}")
+                    print("Invalid option! Please Enter a no between (1 - 4)")
+
+        elif choice == "3":
+            submenu_3 = True
+            while submenu_3:
+                print("\n")
+                print(".......... Modify/Update Product (menu) ..........")
+                print("1. update quantity of specific product")  # 2
+                print("2. Update price of specific product")  # 2
+                print("3. Apply Discount") 
+                print("4. Go back")
+                print("-"*75)
+                choice = input("Enter your choice (1-4):  ").strip()
+                print("-"*75)
+                if choice == "1":  # Updates quantity of a product, when name is given
+                    product_name = input("Enter name of product: ").strip()
+                    product_id = find_id_by_name(manager, product_name)
+                    if product_id is not None:
+                        added_quantity = float(input("Enter quantity to be added/subtracted: ").strip())
+                        try:
+                            updated_quantity = manager.increment_quantity(product_id, added_quantity)
+                            print(f"Quantity of given product '{product_name}' has been updated to {updated_quantity}")
+                        except Exception as e:
+                            print(f"Error: {e}")
+                    else:
+                        print("Product not found!")
+                elif choice == "2":  # # Updates price of a product, when name is given
+                    product_name = input("Enter name of product: ").strip()
+                    product_id = find_id_by_name(manager, product_name)
+                    if product_id is not None:
+                        updated_price = float(input("Enter new price: ").strip())
+                        try:
+                            manager.update_price(product_id, updated_price)
+                            print("\n")
+                            print(f"Price of given product '{product_name}' has been updated to '${updated_price}'")
+                        except Exception as e:
+                            print(f"Error: {e}")
+                    else:
+                        print("Product not found!")
+                elif choice == "3":  # applies discount to a product, when name is given
+                    product_name = input("Enter name of product: ").strip()
+                    product_id = find_id_by_name(manager, product_name)
+                    if product_id is not None:
+                        discount_percentage = float(input("Enter Discount Percentage: "))
+                        try:
+                            new_price = manager.apply_discount(product_id, discount_percentage)
+                            print("\n")
+                            print(f"Discount applied successfully! New Price: {new_price}")
+                        except Exception as e:
+                            print(f"Error: {e}")
+                    else:
+                        print("Product not found!")
+                elif choice == "4":  # Goes back to main menu
+                    submenu_3 = False
                 else:
-                    print("Category not found!")
-            elif choice == "3":  # Provides a list of products with quantity less than 5
-                products_found = manager.filter_product_with_low_quantity()
-                try:
-                    for items in products_found:
-                        print(f"Product_name: {items[1]['product_name']}--- Product_quantity: {items[1]['quantity']}")
-                except TypeError:
-                    print("No need to update quantity of any product")
-            elif choice == "4":  # Goes back to main menu
-                submenu_4 = False
-            else:
-                print("Invalid option! Please Enter a no between (1 - 4)")
+                    print("Invalid option! Please Enter a no between (1 - 4)")
 
-    elif choice == "5":
-        print("Exiting the Inventory Management System.")
-        print("\n")
-        break
-    else:
-        print("Invalid choice. Please try again.")
-        print("\n")
+        elif choice == "4":
+            submenu_4 = True
+            while submenu_4:
+                print("\n")
+                print(".......... Filter Products (menu) ..........")
+                print("1. Filter products by price")  # 3
+                print("2. Filter products by category")  # 3
+                print("3. Filter products by low quantity (less than 5 by default)")
+                print("4. Go back")
+                print("-"*75)
+                choice = input("Enter your choice (1-4):  ").strip()
+                print("-"*75)
+                if choice == "1":  # Provides a list of products with price below given price
+                    print("products will be filtered between 0 and price provided")
+                    try:
+                        price = float(input("Please enter your price: "))
+                        result = manager.find_by_price_range(max_price=price)
+                    except ValueError:
+                        print("Price should be a number")
+                        result = []
+                    if result:
+                        for items in result:
+                            print(f"Product_name: {items[1]['product_name']}--- Product_price: {items[1]['price']}")
+                    else:
+                        print("No product found!")
+                elif choice == "2":  # Provides a list of products with choosen category
+                    products = manager.filter_product_by_category()
+                    if isinstance(products, list):
+                        for items in products:
+                            print(f"Product_name: {items[1]['product_name']}--- Product_price: {items[1]['price']}")
+                    else:
+                        print("Category not found!")
+                elif choice == "3":  # Provides a list of products with quantity less than 5
+                    products_found = manager.filter_product_with_low_quantity()
+                    try:
+                        for items in products_found:
+                            print(f"Product_name: {items[1]['product_name']}--- Product_quantity: {items[1]['quantity']}")
+                    except TypeError:
+                        print("No need to update quantity of any product")
+                elif choice == "4":  # Goes back to main menu
+                    submenu_4 = False
+                else:
+                    print("Invalid option! Please Enter a no between (1 - 4)")
+
+        elif choice == "5":
+            run_diagnostics_menu(manager)
+
+        elif choice == "6":
+            print("Exiting the Inventory Management System.")
+            print("\n")
+            break
+        else:
+            print("Invalid choice. Please try again.")
+            print("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventory Management System")
+    parser.add_argument("--run", metavar="COMMANDS_JSONL", help="run commands from a JSONL file instead of the menu")
+    parser.add_argument("--output", help="file for results of --run (JSONL), standard output by default")
+    parser.add_argument("--commit-every", type=int, help="write changes every N commands, by default once at the end")
+    parser.add_argument("--catalog", default="product_catalog.json")
+    parser.add_argument("--ledger", action="store_true", help="record every stock change in the stock movement ledger")
+    parser.add_argument("--stats", metavar="STATS_JSON", help="turn instrumentation on and save its stats to this file at exit")
+    args = parser.parse_args(argv)
+
+    manager = InventoryManager(args.catalog, ledger=args.ledger)
+    if args.stats:
+        instrumentation.enable()
+    try:
+        if args.run:
+            run_command_file(manager, args.run, args.output, args.commit_every)
+        else:
+            run_menu(manager)
+    finally:
+        if args.stats:
+            manager.dump_stats(args.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import unittest
+from inventory.aggregates import InventoryAggregates
+
+
+class TestInventoryAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = {
+            "E100": {"product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+            "E210": {"product_name": "cable", "quantity": 20.0, "price": 10.1, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        }
+        self.aggregates = InventoryAggregates()
+        self.aggregates.build(self.catalog)
+
+    def test_summary(self):
+        summary = self.aggregates.summary()
+        self.assertEqual(summary["total_value"], 315.0 * 75.0 + 10.1 * 20.0 + 150.0)
+        self.assertEqual(summary["total_units"], 98.0)
+        self.assertEqual(summary["count_by_category"], {"Electronics": 2, "Furniture": 1})
+        self.assertEqual(summary["value_by_category"]["Furniture"], 150.0)
+
+    def test_many_changes_do_not_drift(self):
+        """Applying and reverting many price changes leaves totals exactly as recomputed."""
+        product = self.catalog["E210"]
+        for step in range(1000):
+            changed = dict(product, price=product["price"] + 0.1)
+            self.aggregates.remove("E210", product)
+            self.aggregates.add("E210", changed)
+            self.catalog["E210"] = product = changed
+        self.assertEqual(self.aggregates.verify(self.catalog), {})
+
+    def test_removing_last_product_of_category(self):
+        self.aggregates.remove("F100", self.catalog.pop("F100"))
+        self.assertNotIn("Furniture", self.aggregates.summary()["value_by_category"])
+        self.assertEqual(self.aggregates.verify(self.catalog), {})
+
+    def test_verify_reports_difference(self):
+        self.catalog["F100"] = dict(self.catalog["F100"], quantity=4.0)
+        self.assertEqual(self.aggregates.verify(self.catalog)["total_units"], (98.0, 99.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
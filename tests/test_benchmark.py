@@ -0,0 +1,40 @@
+import copy
+import unittest
+from inventory.benchmark import compare, generate_catalog, run_benchmarks
+from inventory.catalog_cache import _shared_caches
+from inventory.inventory_manager import InventoryManager, WIDE_PRODUCT_ID_PATTERN
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_generated_catalog_is_valid(self):
+        narrow = InventoryManager("unused.json")
+        wide = InventoryManager("unused.json", product_id_pattern=WIDE_PRODUCT_ID_PATTERN)
+        for manager, catalog in ((narrow, generate_catalog(2000)), (wide, generate_catalog(30, wide=True))):
+            for product_id, product in catalog.items():
+                manager.valid_product_id(product_id)
+                manager.validate_fields(product["product_name"], product["quantity"], product["price"],
+                                        product["category"])
+        self.assertEqual(len(generate_catalog(2000)), 2000)
+        self.assertEqual(generate_catalog(50, seed=1), generate_catalog(50, seed=1))
+
+    def test_run_and_compare(self):
+        caches = set(_shared_caches)
+        report = run_benchmarks([100], min_seconds=60, max_operations=2)
+        self.assertEqual(set(_shared_caches), caches)  # the generated catalog was released
+        results = report["results"]["100"]
+        for name in ("load", "lookup_by_id", "search_by_name", "filter_by_price", "filter_by_category",
+                     "filter_low_quantity", "total_value", "add_product", "update_product", "remove_product",
+                     "update_quantity", "update_price", "apply_discount", "product_apply_discount"):
+            self.assertEqual(results[name]["operations"], 2)
+            self.assertIn("peak_memory_bytes", results[name])
+        self.assertEqual(compare(report, report), [])
+        baseline = copy.deepcopy(report)
+        baseline["results"]["100"]["load"]["ops_per_second"] = results["load"]["ops_per_second"] * 2
+        regressions = compare(report, baseline, tolerance=0.2)
+        self.assertEqual([(regression["operation"], regression["metric"]) for regression in regressions],
+                         [("load", "ops_per_second")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.binary_storage import BinaryCatalogBackend, INITIAL_CAPACITY, QUANTITY_OFFSET, VERSION_OFFSET, record_offset
+from inventory.inventory_manager import InventoryManager
+from inventory.migrate import migrate_catalog
+from inventory.product import Product
+from inventory.storage import new_file_mode
+
+
+class TestBinaryCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.binary = self.directory / "product_catalog.bin"
+        self.assertEqual(migrate_catalog("product_catalog.json", self.binary), 27)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lossless_conversion(self):
+        migrate_catalog(self.binary, self.directory / "product_catalog.json")
+        original = Path("product_catalog.json").read_text()
+        self.assertEqual((self.directory / "product_catalog.json").read_text(), original)
+        self.assertEqual(list(BinaryCatalogBackend(self.binary).load_all().items()), list(json.loads(original).items()))
+
+    def test_file_mode(self):
+        self.assertEqual(stat.S_IMODE(self.binary.stat().st_mode), new_file_mode())
+        os.chmod(self.binary, 0o640)
+        BinaryCatalogBackend(self.binary).write_all({})
+        self.assertEqual(stat.S_IMODE(self.binary.stat().st_mode), 0o640)
+
+    def test_quantity_change_is_written_in_place(self):
+        manager = InventoryManager(self.binary)
+        before = self.binary.read_bytes()
+        manager.increment_quantity("E100", 5.0)
+        after = self.binary.read_bytes()
+        self.assertEqual(len(before), len(after))
+        changed = [position for position in range(len(before)) if before[position] != after[position]]
+        # only the version counter in the header and the 8 bytes of the quantity of E100 (first record)
+        quantity = record_offset(0) + QUANTITY_OFFSET
+        allowed = set(range(VERSION_OFFSET, VERSION_OFFSET + 8)) | set(range(quantity, quantity + 8))
+        self.assertTrue(changed)
+        self.assertTrue(set(changed) <= allowed)
+        self.assertEqual(BinaryCatalogBackend(self.binary).read("E100")["quantity"], 80.0)
+
+    def test_update_fields(self):
+        backend = BinaryCatalogBackend(self.binary)
+        other = BinaryCatalogBackend(self.binary)  # like a second process mapping the same file
+        version = other.read_version()
+        backend.update_fields("E100", quantity=1.0, price=2.5)
+        self.assertEqual(other.read("E100")["quantity"], 1.0)
+        self.assertEqual(other.read("E100")["price"], 2.5)
+        self.assertEqual(other.read_version(), version + 1)
+        with self.assertRaises(KeyError):
+            backend.update_fields("X999", quantity=1.0)
+
+    def test_total_value(self):
+        plain = InventoryManager(self.directory / "copy.json")
+        migrate_catalog(self.binary, plain.database)
+        streaming = InventoryManager(self.binary, streaming=True)
+        self.assertEqual(streaming.get_total_inventory_value(), plain.get_total_inventory_value())
+        self.assertEqual(BinaryCatalogBackend(self.binary).total_value(), plain.get_total_inventory_value())
+
+    def test_growing_and_other_readers(self):
+        backend = BinaryCatalogBackend(self.binary)
+        other = BinaryCatalogBackend(self.binary)
+        self.assertEqual(len(other.load_all()), 27)
+        backend.write_changes({f"Z{number:03d}": {"product_name": "bolt", "quantity": 1.0, "price": 0.5,
+                                                  "category": "Hardware"} for number in range(INITIAL_CAPACITY)}, None)
+        backend.delete("E100")
+        product_data = other.load_all()
+        self.assertEqual(len(product_data), 26 + INITIAL_CAPACITY)
+        self.assertNotIn("E100", product_data)
+        self.assertEqual(product_data["Z999"]["category"], "Hardware")
+
+    def test_category_added_by_other_writer(self):
+        backend = BinaryCatalogBackend(self.binary)
+        other = BinaryCatalogBackend(self.binary)
+        self.assertEqual(other.read("E100")["category"], "Electronics")
+        backend.upsert("E100", dict(backend.read("E100"), category="Toys"))  # rewrites the record, layout stays
+        self.assertEqual(other.read("E100")["category"], "Toys")
+        self.assertEqual(other.load_all()["E100"]["category"], "Toys")
+
+    def test_too_long_name_is_rejected_before_cache_changes(self):
+        manager = InventoryManager(self.binary)
+        with self.assertRaises(ValueError):
+            manager.add_product("C900", Product("x" * 70, 1.0, 5.0, "Clothes"))
+        self.assertNotIn("C900", manager.read_product_data())
+        self.assertEqual(manager.cache.pending, {})
+        manager.add_product("C901", Product("hat", 1.0, 5.0, "Clothes"))
+        self.assertEqual(BinaryCatalogBackend(self.binary).read("C901")["product_name"], "hat")
+
+    def test_too_long_name_changes_nothing(self):
+        backend = BinaryCatalogBackend(self.binary)
+        before = self.binary.read_bytes()
+        with self.assertRaises(ValueError):
+            backend.write_changes({"E100": dict(backend.read("E100"), quantity=1.0),
+                                   "C999": {"product_name": "x" * 65, "quantity": 1.0, "price": 1.0, "category": "Clothes"}}, None)
+        self.assertEqual(self.binary.read_bytes(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.bulk_io import read_rows, write_rows, chunked, detect_format
+
+
+class TestBulkIO(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rows = [
+            {"product_id": "E100", "product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+            {"product_id": "F100", "product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_jsonl_round_trip(self):
+        path = Path(self.tmp_dir.name) / "products.jsonl"
+        self.assertEqual(write_rows(path, iter(self.rows)), 2)
+        self.assertEqual(list(read_rows(path)), self.rows)
+
+    def test_csv_round_trip(self):
+        """CSV values come back as strings."""
+        path = Path(self.tmp_dir.name) / "products.csv"
+        write_rows(path, self.rows)
+        rows = list(read_rows(path))
+        self.assertEqual(rows[1]["product_name"], "Chair")
+        self.assertEqual(float(rows[1]["price"]), 50.0)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            detect_format("products.xml")
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.catalog_cache import CatalogCache, release_cache, shared_cache
+from inventory.low_stock import LowStockTracker
+from inventory.price_index import PriceIndex
+
+
+class TestCatalogCache(unittest.TestCase):
+
+    def setUp(self):
+        """Write a small catalog to a temporary file."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        self.write_catalog({"E101": {"product_name": "Laptop", "quantity": 10.0, "price": 1000.0, "category": "Electronics"}})
+        self.cache = CatalogCache(self.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_catalog(self, data):
+        with open(self.database, "w") as file:
+            json.dump(data, file, indent=4)
+
+    def test_second_load_is_a_hit(self):
+        """The file is parsed only once while it does not change."""
+        first = self.cache.load()
+        second = self.cache.load()
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "cached": True})
+
+    def test_reload_when_file_changes(self):
+        """A change of the file on disk is picked up on next load."""
+        self.cache.load()
+        self.write_catalog({"F100": {"product_name": "Chair", "quantity": 5.0, "price": 50.0, "category": "Furniture"}})
+        stat = os.stat(self.database)
+        os.utime(self.database, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertIn("F100", self.cache.load())
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_invalidate(self):
+        """After invalidate() the file is read again."""
+        self.cache.load()
+        self.cache.invalidate()
+        self.cache.load()
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_invalidate_drops_indexes_built_on_demand(self):
+        self.cache.load()
+        self.cache.index(PriceIndex)
+        tracker = self.cache.index(LowStockTracker)
+        tracker.category_thresholds["Electronics"] = 20.0
+        self.cache.invalidate()
+        self.assertEqual(self.cache.indexes, [self.cache.name_index, tracker])
+        self.assertEqual(tracker.product_ids(), [])
+        self.cache.load()
+        self.assertEqual(tracker.product_ids(), ["E101"])
+        self.assertEqual(self.cache.name_index.lookup("laptop"), "E101")
+
+    def test_release_cache(self):
+        cache = shared_cache(self.database)
+        self.assertIs(shared_cache(self.database), cache)
+        release_cache(self.database)
+        self.assertIsNone(cache.product_data)
+        self.assertIsNot(shared_cache(self.database, journaled=True), cache)
+        release_cache(self.database)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from inventory.columnar import numpy_available
+from inventory.inventory_manager import InventoryManager
+from inventory.product import Product
+
+
+@unittest.skipUnless(numpy_available(), "NumPy is not installed")
+class TestColumnarCatalog(unittest.TestCase):
+
+    def setUp(self):
+        """Create the same catalog for a columnar and a plain manager."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        generator = random.Random(7)
+        categories = ["Electronics", "Furniture", "Clothes", "Footwear"]
+        catalog = {}
+        for number in range(300):
+            catalog[f"{categories[number % 4][0]}{number:03d}"] = {
+                "product_name": f"product_{number}",
+                "quantity": float(generator.randint(0, 20)),
+                "price": round(generator.uniform(0.1, 999.99), 2),
+                "category": categories[number % 4]
+            }
+        with open(self.database, "w") as file:
+            json.dump(catalog, file, indent=4)
+        self.plain = InventoryManager(self.database)
+        self.columnar = InventoryManager(self.database, columnar=True)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_results_as_dict_methods(self):
+        self.assertEqual(self.columnar.get_total_inventory_value(), self.plain.get_total_inventory_value())
+        self.assertEqual(self.columnar.get_category_values(), self.plain.get_category_values())
+        self.assertEqual(self.columnar.filter_product_with_low_quantity(), self.plain.filter_product_with_low_quantity())
+        self.assertEqual(self.columnar.products_in_category("Footwear"), self.plain.products_in_category("Footwear"))
+        with patch("builtins.input", return_value="250"):
+            self.assertEqual(self.columnar.filter_product_by_price(), self.plain.filter_product_by_price())
+
+    def test_low_stock_thresholds(self):
+        self.plain.set_low_stock_threshold(10.0, category="Furniture")
+        self.plain.set_low_stock_threshold(0.0, product_id="E000")
+        self.plain.set_low_stock_threshold(30.0, product_id="C002")
+        # The tracker lists products in the order they became low, the arrays in catalog order
+        self.assertEqual(sorted(self.columnar.low_stock_products()), sorted(self.plain.low_stock_products()))
+        self.assertEqual(self.columnar.columnar_catalog().ids_with_quantity_below(1.0),
+                         [product_id for product_id, product in self.plain.read_product_data().items() if product["quantity"] < 1.0])
+
+    def test_totals_follow_changes(self):
+        self.columnar.increment_quantity("F001", 5.0)
+        self.columnar.remove_product("E000")
+        self.assertEqual(self.columnar.get_total_inventory_value(), self.plain.get_total_inventory_value())
+        self.assertEqual(self.columnar.get_category_values(), self.plain.get_category_values())
+
+    def test_view_is_rebuilt_only_after_change(self):
+        view = self.columnar.columnar_catalog()
+        self.assertIs(self.columnar.columnar_catalog(), view)
+        self.columnar.add_product("C999", Product("hat", 2.0, 10.0, "Clothes"))
+        self.assertIsNot(self.columnar.columnar_catalog(), view)
+        self.assertIn("C999", self.columnar.columnar_catalog().ids_in_category("Clothes"))
+
+
+if __name__ == "__main__":
+    unittest.main()
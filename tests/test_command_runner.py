@@ -0,0 +1,113 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from inventory.command_runner import CommandRunner, run_command_file
+from inventory.inventory_manager import InventoryManager
+
+
+class TestCommandRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        with open(self.database, "w") as file:
+            json.dump({
+                "E100": {"product_name": "TV", "quantity": 10.0, "price": 300.0, "category": "Electronics"},
+                "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+            }, file, indent=4)
+        self.manager = InventoryManager(self.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_commands(self, commands, commit_every=None):
+        output = io.StringIO()
+        lines = [command if isinstance(command, str) else json.dumps(command) for command in commands]
+        summary = CommandRunner(self.manager, commit_every).run(lines, output)
+        return summary, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def stored_catalog(self):
+        with open(self.database, "r") as file:
+            return json.load(file)
+
+    def test_commands_run_against_one_catalog(self):
+        summary, records = self.run_commands([
+            {"op": "add", "product_id": "C100", "product_name": "Shirt", "quantity": 4, "price": 20,
+             "category": "Clothes"},
+            {"op": "quantity", "product_name": "shirt", "delta": 2},
+            {"op": "price", "product_id": "E100", "price": 250},
+            {"op": "discount", "product_id": "E100", "percentage": 10},
+            {"op": "search", "product_name": "Shirt"},
+            {"op": "filter", "max_price": 100, "order_by": "price"},
+            {"op": "remove", "product_id": "F100"},
+            {"op": "aggregates"}
+        ])
+        self.assertEqual(summary, {"commands": 8, "errors": 0, "commits": 1})
+        self.assertEqual(records[1]["result"], {"product_id": "C100", "quantity": 6.0})
+        self.assertEqual(records[3]["result"], {"product_id": "E100", "price": 225.0})
+        self.assertEqual(records[4]["result"]["product_id"], "C100")
+        self.assertEqual([item["product_id"] for item in records[5]["result"]], ["C100", "F100"])
+        self.assertEqual(records[7]["result"]["total_value"], 6.0 * 20.0 + 10.0 * 225.0)
+        self.assertEqual(records[-1], {"op": "commit", "ok": True, "commands": 8})
+        self.assertEqual(sorted(self.stored_catalog()), ["C100", "E100"])
+
+    def test_errors_are_reported_and_skipped(self):
+        summary, records = self.run_commands([
+            "not json",
+            {"op": "explode"},
+            {"op": "remove", "product_id": "X999"},
+            {"op": "discount", "product_id": "E100", "percentage": 150},
+            {"op": "price", "product_id": "E100"},
+            {"op": "quantity", "product_id": "E100", "delta": 1}
+        ])
+        self.assertEqual(summary["errors"], 5)
+        self.assertEqual([record["ok"] for record in records[:6]], [False] * 5 + [True])
+        self.assertIn("Invalid JSON", records[0]["error"])
+        self.assertEqual(records[4]["error"], "Missing field 'price'")
+        self.assertEqual(self.stored_catalog()["E100"]["quantity"], 11.0)
+        self.assertEqual(self.stored_catalog()["E100"]["price"], 300.0)
+
+    def test_commit_every(self):
+        with patch.object(self.manager.cache.storage, "write_changes",
+                          wraps=self.manager.cache.storage.write_changes) as write_changes:
+            summary, records = self.run_commands(
+                [{"op": "quantity", "product_id": "E100", "delta": 1}] * 5, commit_every=2)
+        self.assertEqual(summary["commits"], 3)
+        self.assertEqual(write_changes.call_count, 3)
+        self.assertEqual([record["commands"] for record in records if record["op"] == "commit"], [2, 2, 1])
+        self.assertEqual(self.stored_catalog()["E100"]["quantity"], 15.0)
+
+    def test_run_command_file(self):
+        commands = Path(self.tmp_dir.name) / "commands.jsonl"
+        results = Path(self.tmp_dir.name) / "results.jsonl"
+        commands.write_text(json.dumps({"op": "get", "product_id": "F100"}) + "\n\n")
+        run_command_file(self.manager, commands, results)
+        records = [json.loads(line) for line in results.read_text().splitlines()]
+        self.assertEqual(records[0]["result"]["product_name"], "Chair")
+
+    def test_adds_to_missing_catalog(self):
+        database = Path(self.tmp_dir.name) / "new_catalog.json"
+        commands = Path(self.tmp_dir.name) / "commands.jsonl"
+        commands.write_text("".join(json.dumps({"op": "add", "product_id": product_id, "product_name": name,
+                                                "quantity": 1, "price": 10, "category": "Clothes"}) + "\n"
+                                    for product_id, name in (("C100", "Shirt"), ("C101", "Hat"), ("C102", "Scarf"))))
+        with patch("sys.stdout", new_callable=io.StringIO) as output, patch("sys.stderr", new_callable=io.StringIO) as errors:
+            summary = run_command_file(InventoryManager(database), commands)
+        self.assertEqual(summary, {"commands": 3, "errors": 0, "commits": 1})
+        records = [json.loads(line) for line in output.getvalue().splitlines()]  # only results, all of them JSON
+        self.assertEqual([record["ok"] for record in records], [True, True, True, True])
+        self.assertIn("does not exist", errors.getvalue())
+        with open(database) as file:
+            self.assertEqual(sorted(json.load(file)), ["C100", "C101", "C102"])
+
+    def test_importing_main_does_not_start_menu(self):
+        with patch("builtins.input", side_effect=AssertionError("menu started")):
+            import main
+        self.assertTrue(callable(main.main))
+
+
+if __name__ == "__main__":
+    unittest.main()
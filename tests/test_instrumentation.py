@@ -0,0 +1,97 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from inventory.instrumentation import LatencyHistogram, instrumentation
+from inventory.inventory_manager import InventoryManager
+from inventory.product import Product
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        with open(self.database, "w") as file:
+            json.dump({
+                "E100": {"product_name": "TV", "quantity": 10.0, "price": 300.0, "category": "Electronics"},
+                "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+            }, file, indent=4)
+        self.manager = InventoryManager(self.database)
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        self.tmp_dir.cleanup()
+
+    def test_disabled_leaves_methods_alone(self):
+        original = InventoryManager.__dict__["add_product"]
+        instrumentation.enable()
+        self.assertIsNot(InventoryManager.__dict__["add_product"], original)
+        instrumentation.disable()
+        self.assertIs(InventoryManager.__dict__["add_product"], original)
+        self.manager.increment_quantity("E100", 1.0)
+        Product("TV", 1.0, 2.0, "Electronics").apply_discount(10)
+        stats = self.manager.stats()
+        self.assertEqual(stats["operations"], {})
+        self.assertEqual(stats["file_io"]["reads"], 0)
+        self.assertEqual(stats["file_io"]["writes"], 0)
+
+    def test_operations_and_file_io(self):
+        instrumentation.enable()
+        with patch("sys.stdout", new_callable=io.StringIO):
+            self.manager.increment_quantity("E100", 1.0)
+            self.manager.apply_discount("E100", 10)
+            self.manager.invalidate()
+            self.manager.get_total_inventory_value()
+        stats = self.manager.stats()
+        operations = stats["operations"]
+        self.assertEqual(operations["manager.increment_quantity"]["calls"], 1)
+        self.assertEqual(operations["manager.change_product"]["calls"], 2)
+        self.assertEqual(operations["product.apply_discount"]["calls"], 1)
+        self.assertEqual(sum(operations["manager.apply_discount"]["histogram"].values()), 1)
+        self.assertEqual(stats["file_io"]["writes"], 2)
+        self.assertEqual(stats["file_io"]["reads"], 2)  # first load and the load after invalidate()
+        self.assertEqual(stats["file_io"]["read_bytes"], self.database.stat().st_size * 2)
+        self.assertGreater(stats["file_io"]["write_bytes"], 0)
+        stats_path = Path(self.tmp_dir.name) / "stats.json"
+        self.manager.dump_stats(stats_path)
+        with open(stats_path) as file:
+            dumped = json.load(file)
+        self.assertEqual(dumped["operations"]["manager.increment_quantity"]["calls"], 1)
+        self.assertIn("misses", dumped["cache"])
+
+    def test_histogram_buckets(self):
+        histogram = LatencyHistogram()
+        for seconds in (5e-7, 2e-3, 2e-3, 20.0):
+            histogram.add(seconds)
+        self.assertEqual(histogram.to_dict()["histogram"], {"<=1us": 1, "<=10ms": 2, ">10s": 1})
+        self.assertEqual(histogram.to_dict()["max_seconds"], 20.0)
+
+    def test_profile_operation(self):
+        result, report = self.manager.profile_operation("get_total_inventory_value")
+        self.assertEqual(result, 10.0 * 300.0 + 3.0 * 50.0)
+        self.assertIn("get_total_inventory_value", report)
+        self.manager.invalidate()
+        result, report = self.manager.profile_operation("read_product_data", profiler="tracemalloc")
+        self.assertEqual(sorted(result), ["E100", "F100"])
+        self.assertTrue(report.startswith("Peak memory"))
+        with self.assertRaises(ValueError):
+            self.manager.profile_operation("read_product_data", profiler="perf")
+
+    def test_main_saves_stats(self):
+        import main
+        commands = Path(self.tmp_dir.name) / "commands.jsonl"
+        commands.write_text(json.dumps({"op": "quantity", "product_id": "E100", "delta": 1}) + "\n")
+        stats_path = Path(self.tmp_dir.name) / "stats.json"
+        with patch("sys.stdout", new_callable=io.StringIO):
+            main.main(["--catalog", str(self.database), "--run", str(commands), "--stats", str(stats_path)])
+        with open(stats_path) as file:
+            self.assertEqual(json.load(file)["operations"]["manager.increment_quantity"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+from inventory.inventory_manager import InventoryManager
+from inventory.product import Product
+from inventory.storage import JsonFileBackend
+
+
+class TestInventoryManager(unittest.TestCase):
+
+    def setUp(self):
+        """Create a manager over a temporary catalog."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        catalog = {
+            "E100": {"product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        }
+        with open(self.database, "w") as file:
+            json.dump(catalog, file, indent=4)
+        self.manager = InventoryManager(self.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lookups_use_cache(self):
+        """Repeated lookups parse the catalog only once."""
+        self.manager.search_product_by_name("tv")
+        self.manager.get_total_inventory_value()
+        self.manager.filter_product_with_low_quantity()
+        self.assertEqual(self.manager.cache_stats()["misses"], 1)
+        self.assertEqual(self.manager.cache_stats()["hits"], 2)
+
+    def test_add_product_keeps_cache_valid(self):
+        """Own writes do not force the catalog to be parsed again."""
+        self.manager.add_product("C100", Product("shirt", 10.0, 20.0, "Clothes"))
+        self.assertEqual(self.manager.search_product_by_name("Shirt")["price"], 20.0)
+        self.assertEqual(self.manager.cache_stats()["misses"], 1)
+        with open(self.database) as file:
+            self.assertIn("C100", json.load(file))
+
+    def test_product_updates_share_name_index(self):
+        """Products found by name regardless of case are changed through the manager."""
+        self.assertEqual(self.manager.increment_quantity(self.manager.find_product_id("CHAIR"), 2.0), 5.0)
+        self.assertEqual(self.manager.update_price(self.manager.find_product_id("chair"), 45.0), 45.0)
+        self.assertEqual(self.manager.search_product_by_name("Chair")["price"], 45.0)
+        self.assertEqual(self.manager.search_product_by_name("Chair")["quantity"], 5.0)
+
+    def test_renamed_product_is_found_by_new_name(self):
+        self.manager.update_product("F100", Product("Stool", 3.0, 50.0, "Furniture"))
+        self.assertFalse(self.manager.search_product_by_name("Chair"))
+        self.assertEqual(self.manager.search_product_by_name("stool")["product_name"], "Stool")
+
+    def test_journaled_manager(self):
+        """In journaled mode changes survive a fresh load and compact() folds them into the catalog."""
+        database = Path(self.tmp_dir.name) / "journaled_catalog.json"
+        shutil.copy(self.database, database)
+        manager = InventoryManager(database, journaled=True)
+        manager.remove_product("E100")
+        manager.invalidate()
+        self.assertFalse(manager.search_product_by_name("TV"))
+        manager.compact()
+        with open(database) as file:
+            self.assertEqual(list(json.load(file)), ["F100"])
+        with self.assertRaises(ValueError):
+            InventoryManager(self.database, journaled=True)  # self.manager uses it without a journal
+        with self.assertRaises(ValueError):
+            InventoryManager(backend=JsonFileBackend(self.database))
+
+    def read_catalog(self):
+        with open(self.database) as file:
+            return json.load(file)
+
+    def test_batch_writes_once(self):
+        """All changes of a batch are written together when the block ends."""
+        with patch.object(self.manager.cache.storage, "write_all", wraps=self.manager.cache.storage.write_all) as write:
+            with self.manager.batch():
+                self.manager.add_product("C100", Product("shirt", 10.0, 20.0, "Clothes"))
+                self.manager.remove_product("E100")
+                self.manager.increment_quantity("F100", 7.0)
+                self.assertIn("E100", self.read_catalog())
+        self.assertEqual(write.call_count, 1)
+        catalog = self.read_catalog()
+        self.assertEqual(sorted(catalog), ["C100", "F100"])
+        self.assertEqual(catalog["F100"]["quantity"], 10.0)
+
+    def test_batch_rolls_back_on_error(self):
+        """A failing change discards every change made in the batch."""
+        with self.assertRaises(ValueError):
+            with self.manager.batch():
+                self.manager.update_product("E100", Product("TV", 70.0, 300.0, "Electronics"))
+                self.manager.remove_product("X999")
+        self.assertEqual(self.manager.search_product_by_name("tv")["quantity"], 75.0)
+        self.assertEqual(self.read_catalog()["E100"]["quantity"], 75.0)
+        self.assertEqual(self.manager.cache.pending, {})
+
+    def test_nested_batch_error_is_not_masked(self):
+        with self.assertRaisesRegex(ValueError, "X999"):
+            with self.manager.batch():
+                self.manager.update_product("E100", Product("TV", 70.0, 300.0, "Electronics"))
+                with self.manager.batch():
+                    self.manager.remove_product("X999")
+        self.assertEqual(self.manager.cache.batch_depth, 0)
+        self.assertEqual(self.read_catalog()["E100"]["quantity"], 75.0)
+
+    def test_batch_into_missing_catalog(self):
+        database = Path(self.tmp_dir.name) / "new_catalog.json"
+        manager = InventoryManager(database)
+        with patch("sys.stdout", new_callable=io.StringIO):
+            with manager.batch():
+                manager.add_product("E100", Product("TV", 5.0, 300.0, "Electronics"))
+                manager.add_product("E101", Product("Radio", 2.0, 40.0, "Electronics"))
+                manager.add_product("F100", Product("Chair", 1.0, 50.0, "Furniture"))
+        with open(database) as file:
+            self.assertEqual(sorted(json.load(file)), ["E100", "E101", "F100"])
+
+    def test_non_finite_numbers_leave_no_trace(self):
+        with self.assertRaises(ValueError):
+            self.manager.add_product("C100", Product("shirt", 1.0, float("inf"), "Clothes"))
+        self.assertNotIn("C100", self.manager.read_product_data())
+        total = self.manager.get_total_inventory_value()
+        with self.assertRaises(OverflowError):
+            self.manager.cache.put("E100", dict(self.read_catalog()["E100"], price=float("inf")))
+        self.assertEqual(self.manager.read_product_data()["E100"]["price"], 315.0)
+        self.assertEqual(self.manager.cache.pending, {})
+        self.manager.increment_quantity("F100", 1.0)
+        self.assertEqual(self.read_catalog()["E100"]["price"], 315.0)
+        self.assertEqual(self.manager.get_total_inventory_value(), total + 50.0)
+        self.assertEqual(self.manager.search_by_prefix("t"), [("E100", self.read_catalog()["E100"])])
+
+    def test_import_reports_invalid_rows(self):
+        """Valid rows are imported, invalid ones are reported with their row number."""
+        rows = [
+            {"product_id": "C100", "product_name": "shirt", "quantity": "10", "price": "20", "category": "Clothes"},
+            {"product_id": "c101", "product_name": "shirt", "quantity": "10", "price": "20", "category": "Clothes"},
+            {"product_id": "C102", "product_name": "jeans", "quantity": "ten", "price": "20", "category": "Clothes"},
+            {"product_id": "E100", "product_name": "TV", "quantity": "1", "price": "1", "category": "Electronics"},
+            {"product_id": "C103", "product_name": "hat", "quantity": "4", "price": "9.5", "category": "Clothes"}
+        ]
+        report = self.manager.import_products(iter(rows), chunk_size=2)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3, 4])
+        self.assertEqual(self.read_catalog()["C103"]["price"], 9.5)
+
+    def test_import_reports_malformed_jsonl_lines(self):
+        path = Path(self.tmp_dir.name) / "feed.jsonl"
+        path.write_text(
+            '{"product_id": "C100", "product_name": "shirt", "quantity": 10, "price": 20, "category": "Clothes"}\n'
+            '{"product_id": "C101", "product_na\n'
+            '["C102", "jeans"]\n'
+            '{"product_id": "C103", "product_name": "hat", "quantity": NaN, "price": 9.5, "category": "Clothes"}\n'
+            '{"product_id": "C104", "product_name": "cap", "quantity": 4, "price": 9.5, "category": "Clothes"}\n')
+        report = self.manager.import_products(path)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual([(error["row"], error["product_id"]) for error in report["errors"]],
+                         [(2, None), (3, None), (4, "C103")])
+        self.assertNotIn("C103", self.read_catalog())
+
+    def test_export_then_import(self):
+        path = Path(self.tmp_dir.name) / "export.csv"
+        self.assertEqual(self.manager.export_products(path), 2)
+        other = InventoryManager(Path(self.tmp_dir.name) / "other_catalog.json")
+        report = other.import_products(path)
+        self.assertEqual(report, {"imported": 2, "errors": []})
+        self.assertEqual(other.read_product_data(), self.read_catalog())
+
+    def test_find_by_price_range_follows_changes(self):
+        """The price index is updated by manager changes, also by apply_discount."""
+        self.assertEqual(self.manager.find_by_price_range(40.0, 400.0), [
+            ("F100", self.read_catalog()["F100"]), ("E100", self.read_catalog()["E100"])])
+        self.manager.apply_discount("E100", 90)
+        self.manager.add_product("C100", Product("shirt", 10.0, 20.0, "Clothes"))
+        self.assertEqual([product_id for product_id, product in self.manager.find_by_price_range(max_price=40.0)], ["C100", "E100"])
+        self.manager.remove_product("C100")
+        self.assertEqual([product_id for product_id, product in self.manager.find_by_price_range(limit=1, offset=1)], ["F100"])
+
+    def test_aggregates_follow_changes(self):
+        self.assertEqual(self.manager.get_total_inventory_value(), 315.0 * 75.0 + 150.0)
+        self.manager.apply_discount("F100", 50)
+        self.manager.add_product("C100", Product("shirt", 10.0, 20.0, "Clothes"))
+        self.manager.remove_product("E100")
+        aggregates = self.manager.get_aggregates()
+        self.assertEqual(aggregates["total_value"], 75.0 + 200.0)
+        self.assertEqual(aggregates["count_by_category"], {"Furniture": 1, "Clothes": 1})
+        self.assertEqual((aggregates["min_price"], aggregates["max_price"]), (20.0, 25.0))
+        self.assertEqual(self.manager.verify_aggregates(), {})
+
+    def test_low_stock_watchlist(self):
+        reported = []
+        self.manager.on_low_stock(lambda product_id, product, threshold: reported.append(product_id))
+        self.assertEqual([product_id for product_id, product in self.manager.filter_product_with_low_quantity()], ["F100"])
+        self.manager.increment_quantity("E100", -72.0)
+        self.assertEqual(reported, ["E100"])
+        self.manager.set_low_stock_threshold(2.0, category="Furniture")
+        self.assertEqual([product_id for product_id, product in self.manager.low_stock_products()], ["E100"])
+
+    def test_low_stock_after_remove_and_add_again(self):
+        reported = []
+        self.manager.on_low_stock(lambda product_id, product, threshold: reported.append(product_id))
+        self.manager.remove_product("F100")  # low when removed
+        self.manager.add_product("F100", Product("Chair", 1.0, 50.0, "Furniture"))
+        self.assertEqual(reported, ["F100"])
+
+    def test_low_stock_reported_after_save(self):
+        reported = []
+
+        def failing(product_id, product, threshold):
+            raise RuntimeError("mail server down")
+
+        def check_saved(product_id, product, threshold):
+            with open(self.database) as file:
+                reported.append((product_id, json.load(file)[product_id]["quantity"]))
+
+        self.manager.on_low_stock(failing)
+        self.manager.on_low_stock(check_saved)
+        with self.assertRaises(ValueError):
+            with self.manager.batch():
+                self.manager.increment_quantity("E100", -72.0)
+                self.manager.increment_quantity("X999", 1.0)
+        self.assertEqual(reported, [])
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            self.manager.increment_quantity("E100", -72.0)
+        self.assertEqual(reported, [("E100", 3.0)])
+        self.assertIn("mail server down", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.catalog_cache import CatalogCache
+from inventory.journal import CatalogJournal
+
+
+class TestCatalogJournal(unittest.TestCase):
+
+    def setUp(self):
+        """Write a small snapshot and open it in journaled mode."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        self.snapshot = {"F100": {"product_name": "Chair", "quantity": 5.0, "price": 50.0, "category": "Furniture"}}
+        with open(self.database, "w") as file:
+            json.dump(self.snapshot, file, indent=4)
+        self.cache = CatalogCache(self.database)
+        self.cache.enable_journal(max_records=3)
+        self.cache.load()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_snapshot(self):
+        with open(self.database) as file:
+            return json.load(file)
+
+    def test_change_is_appended_not_rewritten(self):
+        """A single change only appends to journal, snapshot stays as it was."""
+        self.cache.put("F200", {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"})
+        self.cache.save()
+        self.assertEqual(self.read_snapshot(), self.snapshot)
+        with open(self.cache.journal.journal_path) as file:
+            self.assertEqual(len(file.readlines()), 1)
+
+    def test_journal_is_replayed_on_load(self):
+        self.cache.put("F200", {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"})
+        self.cache.delete("F100")
+        self.cache.save()
+        other = CatalogCache(self.database)
+        other.enable_journal()
+        self.assertEqual(list(other.load()), ["F200"])
+
+    def test_incomplete_last_record_is_ignored(self):
+        self.cache.put("F200", {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"})
+        self.cache.save()
+        with open(self.cache.journal.journal_path, "a") as file:
+            file.write('{"op": "delete", "produ')
+        journal = CatalogJournal(self.database)
+        product_data = dict(self.snapshot)
+        self.assertEqual(journal.replay(product_data), 1)
+        self.assertIn("F200", product_data)
+
+    def test_append_after_incomplete_record_is_kept(self):
+        """A change saved after a crash is not glued to the cut record."""
+        with open(self.cache.journal.journal_path, "a") as file:
+            file.write('{"op": "delete", "produ')
+        self.cache.put("F200", {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"})
+        self.cache.save()
+        other = CatalogCache(self.database)
+        other.enable_journal()
+        self.assertEqual(sorted(other.load()), ["F100", "F200"])
+
+    def test_damaged_record_in_the_middle_raises(self):
+        self.cache.put("F200", {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"})
+        self.cache.save()
+        with open(self.cache.journal.journal_path, "a") as file:
+            file.write('{"op": "delete", "produ\n')
+        self.cache.delete("F200")
+        self.cache.save()
+        with self.assertRaises(ValueError):
+            CatalogJournal(self.database).replay(dict(self.snapshot))
+        with self.assertRaises(ValueError):
+            CatalogJournal(self.database).changes()
+
+    def test_compaction_after_record_threshold(self):
+        """Once the journal reaches max_records it is folded into the snapshot."""
+        for quantity in (1.0, 2.0, 3.0):
+            self.cache.put("F100", dict(self.snapshot["F100"], quantity=quantity))
+            self.cache.save()
+        self.assertEqual(self.read_snapshot()["F100"]["quantity"], 3.0)
+        self.assertFalse(self.cache.journal.journal_path.exists())
+
+    def test_batch_is_one_journal_line(self):
+        """Changes committed together are replayed together."""
+        self.cache.begin()
+        self.cache.put("F200", {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"})
+        self.cache.delete("F100")
+        self.cache.commit()
+        with open(self.cache.journal.journal_path) as file:
+            self.assertEqual(len(file.readlines()), 1)
+        self.assertEqual(self.cache.journal.replay({}), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
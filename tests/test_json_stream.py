@@ -0,0 +1,112 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.inventory_manager import InventoryManager
+from inventory.json_stream import iter_catalog
+from inventory.name_index import DuplicateProductNameError
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        shutil.copy("product_catalog.json", self.database)
+        with open(self.database) as file:
+            self.catalog = json.load(file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, text):
+        path = Path(self.tmp_dir.name) / "other.json"
+        path.write_text(text)
+        return path
+
+    def test_stream_equals_full_load(self):
+        for chunk_size in (1, 7, 65536):
+            self.assertEqual(list(iter_catalog(self.database, chunk_size)), list(self.catalog.items()))
+
+    def test_numbers_split_between_chunks(self):
+        path = self.write('{"A100": {"quantity": 12345.5}, "A101": {"price": 1e10}}')
+        self.assertEqual(dict(iter_catalog(path, chunk_size=3)), {"A100": {"quantity": 12345.5}, "A101": {"price": 1e10}})
+
+    def test_empty_and_invalid_catalogs(self):
+        self.assertEqual(list(iter_catalog(self.write(" { } "))), [])
+        with self.assertRaises(ValueError):
+            list(iter_catalog(self.write('{"A100": {"quantity": 1} "A101": {}}')))
+        with self.assertRaises(ValueError):
+            list(iter_catalog(self.write('{"A100": {"quantity": 1}')))
+
+    def test_stream_stops_early(self):
+        stream = iter_catalog(self.database, chunk_size=64)
+        next(stream)
+        self.assertLess(stream.gi_frame.f_locals["file"].tell(), self.database.stat().st_size)
+        stream.close()
+
+
+class TestStreamingManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        shutil.copy("product_catalog.json", self.database)
+        self.streaming = InventoryManager(self.database, streaming=True)
+        self.loaded = InventoryManager(Path(self.tmp_dir.name) / "loaded" / "product_catalog.json")
+        self.loaded.database.parent.mkdir()
+        shutil.copy("product_catalog.json", self.loaded.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_paths_match_loaded_catalog(self):
+        self.assertEqual(self.streaming.get_aggregates(), self.loaded.get_aggregates())
+        self.assertEqual(self.streaming.search_product_by_name("tv"), self.loaded.search_product_by_name("tv"))
+        self.assertFalse(self.streaming.search_product_by_name("no such product"))
+        self.assertEqual(self.streaming.products_in_category("Furniture"), self.loaded.products_in_category("Furniture"))
+        self.assertEqual(self.streaming.find_by_price_range(50, 400, limit=3, offset=1),
+                         self.loaded.find_by_price_range(50, 400, limit=3, offset=1))
+        self.assertEqual(self.streaming.find_by_price_range(max_price=100), self.loaded.find_by_price_range(max_price=100))
+        self.assertEqual(self.streaming.low_stock_products(), self.loaded.low_stock_products())
+        query = lambda manager: manager.query().where(category="Electronics").quantity_below(50).order_by("price").limit(3)
+        self.assertEqual(query(self.streaming).all(), query(self.loaded).all())
+        self.assertIn("storage scan", query(self.streaming).explain())
+        # Nothing of the above loaded the catalog into memory
+        self.assertIsNone(self.streaming.cache.product_data)
+
+    def test_duplicate_names_raise_like_loaded_catalog(self):
+        for manager in (self.streaming, self.loaded):
+            with open(manager.database) as file:
+                catalog = json.load(file)
+            catalog["E999"] = dict(catalog["E100"])
+            with open(manager.database, "w") as file:
+                json.dump(catalog, file, indent=4)
+            with self.assertRaises(DuplicateProductNameError) as raised:
+                manager.search_product_by_name(catalog["E100"]["product_name"].upper())
+            self.assertEqual(raised.exception.product_ids, ["E100", "E999"])
+            with self.assertRaises(DuplicateProductNameError):
+                manager.find_product_id(catalog["E100"]["product_name"])
+
+    def test_export(self):
+        streamed, loaded = Path(self.tmp_dir.name) / "streamed.jsonl", Path(self.tmp_dir.name) / "loaded.jsonl"
+        self.assertEqual(self.streaming.export_products(streamed), self.loaded.export_products(loaded))
+        self.assertEqual(streamed.read_text(), loaded.read_text())
+
+    def test_streaming_sees_writes_and_journal(self):
+        database = Path(self.tmp_dir.name) / "journaled_catalog.json"
+        shutil.copy("product_catalog.json", database)
+        manager = InventoryManager(database, journaled=True, streaming=True)
+        manager.remove_product("E100")
+        manager.increment_quantity("F100", 1.0)
+        manager.import_products([{"product_id": "C999", "product_name": "hat", "quantity": "2", "price": "5",
+                                  "category": "Clothes"}])
+        self.assertTrue(manager.cache.journal.journal_path.exists())
+        streamed = dict(manager.iter_products())
+        self.assertEqual(streamed, manager.read_product_data())
+        self.assertEqual(list(streamed)[-1], "C999")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+from inventory.aggregates import summarize
+from inventory.inventory_manager import InventoryManager
+from inventory.product import Product
+
+
+class TestStockLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        self.catalog = {
+            "E100": {"product_name": "TV", "quantity": 10.0, "price": 300.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        }
+        with open(self.database, "w") as file:
+            json.dump(self.catalog, file, indent=4)
+        self.clock = patch("inventory.ledger.time")
+        self.time = self.clock.start()
+        self.set_time(100.0)
+        self.output = patch("sys.stdout", new_callable=io.StringIO)
+        self.output.start()
+
+    def tearDown(self):
+        self.output.stop()
+        self.clock.stop()
+        self.tmp_dir.cleanup()
+
+    def set_time(self, seconds):
+        self.time.time.return_value = seconds
+
+    def make_history(self, snapshot_every=1000):
+        manager = InventoryManager(self.database, ledger=True, snapshot_every=snapshot_every)
+        self.set_time(200.0)
+        manager.increment_quantity("E100", 5.0, reason="restock")
+        self.set_time(300.0)
+        manager.update_price("E100", 280.0)
+        self.set_time(400.0)
+        manager.remove_product("F100")
+        self.set_time(500.0)
+        manager.add_product("C100", Product("Shirt", 20.0, 15.0, "Clothes"))
+        self.set_time(600.0)
+        manager.increment_quantity("E100", -2.0, reason="sale")
+        return manager
+
+    def test_point_in_time(self):
+        manager = self.make_history()
+        self.assertEqual(manager.products_as_of(150.0), self.catalog)
+        self.assertEqual(manager.products_as_of(datetime.fromtimestamp(250.0))["E100"]["quantity"], 15.0)
+        at_450 = manager.products_as_of(450.0)
+        self.assertEqual(sorted(at_450), ["E100"])
+        self.assertEqual(at_450["E100"]["price"], 280.0)
+        self.assertEqual(manager.products_as_of(1000.0), manager.read_product_data())
+        for when in (100.0, 250.0, 350.0, 450.0, 550.0, 650.0):
+            self.assertAlmostEqual(manager.get_total_inventory_value(as_of=when),
+                                   summarize(manager.products_as_of(when).items())["total_value"])
+        self.assertEqual(manager.get_total_inventory_value(as_of=1000.0), manager.get_total_inventory_value())
+        with self.assertRaises(ValueError):
+            manager.products_as_of(50.0)
+
+    def test_snapshots_limit_replay(self):
+        manager = self.make_history(snapshot_every=2)
+        ledger = manager.stock_ledger()
+        snapshots = ledger.snapshots()
+        self.assertEqual([entry["time"] for entry in snapshots], [100.0, 300.0, 500.0])
+        replayed = []
+        records = ledger.records
+
+        def counting_records(offset=0):
+            for record in records(offset):
+                replayed.append(record)
+                yield record
+
+        with patch.object(ledger, "records", counting_records):
+            self.assertEqual(manager.products_as_of(650.0), manager.read_product_data())
+        self.assertEqual(len(replayed), 1)  # only the sale after the last snapshot
+        for when in (250.0, 450.0, 650.0):
+            self.assertAlmostEqual(manager.get_total_inventory_value(as_of=when),
+                                   summarize(manager.products_as_of(when).items())["total_value"])
+
+    def test_movement_reports(self):
+        manager = self.make_history()
+        movements = list(manager.stock_movements(product_id="E100"))
+        self.assertEqual([(record["time"], record["reason"]) for record in movements],
+                         [(200.0, "restock"), (300.0, "price"), (600.0, "sale")])
+        self.assertEqual([record["product_id"] for record in manager.stock_movements(250.0, 600.0)],
+                         ["E100", "F100", "C100"])
+        self.assertEqual(manager.movement_report(category="Electronics"), {
+            "movements": 3, "quantity_in": 5.0, "quantity_out": 2.0, "net_quantity": 3.0, "price_changes": 1,
+            "value_change": 13.0 * 280.0 - 10.0 * 300.0
+        })
+        self.assertEqual(manager.movement_report(start=400.0, category="Furniture")["quantity_out"], 3.0)
+
+    def test_rolled_back_batch_is_not_recorded(self):
+        manager = InventoryManager(self.database, ledger=True)
+        self.set_time(200.0)
+        with self.assertRaises(ValueError):
+            with manager.batch():
+                manager.increment_quantity("E100", 1.0)
+                manager.increment_quantity("X999", 1.0)
+        self.assertEqual(list(manager.stock_movements()), [])
+        with manager.batch(), manager.movement_reason("stocktake"):
+            manager.increment_quantity("E100", 1.0)
+            manager.increment_quantity("F100", 1.0)
+        self.assertEqual([record["reason"] for record in manager.stock_movements()], ["stocktake", "stocktake"])
+
+    def test_ledger_must_be_enabled(self):
+        manager = InventoryManager(Path(self.tmp_dir.name) / "other.json")
+        with self.assertRaises(ValueError):
+            manager.get_total_inventory_value(as_of=100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
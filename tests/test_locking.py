@@ -0,0 +1,93 @@
+import json
+import multiprocessing
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from inventory.inventory_manager import InventoryManager
+from inventory.locking import VersionConflictError, retry_on_conflict
+from inventory.product import Product
+
+
+def increment_many(database, times, journaled=False):
+    """Runs in a separate process, each call is a full read-modify-write of the catalog."""
+    manager = InventoryManager(database, journaled=journaled)
+    for _ in range(times):
+        manager.increment_quantity("E100", 1.0)
+    for _ in range(times):
+        manager.increment_quantity(manager.find_product_id("tv"), 1.0)
+
+
+class TestConcurrentWriters(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.catalog = {
+            "E100": {"product_name": "TV", "quantity": 0.0, "price": 315.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_catalog(self, name):
+        database = Path(self.tmp_dir.name) / name
+        if database.suffix == ".json":
+            with open(database, "w") as file:
+                json.dump(self.catalog, file, indent=4)
+        else:
+            InventoryManager(database).storage.write_all(self.catalog)
+        return str(database)
+
+    def check_no_lost_updates(self, database, journaled=False):
+        """4 processes x 2 x 25 increments, the final quantity must count every one of them."""
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(4) as pool:
+            pool.starmap(increment_many, [(database, 25, journaled)] * 4)
+        manager = InventoryManager(database, journaled=journaled)
+        manager.invalidate()
+        self.assertEqual(manager.read_product_data()["E100"]["quantity"], 200.0)
+
+    def test_json_catalog_processes(self):
+        self.check_no_lost_updates(self.make_catalog("product_catalog.json"))
+
+    def test_journaled_catalog_processes(self):
+        self.check_no_lost_updates(self.make_catalog("product_catalog.json"), journaled=True)
+
+    def test_sqlite_catalog_processes(self):
+        self.check_no_lost_updates(self.make_catalog("product_catalog.db"))
+
+    def test_threads(self):
+        database = self.make_catalog("product_catalog.json")
+        threads = [threading.Thread(target=increment_many, args=(database, 20)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(InventoryManager(database).read_product_data()["E100"]["quantity"], 160.0)
+
+    def test_conditional_update_fails_on_conflict(self):
+        database = self.make_catalog("product_catalog.json")
+        manager = InventoryManager(database)
+        version = manager.catalog_version()
+        manager.increment_quantity("F100", 1.0)
+        with self.assertRaises(VersionConflictError):
+            manager.update_product("F100", Product("Chair", 1.0, 50.0, "Furniture"), expected_version=version)
+        self.assertEqual(manager.read_product_data()["F100"]["quantity"], 4.0)
+        retry_on_conflict(lambda: manager.remove_product("F100", expected_version=manager.catalog_version()))
+        self.assertNotIn("F100", manager.read_product_data())
+
+    def test_batch_conflict_rolls_back(self):
+        database = self.make_catalog("product_catalog.json")
+        manager = InventoryManager(database)
+        with self.assertRaises(VersionConflictError):
+            with manager.batch():
+                manager.increment_quantity("F100", 5.0)
+                # another writer (a separate process would do the same)
+                manager.storage.write_all(dict(self.catalog, E100=dict(self.catalog["E100"], quantity=9.0)))
+        self.assertEqual(manager.read_product_data()["F100"]["quantity"], 3.0)
+        self.assertEqual(manager.read_product_data()["E100"]["quantity"], 9.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
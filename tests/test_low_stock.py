@@ -0,0 +1,46 @@
+import unittest
+from inventory.low_stock import LowStockTracker
+
+
+class TestLowStockTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = {
+            "E100": {"product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+            "E210": {"product_name": "cable", "quantity": 2.0, "price": 10.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 8.0, "price": 50.0, "category": "Furniture"}
+        }
+        self.tracker = LowStockTracker()
+        self.tracker.build(self.catalog)
+        self.reported = []
+        self.tracker.callbacks.append(lambda product_id, product, threshold: self.reported.append((product_id, threshold)))
+
+    def change_quantity(self, product_id, quantity):
+        old_product = self.catalog[product_id]
+        self.catalog[product_id] = dict(old_product, quantity=quantity)
+        self.tracker.remove(product_id, old_product)
+        self.tracker.add(product_id, self.catalog[product_id])
+        self.tracker.saved()
+
+    def test_initial_low_products_are_not_reported(self):
+        self.assertEqual(self.tracker.product_ids(), ["E210"])
+        self.assertEqual(self.reported, [])
+
+    def test_callback_fires_once_when_crossing(self):
+        self.change_quantity("F100", 4.0)
+        self.change_quantity("F100", 3.0)
+        self.assertEqual(self.reported, [("F100", 5.0)])
+        self.change_quantity("F100", 9.0)
+        self.change_quantity("F100", 1.0)
+        self.assertEqual(len(self.reported), 2)
+
+    def test_category_and_product_thresholds(self):
+        self.tracker.set_threshold(10.0, self.catalog, category="Furniture")
+        self.assertEqual(self.reported, [("F100", 10.0)])
+        self.tracker.set_threshold(100.0, self.catalog, product_id="E100")
+        self.tracker.set_threshold(1.0, self.catalog, product_id="E210")
+        self.assertEqual(sorted(self.tracker.product_ids()), ["E100", "F100"])
+
+
+if __name__ == "__main__":
+    unittest.main()
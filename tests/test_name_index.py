@@ -0,0 +1,36 @@
+import unittest
+from inventory.name_index import NameIndex, DuplicateProductNameError
+
+
+class TestNameIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Build index over a small catalog."""
+        self.index = NameIndex()
+        self.index.build({
+            "E300": {"product_name": "iphone_11", "quantity": 40.0, "price": 450.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 5.0, "price": 50.0, "category": "Furniture"}
+        })
+
+    def test_lookup_is_case_insensitive(self):
+        self.assertEqual(self.index.lookup("IPHONE_11"), "E300")
+        self.assertEqual(self.index.lookup("chair"), "F100")
+        self.assertIsNone(self.index.lookup("table"))
+
+    def test_add_and_remove(self):
+        table = {"product_name": "Table", "quantity": 2.0, "price": 80.0, "category": "Furniture"}
+        self.index.add("F200", table)
+        self.assertEqual(self.index.lookup("table"), "F200")
+        self.index.remove("F200", table)
+        self.assertIsNone(self.index.lookup("table"))
+
+    def test_duplicate_names_are_reported(self):
+        self.index.add("F101", {"product_name": "CHAIR", "quantity": 1.0, "price": 60.0, "category": "Furniture"})
+        self.assertEqual(self.index.duplicates(), {"chair": ["F100", "F101"]})
+        with self.assertRaises(DuplicateProductNameError) as context:
+            self.index.lookup("Chair")
+        self.assertEqual(context.exception.product_ids, ["F100", "F101"])
+
+
+if __name__ == "__main__":
+    unittest.main()
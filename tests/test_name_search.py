@@ -0,0 +1,100 @@
+import heapq
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from inventory.inventory_manager import InventoryManager
+from inventory.name_search import NameTrie, NGramIndex
+from inventory.product import Product
+
+CATALOG = {
+    "E300": {"product_name": "iphone_11", "quantity": 40.0, "price": 450.0, "category": "Electronics"},
+    "E301": {"product_name": "iphone_13", "quantity": 20.0, "price": 650.0, "category": "Electronics"},
+    "E302": {"product_name": "iPhone", "quantity": 5.0, "price": 300.0, "category": "Electronics"},
+    "E400": {"product_name": "ipad", "quantity": 8.0, "price": 400.0, "category": "Electronics"},
+    "F100": {"product_name": "Chair", "quantity": 5.0, "price": 50.0, "category": "Furniture"}
+}
+
+
+class TestNameTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = NameTrie()
+        self.trie.build(CATALOG)
+
+    def test_complete_ranks_shortest_first(self):
+        self.assertEqual(self.trie.complete("IPH"), [("iphone", "E302"), ("iphone_11", "E300"), ("iphone_13", "E301")])
+        self.assertEqual(self.trie.complete("ip", limit=2), [("ipad", "E400"), ("iphone", "E302")])
+        self.assertEqual(self.trie.complete("table"), [])
+
+    def test_complete_stops_after_limit(self):
+        trie = NameTrie()
+        trie.build({f"P{number}": {"product_name": f"prod_{number}"} for number in range(10_000)})
+        with patch("inventory.name_search.heapq.heappush", wraps=heapq.heappush) as push:
+            self.assertEqual(trie.complete("prod_", limit=3), [("prod_0", "P0"), ("prod_1", "P1"), ("prod_2", "P2")])
+        self.assertLess(push.call_count, 50)  # only the nodes before the third name are expanded
+
+    def test_remove_prunes_nodes(self):
+        self.trie.remove("E301", CATALOG["E301"])
+        self.assertEqual([product_id for name, product_id in self.trie.complete("iphone_1")], ["E300"])
+        self.assertNotIn("3", self.trie.root.children["i"].children["p"].children["h"].children["o"].children["n"]
+                         .children["e"].children["_"].children["1"].children)
+        for product_id, product in CATALOG.items():
+            self.trie.remove(product_id, product)
+        self.assertEqual(self.trie.root.children, {})
+
+
+class TestNGramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NGramIndex()
+        self.index.build(CATALOG)
+
+    def test_typos_are_tolerated(self):
+        self.assertEqual(self.index.search("iphnoe")[0][1], "E302")
+        self.assertEqual(self.index.search("chiar", max_typos=2)[0][1], "F100")
+        self.assertEqual([product_id for score, product_id in self.index.search("iphone_12", limit=2)], ["E300", "E301"])
+        self.assertEqual(self.index.search("sofa"), [])
+
+    def test_remove(self):
+        self.index.remove("F100", CATALOG["F100"])
+        self.assertEqual(self.index.search("chair"), [])
+        self.assertNotIn("$ch", self.index.ids_by_gram)
+
+
+class TestManagerNameSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        with open(self.database, "w") as file:
+            json.dump(CATALOG, file, indent=4)
+        self.manager = InventoryManager(self.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_indexes_follow_changes(self):
+        self.assertEqual([product_id for product_id, product in self.manager.search_by_prefix("iphone")],
+                         ["E302", "E300", "E301"])
+        with patch("sys.stdout", new_callable=io.StringIO):
+            self.manager.add_product("E303", Product("iphone_15", 3.0, 900.0, "Electronics"))
+            self.manager.update_product("E302", Product("ipod", 5.0, 300.0, "Electronics"))
+            self.manager.remove_product("E300")
+        self.assertEqual([product_id for product_id, product in self.manager.search_by_prefix("iphone")],
+                         ["E301", "E303"])
+        self.assertEqual(self.manager.fuzzy_search("ipood")[0][0], "E302")
+        self.assertEqual(self.manager.fuzzy_search("iphone_15", limit=1), [("E303", self.manager.product_data["E303"])])
+
+    def test_streaming_gives_same_results(self):
+        streaming = InventoryManager(self.database, streaming=True)
+        for prefix in ("i", "iphone_", "ch"):
+            self.assertEqual(streaming.search_by_prefix(prefix, limit=3), self.manager.search_by_prefix(prefix, limit=3))
+        for query in ("iphnoe", "chiar", "iphone_12"):
+            self.assertEqual(streaming.fuzzy_search(query), self.manager.fuzzy_search(query))
+
+
+if __name__ == "__main__":
+    unittest.main()
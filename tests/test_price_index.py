@@ -0,0 +1,34 @@
+import unittest
+from inventory.price_index import PriceIndex
+
+
+class TestPriceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PriceIndex()
+        self.index.build({
+            "E100": {"product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+            "E210": {"product_name": "cable", "quantity": 20.0, "price": 10.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"},
+            "F200": {"product_name": "Table", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        })
+
+    def test_range_is_sorted_and_half_open(self):
+        self.assertEqual(self.index.range(10.0, 315.0), ["E210", "F100", "F200"])
+        self.assertEqual(self.index.range(max_value=50.0), ["E210"])
+        self.assertEqual(self.index.range(min_value=50.0), ["F100", "F200", "E100"])
+
+    def test_limit_and_offset(self):
+        self.assertEqual(self.index.range(limit=2, offset=1), ["F100", "F200"])
+        self.assertEqual(self.index.range(20.0, 100.0, limit=5, offset=1), ["F200"])
+
+    def test_update_moves_product(self):
+        """A price change is a remove of the old entry and an add of the new one."""
+        self.index.remove("E100", {"price": 315.0})
+        self.index.add("E100", {"price": 5.0})
+        self.assertEqual(self.index.range(max_value=20.0), ["E100", "E210"])
+        self.assertEqual(len(self.index), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
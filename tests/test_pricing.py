@@ -0,0 +1,110 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from inventory import pricing
+from inventory.command_runner import CommandRunner
+from inventory.inventory_manager import InventoryManager
+from inventory.locking import VersionConflictError
+
+
+class TestPriceChanges(unittest.TestCase):
+
+    def test_percentages(self):
+        self.assertEqual(pricing.discount(10)(200.0), 180.0)
+        self.assertEqual(pricing.markup(25)(200.0), 250.0)
+        self.assertEqual(pricing.discount(100)(200.0), 0)
+        for change in (pricing.discount, pricing.markup):
+            with self.assertRaises(ValueError):
+                change(101)
+            with self.assertRaises(ValueError):
+                change(-1)
+
+    def test_price_points(self):
+        self.assertEqual(pricing.price_points()(4.20), 3.99)
+        self.assertEqual(pricing.price_points()(4.60), 4.99)
+        self.assertEqual(pricing.price_points()(0.10), 0.99)
+        self.assertEqual(pricing.price_points(9.99, 10)(42.0), 39.99)
+        with self.assertRaises(ValueError):
+            pricing.fixed_price(-5)
+        with self.assertRaises(ValueError):
+            pricing.price_points(step=0)
+
+
+class TestBulkRepricing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        self.catalog = {
+            "E100": {"product_name": "TV", "quantity": 75.0, "price": 300.0, "category": "Electronics"},
+            "E200": {"product_name": "Radio", "quantity": 5.0, "price": 40.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+        }
+        with open(self.database, "w") as file:
+            json.dump(self.catalog, file, indent=4)
+        self.manager = InventoryManager(self.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def stored_prices(self):
+        with open(self.database, "r") as file:
+            return {product_id: product["price"] for product_id, product in json.load(file).items()}
+
+    def test_category_discount_is_one_write(self):
+        version = self.manager.catalog_version()
+        diff = self.manager.bulk_discount(10, category="Electronics")
+        self.assertEqual(diff, [
+            {"product_id": "E100", "product_name": "TV", "old_price": 300.0, "new_price": 270.0},
+            {"product_id": "E200", "product_name": "Radio", "old_price": 40.0, "new_price": 36.0}
+        ])
+        self.assertEqual(self.manager.catalog_version(), version + 1)
+        self.assertEqual(self.stored_prices(), {"E100": 270.0, "E200": 36.0, "F100": 50.0})
+        self.assertEqual(self.manager.get_total_inventory_value(), 75.0 * 270.0 + 5.0 * 36.0 + 3.0 * 50.0)
+
+    def test_dry_run_changes_nothing(self):
+        version = self.manager.catalog_version()
+        diff = self.manager.bulk_markup(50, product_ids=["E200", "F100"], dry_run=True)
+        self.assertEqual([(change["product_id"], change["new_price"]) for change in diff], [("E200", 60.0), ("F100", 75.0)])
+        self.assertEqual(self.manager.catalog_version(), version)
+        self.assertEqual(self.manager.read_product_data(), self.catalog)
+
+    def test_targets_and_rules(self):
+        diff = self.manager.bulk_set_price(45.0, where=lambda product_id, product: product["quantity"] < 10)
+        self.assertEqual([change["product_id"] for change in diff], ["E200", "F100"])
+        diff = self.manager.bulk_round_prices(category="Furniture")
+        self.assertEqual(diff[0]["new_price"], 44.99)
+        with self.assertRaises(ValueError):
+            self.manager.bulk_discount(120, category="Electronics")
+        with self.assertRaises(ValueError):
+            self.manager.reprice(lambda price: price - 100.0)  # TV would stay positive, Radio would not
+        self.assertEqual(self.stored_prices(), {"E100": 300.0, "E200": 45.0, "F100": 44.99})
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            diff = self.manager.bulk_markup(10, product_ids=["E100", "X999"])
+        self.assertIn("X999 not found", output.getvalue())
+        self.assertEqual([change["product_id"] for change in diff], ["E100"])
+
+    def test_expected_version(self):
+        version = self.manager.catalog_version()
+        self.manager.increment_quantity("E200", 1.0)  # somebody else changed the catalog
+        with self.assertRaises(VersionConflictError):
+            self.manager.bulk_discount(10, category="Electronics", expected_version=version)
+        self.assertEqual(self.stored_prices(), {"E100": 300.0, "E200": 40.0, "F100": 50.0})
+        diff = self.manager.bulk_set_price(45.0, product_ids=["F100"], expected_version=self.manager.catalog_version(),
+                                           reason="price list")
+        self.assertEqual([change["product_id"] for change in diff], ["F100"])
+        self.assertEqual(self.stored_prices()["F100"], 45.0)
+
+    def test_command_runner(self):
+        output = io.StringIO()
+        summary = CommandRunner(self.manager).run([json.dumps({"op": "reprice", "action": "discount", "percentage": 50,
+                                                               "category": "Furniture"})], output)
+        self.assertEqual(summary["errors"], 0)
+        self.assertEqual(self.stored_prices()["F100"], 25.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,32 +1,50 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from inventory.product import Product
+from inventory.memory_benchmark import run_benchmark
 
 class TestProduct(unittest.TestCase):
 
     def setUp(self):
         """Set up a sample product before each test."""
         self.product = Product(product_name="Laptop", quantity=10, price=1000, category="Electronics")
-        self.product.product_data = {
-            "E101": {"name": "Laptop", "quantity": 10, "price": 1000, "category": "Electronics"}
-        }
 
     @patch("builtins.open", new_callable=MagicMock)
     def test_update_quantity(self, mock_open):
-        """Test the update_quantity method."""
-        self.product.update_quantity(5)
-        mock_open.assert_called_once_with(self.product.database, "w")
+        """Test the update_quantity method, it changes only the value, files are not touched."""
+        self.assertEqual(self.product.update_quantity(5), 15)
+        mock_open.assert_not_called()
 
-        self.assertEqual(self.product.product_data["E101"]["quantity"], 15)
+        self.assertEqual(self.product.quantity, 15)
 
     @patch("builtins.open", new_callable=MagicMock)
     def test_update_price(self, mock_open):
         """Test the update_price method."""
         self.product.update_price(1200)
-        
-        mock_open.assert_called_once_with(self.product.database, "w")
-        
-        self.assertEqual(self.product.product_data["E101"]["price"], 1200)
+
+        mock_open.assert_not_called()
+
+        self.assertEqual(self.product.price, 1200)
+        with self.assertRaises(ValueError):
+            self.product.update_price(-1)
+
+    def test_slots(self):
+        """Product has no instance dict, so it stays small."""
+        self.assertFalse(hasattr(self.product, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.product.database = "product_catalog.json"
+        self.assertEqual(Product(**self.product.to_dict()), self.product)
+
+    def test_hash(self):
+        """Equal products hash alike, so they can be kept in sets."""
+        copy = Product(**self.product.to_dict())
+        self.assertEqual(hash(copy), hash(self.product))
+        self.assertEqual(len({copy, self.product, Product("Mouse", 1, 20, "Electronics")}), 2)
+
+    def test_memory_benchmark(self):
+        """Smoke check only, python -m inventory.memory_benchmark compares the layouts."""
+        report = run_benchmark(10)
+        self.assertEqual(sorted(report), ["dict", "former_product", "product_slots"])
 
     def test_display_product_info(self):
         """Test the display_product_info method."""
@@ -0,0 +1,60 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.inventory_manager import InventoryManager
+from inventory.product import Product
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        """Create a manager over a small mixed catalog."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.tmp_dir.name) / "product_catalog.json"
+        catalog = {
+            "E100": {"product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+            "E101": {"product_name": "radio", "quantity": 2.0, "price": 120.0, "category": "Electronics"},
+            "E102": {"product_name": "phone", "quantity": 4.0, "price": 450.0, "category": "Electronics"},
+            "E103": {"product_name": "cable", "quantity": 1.0, "price": 10.0, "category": "Electronics"},
+            "F100": {"product_name": "Chair", "quantity": 3.0, "price": 150.0, "category": "Furniture"},
+            "C100": {"product_name": "shirt", "quantity": 30.0, "price": 20.0, "category": "Clothes"}
+        }
+        with open(self.database, "w") as file:
+            json.dump(catalog, file, indent=4)
+        self.manager = InventoryManager(self.database)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def ids(self, query):
+        return [product_id for product_id, product in query]
+
+    def test_combined_filters(self):
+        query = self.manager.query().where(category="Electronics").price_between(100, 500).quantity_below(5).order_by("price")
+        self.assertEqual(self.ids(query), ["E101", "E102"])
+
+    def test_most_selective_index_is_used(self):
+        query = self.manager.query().where(category="Electronics").price_between(100, 130)
+        self.assertTrue(query.explain().startswith("index: price (estimated rows: 1)"))
+        query = self.manager.query().where(category="Furniture").quantity_below(50)
+        self.assertTrue(query.explain().startswith("index: category (estimated rows: 1)"))
+        self.assertTrue(self.manager.query().explain().startswith("index: full scan"))
+
+    def test_order_limit_and_offset(self):
+        query = self.manager.query().quantity_below(100).order_by("price", descending=True).offset(1).limit(2)
+        self.assertEqual(self.ids(query), ["E100", "F100"])
+        query = self.manager.query().where(category="Electronics").order_by("quantity").limit(2)
+        self.assertEqual(self.ids(query), ["E103", "E101"])
+        self.assertIn("sorted after filtering", query.explain())
+
+    def test_indexes_follow_changes(self):
+        self.manager.add_product("F200", Product("Table", 1.0, 90.0, "Furniture"))
+        self.manager.increment_quantity(self.manager.find_product_id("Chair"), 10.0)
+        query = self.manager.query().where(category="Furniture").quantity_below(5)
+        self.assertEqual(self.ids(query), ["F200"])
+        self.assertEqual(self.ids(self.manager.query().filter(lambda product_id, product: product["price"] > 400)), ["E102"])
+
+
+if __name__ == "__main__":
+    unittest.main()
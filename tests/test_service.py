@@ -0,0 +1,153 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.http_client import ServiceConnection
+from inventory.inventory_manager import InventoryManager
+from inventory.load_generator import run_load
+from inventory.service import InventoryService
+
+
+class TestInventoryService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = str(Path(self.tmp_dir.name) / "product_catalog.json")
+        with open(self.database, "w") as file:
+            json.dump({
+                "E100": {"product_name": "TV", "quantity": 10.0, "price": 315.0, "category": "Electronics"},
+                "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+            }, file, indent=4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_with_service(self, scenario, coalesce_window=0.02):
+        async def run():
+            service = InventoryService(InventoryManager(self.database), coalesce_window)
+            port = await service.start(port=0)
+            connection = await ServiceConnection(port=port).open()
+            try:
+                return await scenario(service, connection, port)
+            finally:
+                await connection.close()
+                await service.stop()
+        return asyncio.run(run())
+
+    def stored_catalog(self):
+        with open(self.database, "r") as file:
+            return json.load(file)
+
+    def test_reads(self):
+        async def scenario(service, connection, port):
+            return [
+                await connection.request("GET", "/products/E100"),
+                await connection.request("GET", "/products?name=chair"),
+                await connection.request("GET", "/products?max_price=100"),
+                await connection.request("GET", "/products?category=Electronics"),
+                await connection.request("GET", "/aggregates"),
+                await connection.request("GET", "/low-stock"),
+                await connection.request("GET", "/products/X999")
+            ]
+        product, found, cheap, electronics, aggregates, low_stock, missing = self.run_with_service(scenario)
+        self.assertEqual(product, (200, {"product_id": "E100", "product_name": "TV", "quantity": 10.0,
+                                         "price": 315.0, "category": "Electronics"}))
+        self.assertEqual(found[1]["product_id"], "F100")
+        self.assertEqual([item["product_id"] for item in cheap[1]["products"]], ["F100"])
+        self.assertEqual([item["product_id"] for item in electronics[1]["products"]], ["E100"])
+        self.assertEqual(aggregates[1]["total_value"], 10.0 * 315.0 + 3.0 * 50.0)
+        self.assertEqual([item["product_id"] for item in low_stock[1]["products"]], ["F100"])
+        self.assertEqual(missing[0], 404)
+
+    def test_concurrent_writes_are_saved_in_one_batch(self):
+        async def scenario(service, connection, port):
+            connections = [await ServiceConnection(port=port).open() for _ in range(10)]
+            try:
+                responses = await asyncio.gather(*(
+                    other.request("POST", "/products/E100/quantity", {"delta": 1}) for other in connections))
+            finally:
+                for other in connections:
+                    await other.close()
+            return responses, dict(service.stats)
+        responses, stats = self.run_with_service(scenario)
+        self.assertTrue(all(status == 200 for status, _ in responses))
+        self.assertEqual(stats["writes"], 10)
+        self.assertLess(stats["batches"], 10)
+        self.assertEqual(self.stored_catalog()["E100"]["quantity"], 20.0)
+
+    def test_failed_write_does_not_affect_others_in_batch(self):
+        async def scenario(service, connection, port):
+            other = await ServiceConnection(port=port).open()
+            try:
+                return await asyncio.gather(
+                    connection.request("POST", "/products", {"product_id": "C100", "product_name": "Shirt",
+                                                             "quantity": 4, "price": 20, "category": "Clothes"}),
+                    other.request("POST", "/products", {"product_id": "E100", "product_name": "Radio",
+                                                        "quantity": 1, "price": 20, "category": "Electronics"}))
+            finally:
+                await other.close()
+        added, duplicate = self.run_with_service(scenario)
+        self.assertEqual(added[0], 201)
+        self.assertEqual(duplicate[0], 400)
+        catalog = self.stored_catalog()
+        self.assertEqual(catalog["C100"]["product_name"], "Shirt")
+        self.assertEqual(catalog["E100"]["product_name"], "TV")
+
+    def test_malformed_write_does_not_affect_others_in_batch(self):
+        async def scenario(service, connection, port):
+            others = [await ServiceConnection(port=port).open() for _ in range(2)]
+            try:
+                return await asyncio.gather(
+                    connection.request("POST", "/products/E100/quantity", {"delta": 1}),
+                    others[0].request("POST", "/products/E100/quantity", {}),
+                    others[1].request("POST", "/products/E100/quantity", [1]))
+            finally:
+                for other in others:
+                    await other.close()
+        changed, missing_delta, not_object = self.run_with_service(scenario)
+        self.assertEqual(changed[0], 200)
+        self.assertEqual(missing_delta[0], 400)
+        self.assertEqual(not_object[0], 400)
+        self.assertEqual(self.stored_catalog()["E100"]["quantity"], 11.0)
+
+    def test_update_and_remove(self):
+        async def scenario(service, connection, port):
+            return [
+                await connection.request("PUT", "/products/E100", {"product_name": "TV", "quantity": 1,
+                                                                   "price": 300, "category": "Electronics"}),
+                await connection.request("DELETE", "/products/F100"),
+                await connection.request("DELETE", "/products/F100")
+            ]
+        updated, removed, missing = self.run_with_service(scenario, coalesce_window=0)
+        self.assertEqual(updated[1]["price"], 300.0)
+        self.assertEqual(removed[0], 200)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(list(self.stored_catalog()), ["E100"])
+
+    def test_stop_saves_queued_writes(self):
+        async def run():
+            service = InventoryService(InventoryManager(self.database), coalesce_window=0.1)
+            await service.start(port=0)
+            queued = asyncio.create_task(service.dispatch("POST", "/products/E100/quantity", b'{"delta": 1}'))
+            await asyncio.sleep(0.01)  # queued, the writer waits for more writes
+            await service.stop()
+            late = await service.dispatch("POST", "/products/E100/quantity", b'{"delta": 1}')
+            return await asyncio.wait_for(queued, 1), late
+        queued, late = asyncio.run(run())
+        self.assertEqual(queued[0], 200)
+        self.assertEqual(late[0], 503)
+        self.assertEqual(self.stored_catalog()["E100"]["quantity"], 11.0)
+
+    def test_load_generator(self):
+        async def scenario(service, connection, port):
+            return await run_load(port=port, requests=200, concurrency=5, write_ratio=0.2, seed=1)
+        report = self.run_with_service(scenario, coalesce_window=0.001)
+        self.assertEqual(report["requests"], 200)
+        self.assertEqual(report["errors"], 0)
+        self.assertLessEqual(report["p50_ms"], report["p99_ms"])
+        self.assertEqual(self.stored_catalog()["E100"]["quantity"], 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from inventory.inventory_manager import InventoryManager, WIDE_PRODUCT_ID_PATTERN
+from inventory.migrate import migrate_catalog
+from inventory.product import Product
+from inventory.sharded_storage import ShardedBackend
+from tests import test_storage
+
+
+class TestShardedBackend(test_storage.BackendTests, unittest.TestCase):
+
+    def make_backend(self, directory):
+        return ShardedBackend(directory / "product_catalog.shards")
+
+    def test_upsert_and_delete(self):
+        """Products are listed shard by shard, in catalog order inside each shard."""
+        signature = self.backend.signature()
+        self.backend.upsert("F100", dict(self.catalog["F100"], quantity=9.0))
+        self.backend.upsert("C100", {"product_name": "shirt", "quantity": 1.0, "price": 20.0, "category": "Clothes"})
+        self.backend.delete("E210")
+        self.assertNotEqual(self.backend.signature(), signature)
+        product_data = self.backend.load_all()
+        self.assertEqual(list(product_data), ["C100", "E100", "F100"])
+        self.assertEqual(product_data["F100"]["quantity"], 9.0)
+
+
+class TestShardedCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name) / "product_catalog.shards"
+        migrate_catalog("product_catalog.json", self.directory)
+        with open("product_catalog.json") as file:
+            self.catalog = json.load(file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def shard_files(self):
+        return {path.name: path.read_bytes() for path in self.directory.glob("shard-*.json")}
+
+    def test_manager_routes_to_shards(self):
+        manager = InventoryManager(self.directory)
+        self.assertEqual(sorted(self.shard_files()), ["shard-C.json", "shard-E.json", "shard-F.json"])
+        self.assertEqual(manager.read_product_data(), self.catalog)
+        before = self.shard_files()
+        manager.increment_quantity("E100", 1.0)
+        after = self.shard_files()
+        self.assertNotEqual(after["shard-E.json"], before["shard-E.json"])
+        self.assertEqual(after["shard-C.json"], before["shard-C.json"])
+        self.assertEqual(after["shard-F.json"], before["shard-F.json"])
+        manager.add_product("G100", Product("hammer", 2.0, 15.0, "Furniture"))
+        self.assertIn("shard-G.json", self.shard_files())
+        self.assertEqual(ShardedBackend(self.directory).read("G100")["product_name"], "hammer")
+
+    def test_category_scan_reads_only_its_shards(self):
+        backend = ShardedBackend(self.directory)
+        furniture = list(backend.scan(category="Furniture"))
+        self.assertEqual(set(backend.shards), {"F"})
+        self.assertEqual(furniture, [(product_id, product) for product_id, product in self.catalog.items()
+                                     if product["category"] == "Furniture"])
+        self.assertEqual([product_id for product_id, product in backend.scan_prefix("E1")],
+                         [product_id for product_id in self.catalog if product_id.startswith("E1")])
+        self.assertEqual(set(backend.shards), {"F", "E"})
+
+    def test_parallel_aggregates(self):
+        expected = InventoryManager(Path(self.tmp_dir.name) / "loaded.json")
+        migrate_catalog("product_catalog.json", expected.database)
+        for executor in ("thread", "process"):
+            backend = ShardedBackend(self.directory, executor=executor, max_workers=2)
+            self.assertEqual(backend.aggregates(), expected.get_aggregates())
+        streaming = InventoryManager(self.directory, streaming=True)
+        self.assertEqual(streaming.get_total_inventory_value(), expected.get_total_inventory_value())
+
+    def test_hash_shards(self):
+        directory = Path(self.tmp_dir.name) / "hashed.shards"
+        backend = ShardedBackend(directory, shard_count=4)
+        backend.write_all(self.catalog)
+        self.assertTrue(all(path.name[len("shard-h"):-len(".json")].isdigit() for path in directory.glob("shard-*.json")))
+        reopened = ShardedBackend(directory)  # layout is taken from the manifest
+        self.assertEqual(reopened.shard_count, 4)
+        self.assertEqual(reopened.load_all().keys(), self.catalog.keys())
+
+    def test_wide_product_ids(self):
+        manager = InventoryManager(self.directory, product_id_pattern=WIDE_PRODUCT_ID_PATTERN)
+        manager.add_product("EL1000042", Product("speaker", 2.0, 45.0, "Electronics"))
+        self.assertIn("shard-EL.json", self.shard_files())
+        with self.assertRaises(ValueError):
+            InventoryManager(Path(self.tmp_dir.name) / "narrow.json").valid_product_id("EL1000042")
+
+
+if __name__ == "__main__":
+    unittest.main()
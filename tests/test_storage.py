@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from inventory.inventory_manager import InventoryManager
+from inventory.binary_storage import BinaryCatalogBackend
+from inventory.migrate import migrate_catalog
+from inventory.sqlite_storage import SQLiteBackend
+from inventory.storage import JsonFileBackend, new_file_mode
+
+
+class BackendTests:
+    """Tests every backend has to pass, mixed into one TestCase per backend."""
+
+    catalog = {
+        "E100": {"product_name": "TV", "quantity": 75.0, "price": 315.0, "category": "Electronics"},
+        "E210": {"product_name": "cable", "quantity": 2.0, "price": 10.0, "category": "Electronics"},
+        "F100": {"product_name": "Chair", "quantity": 3.0, "price": 50.0, "category": "Furniture"}
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.backend = self.make_backend(Path(self.tmp_dir.name))
+        self.backend.write_all(self.catalog)
+
+    def tearDown(self):
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+    def test_read(self):
+        self.assertEqual(self.backend.read("F100"), self.catalog["F100"])
+        self.assertIsNone(self.backend.read("X100"))
+        self.assertEqual(self.backend.read_many(["E100", "X100", "F100"]), {"E100": self.catalog["E100"], "F100": self.catalog["F100"]})
+
+    def test_upsert_and_delete(self):
+        signature = self.backend.signature()
+        self.backend.upsert("F100", dict(self.catalog["F100"], quantity=9.0))
+        self.backend.upsert("C100", {"product_name": "shirt", "quantity": 1.0, "price": 20.0, "category": "Clothes"})
+        self.backend.delete("E210")
+        self.assertNotEqual(self.backend.signature(), signature)
+        product_data = self.backend.load_all()
+        self.assertEqual(list(product_data), ["E100", "F100", "C100"])
+        self.assertEqual(product_data["F100"]["quantity"], 9.0)
+
+    def test_scan(self):
+        self.assertEqual([product_id for product_id, product in self.backend.scan(category="Electronics", max_quantity=5.0)], ["E210"])
+        self.assertEqual([product_id for product_id, product in self.backend.scan(min_price=10.0, max_price=315.0)], ["E210", "F100"])
+        self.assertEqual([product_id for product_id, product in self.backend.scan(product_name="chair")], ["F100"])
+        with self.assertRaises(ValueError):
+            list(self.backend.scan(colour="red"))
+
+
+class TestJsonFileBackend(BackendTests, unittest.TestCase):
+
+    def make_backend(self, directory):
+        return JsonFileBackend(directory / "product_catalog.json")
+
+    @unittest.skipUnless(os.path.exists("/proc/self/status"), "umask is read from /proc")
+    def test_new_file_mode_follows_umask(self):
+        umask = os.umask(0o027)
+        try:
+            self.assertEqual(new_file_mode(), 0o640)
+        finally:
+            os.umask(umask)
+        with patch("builtins.open", side_effect=FileNotFoundError):
+            self.assertEqual(new_file_mode(), 0o644)
+
+
+class TestBinaryCatalogBackend(BackendTests, unittest.TestCase):
+
+    def make_backend(self, directory):
+        return BinaryCatalogBackend(directory / "product_catalog.bin")
+
+
+class TestSQLiteBackend(BackendTests, unittest.TestCase):
+
+    def make_backend(self, directory):
+        return SQLiteBackend(directory / "product_catalog.db")
+
+    def test_threads_share_pool(self):
+        """Writers in several threads do not lose each other's products."""
+        def add_products(first):
+            for number in range(first, first + 25):
+                self.backend.upsert(f"C{number:03d}", {"product_name": "shirt", "quantity": 1.0, "price": 20.0, "category": "Clothes"})
+        threads = [threading.Thread(target=add_products, args=(first,)) for first in (100, 200, 300, 400)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(list(self.backend.scan(category="Clothes"))), 100)
+
+    def test_migration_and_manager(self):
+        directory = Path(self.tmp_dir.name)
+        with open(directory / "product_catalog.json", "w") as file:
+            json.dump(self.catalog, file, indent=4)
+        self.assertEqual(migrate_catalog(directory / "product_catalog.json", directory / "migrated.db"), 3)
+        manager = InventoryManager(directory / "migrated.db")
+        self.assertEqual(manager.read_product_data(), self.catalog)
+        manager.increment_quantity("F100", 1.0)
+        manager.remove_product("E100")
+        manager.close()
+        backend = SQLiteBackend(directory / "migrated.db")
+        self.assertEqual(backend.read("F100")["quantity"], 4.0)
+        self.assertIsNone(backend.read("E100"))
+        backend.close()
+
+
+if __name__ == "__main__":
+    unittest.main()